@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Capture backend benchmark
+
+Times the ways the export can turn the current slide into pixels:
+
+- playwright-png: page.screenshot() decoded by Pillow (export_engine.capture_frame)
+- cdp-png:        Page.captureScreenshot PNG with optimizeForSpeed -> NumPy
+- cdp-jpeg:       Page.captureScreenshot JPEG (lossy) -> NumPy
+
+Each backend captures the same slides several times; the report lists the
+median time per frame (capture + decode) and the encoded size.
+
+Usage:
+    python bench_capture.py [--runs 5] [--slides 0,4,11] [--scale 2] [--clip]
+"""
+
+import argparse
+import statistics
+import time
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    print("Error: Playwright is required")
+    print("Install with: pip install playwright && playwright install chromium")
+    exit(1)
+
+from cdp_capture import CV2_AVAILABLE, CDPCapture
+from export_engine import capture_frame, deck_page, goto_slide, slide_clip
+
+
+def _time(fn, runs):
+    times, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def bench_capture(runs=5, slides=(0, 4, 11), scale=1, clip_to_slide=False):
+    results = {}
+    with sync_playwright() as p, deck_page(p, {'width': 1920, 'height': 1080}, device_scale_factor=scale) as page:
+        page.wait_for_timeout(3000)
+        png = CDPCapture(page, 'png')
+        jpeg = CDPCapture(page, 'jpeg', quality=90)
+
+        for slide in slides:
+            goto_slide(page, slide)
+            clip = slide_clip(page) if clip_to_slide else None
+            options = {'clip': clip} if clip else {}
+
+            backends = {
+                'playwright-png': (lambda: page.screenshot(type='png', **options),
+                                   lambda: capture_frame(page, **options)),
+                'cdp-png': (lambda: png.capture_bytes(clip), lambda: png.capture(clip)),
+                'cdp-jpeg': (lambda: jpeg.capture_bytes(clip), lambda: jpeg.capture(clip)),
+            }
+            for name, (encoded, decoded) in backends.items():
+                _, data = _time(encoded, 1)
+                elapsed, frame = _time(decoded, runs)
+                size = frame.size if hasattr(frame, 'mode') else (frame.shape[1], frame.shape[0])
+                results.setdefault(name, []).append((elapsed, len(data), size))
+
+        png.close()
+        jpeg.close()
+
+    print(f"\nDecoder for CDP frames: {'OpenCV' if CV2_AVAILABLE else 'Pillow'}")
+    print(f"{'backend':<16} {'ms/frame':>10} {'KB/frame':>10}  frame size")
+    baseline = statistics.median(e for e, _, _ in results['playwright-png'])
+    for name, rows in results.items():
+        elapsed = statistics.median(e for e, _, _ in rows)
+        size_kb = statistics.median(s for _, s, _ in rows) / 1024
+        width, height = rows[0][2]
+        print(f"{name:<16} {elapsed * 1000:>10.1f} {size_kb:>10.0f}  {width}x{height}"
+              f"  ({baseline / elapsed:.2f}x vs playwright-png)")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark screenshot capture backends')
+    parser.add_argument('--runs', type=int, default=5, help='Captures per slide and backend (default: 5)')
+    parser.add_argument('--slides', default='0,4,11', help='Comma-separated slide indices (default: 0,4,11)')
+    parser.add_argument('--scale', type=float, default=1, help='device_scale_factor (default: 1)')
+    parser.add_argument('--clip', action='store_true', help='Clip captures to the active slide')
+    args = parser.parse_args()
+
+    bench_capture(args.runs, [int(s) for s in args.slides.split(',')], args.scale, args.clip)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Browser contexts for export runs
+
+Every export gets a fresh throwaway Chromium profile. A persistent profile
+(warm HTTP disk cache and V8 code cache between runs) was tried and dropped:
+export_engine.deck_page routes requests to freeze media and swap embeds for
+posters, and Playwright disables the HTTP cache for any page or context with
+a route registered, whatever its URL pattern. The deck is served from
+localhost by serve_deck, so refetching it each run is cheap anyway.
+
+Usage:
+
+    context, close_context = open_export_context(
+        p, viewport={'width': 1920, 'height': 1080})
+    page = context.new_page()
+    ...
+    close_context()
+"""
+
+
+def open_export_context(p, headless=True, **context_options):
+    """
+    Launch Chromium and create a browser context for exporting.
+
+    Returns (context, close_context).
+    """
+    # The deck registers sw.js when served over HTTP; a controlling service
+    # worker answers requests before page/context routes see them, which
+    # would bypass the media freeze and the embed posters
+    context_options.setdefault('service_workers', 'block')
+
+    browser = p.chromium.launch(headless=headless)
+    context = browser.new_context(**context_options)
+    return context, browser.close
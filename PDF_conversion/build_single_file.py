@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Standalone single-file deck build
+
+Produces one self-contained HTML file for offline handouts and export
+workers: styles.css and script.js are inlined, and every local asset up to
+the size threshold (fonts, most images) becomes a data URI. Larger assets are
+either copied beside the file or, with --bundle, zipped together with it.
+
+Uses the optimized build in dist/ when it exists (python deck_build.py),
+otherwise the deck sources.
+
+Export code can skip the filesystem entirely:
+
+    from build_single_file import standalone_html
+    html, external = standalone_html(threshold=None)   # inline everything
+    page.set_content(html)
+
+The output directory gets a .htpaac-standalone marker listing the files
+written, so a rebuild removes only those; a non-empty directory without it
+is left alone unless --force is given.
+
+Usage:
+    python build_single_file.py [--threshold 100] [--inline-all] [--bundle] [--output DIR] [--force]
+"""
+
+import argparse
+import base64
+import json
+import mimetypes
+import re
+import shutil
+import zipfile
+from pathlib import Path
+from urllib.parse import unquote
+
+from build_sw_manifest import local_refs
+from deck_build import DECK_ROOT, DIST_ROOT
+from hash_assets import ref_pattern
+
+OUTPUT_DIR = DECK_ROOT / 'standalone'
+OUTPUT_NAME = 'htpaac.html'
+# Written into the output directory: the files this tool put there, so a
+# rebuild removes exactly those and nothing else
+MARKER_NAME = '.htpaac-standalone'
+
+# Assets up to this size (bytes) are inlined as data URIs
+INLINE_THRESHOLD = 100 * 1024
+
+# mimetypes does not know every web format on every platform
+MIME_TYPES = {
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.ttf': 'font/ttf',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif',
+    '.svg': 'image/svg+xml',
+    '.webm': 'video/webm',
+    '.mp4': 'video/mp4',
+}
+
+# Also matches the deferred (media="print" onload=...) link of a minified build
+STYLESHEET_LINK = re.compile(r'''<link\s+rel=["']stylesheet["']\s+href=["'](?!https?:)([^"']+\.css)["'][^>]*>''')
+SCRIPT_TAG = re.compile(r'''<script\s+src=["'](?!https?:)([^"']+\.js)["']\s*>\s*</script>''')
+DATA_PRELOAD = re.compile(r'''<link\s+rel=["']preload["']\s+href=["']data:[^>]*>\s*''')
+
+
+def default_root():
+    """dist/ if the deck has been built, otherwise the sources"""
+    return DIST_ROOT if (DIST_ROOT / 'index.html').exists() else DECK_ROOT
+
+
+def data_uri(path):
+    mime = MIME_TYPES.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    return f'data:{mime};base64,{base64.b64encode(path.read_bytes()).decode("ascii")}'
+
+
+def _inline_refs(text, root, threshold, external, uri_cache):
+    for ref in local_refs(text):
+        path = root / unquote(ref)
+        if not path.is_file():
+            continue
+        if threshold is not None and path.stat().st_size > threshold:
+            if ref not in external:
+                external.append(ref)
+            continue
+        if ref not in uri_cache:
+            uri = data_uri(path)
+            # Handlers that test the current image by file name, e.g.
+            # this.src.includes('EDAhard.png'), still match via the fragment
+            if re.search(rf'''(['"]){re.escape(path.name)}\1''', text):
+                uri += f'#{path.name}'
+            uri_cache[ref] = uri
+        text = ref_pattern(ref).sub(lambda m: uri_cache[ref], text)
+    return text
+
+
+def _script_safe(js):
+    # The inlined script must not end its own <script> element
+    return js.replace('</script', '<\\/script').replace('<!--', '<\\!--')
+
+
+def standalone_html(root=None, threshold=INLINE_THRESHOLD):
+    """
+    Self-contained deck HTML.
+    threshold: max asset size in bytes to inline, None to inline everything.
+    Returns (html, external) where external lists the asset paths left as
+    relative references.
+    """
+    root = Path(root) if root else default_root()
+    html = (root / 'index.html').read_text(encoding='utf-8')
+    external, uri_cache = [], {}
+
+    def inline_css(match):
+        css = (root / unquote(match.group(1))).read_text(encoding='utf-8')
+        return f'<style>\n{_inline_refs(css, root, threshold, external, uri_cache)}\n</style>'
+
+    def inline_js(match):
+        js = (root / unquote(match.group(1))).read_text(encoding='utf-8')
+        return f'<script>\n{_script_safe(_inline_refs(js, root, threshold, external, uri_cache))}\n</script>'
+
+    html = STYLESHEET_LINK.sub(inline_css, html)
+    html = SCRIPT_TAG.sub(inline_js, html)
+    html = _inline_refs(html, root, threshold, external, uri_cache)
+    # Preloading an inlined font is meaningless
+    html = DATA_PRELOAD.sub('', html)
+    return html, external
+
+
+def _is_standalone_zip(path):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            return OUTPUT_NAME in archive.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def _clear_previous(output_dir, expected, force):
+    """
+    Remove the files a previous build wrote into output_dir. A directory
+    without the marker is only written into when it holds nothing but the
+    files about to be written (expected), or with force; nothing in it is
+    deleted.
+    """
+    marker = output_dir / MARKER_NAME
+    if marker.is_file():
+        for ref in json.loads(marker.read_text(encoding='utf-8')):
+            if Path(ref).is_absolute() or '..' in Path(ref).parts:
+                continue
+            target = output_dir / ref
+            if target.is_file():
+                target.unlink()
+            # Drop directories the build created that are now empty
+            for parent in target.parents:
+                if parent == output_dir or not parent.is_dir() or any(parent.iterdir()):
+                    break
+                parent.rmdir()
+        marker.unlink()
+    elif output_dir.exists() and not output_dir.is_dir():
+        raise FileExistsError(f"{output_dir} exists and is not a directory")
+    elif output_dir.is_dir() and not force and any(
+            p.is_file() and p.relative_to(output_dir).as_posix() not in expected
+            for p in output_dir.rglob('*')):
+        raise FileExistsError(f"{output_dir} holds files this tool did not write "
+                              f"(no {MARKER_NAME}); pass --force to write into it anyway")
+
+
+def write_standalone(root=None, output_dir=OUTPUT_DIR, threshold=INLINE_THRESHOLD, bundle=False, force=False):
+    """
+    Write the single-file deck (and the assets over the threshold) into
+    output_dir, or output_dir.zip with bundle. Raises FileExistsError rather
+    than overwrite files this tool did not write, unless force is set.
+    """
+    root = Path(root) if root else default_root()
+    output_dir = Path(output_dir)
+    print(f"Building single-file deck from {root}")
+
+    html, external = standalone_html(root, threshold)
+
+    if bundle:
+        output = output_dir.with_suffix('.zip')
+        if output.exists() and not force and not _is_standalone_zip(output):
+            raise FileExistsError(f"{output} exists and is not a standalone bundle; "
+                                  f"pass --force to replace it")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr(OUTPUT_NAME, html)
+            for ref in external:
+                # Already-compressed media gains nothing from deflate
+                archive.write(root / unquote(ref), unquote(ref), compress_type=zipfile.ZIP_STORED)
+    else:
+        _clear_previous(output_dir, {OUTPUT_NAME, *map(unquote, external)}, force)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output = output_dir / OUTPUT_NAME
+        output.write_text(html, encoding='utf-8')
+        written = [OUTPUT_NAME]
+        for ref in external:
+            target = output_dir / unquote(ref)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(root / unquote(ref), target)
+            written.append(unquote(ref))
+        (output_dir / MARKER_NAME).write_text(json.dumps(written, indent=2) + '\n', encoding='utf-8')
+
+    external_size = sum((root / unquote(ref)).stat().st_size for ref in external)
+    print(f"✅ Wrote {output}")
+    print(f"   HTML: {len(html.encode('utf-8')) / 1024 / 1024:.1f} MB")
+    if external:
+        where = 'bundled' if bundle else 'copied beside it'
+        print(f"   {len(external)} assets over the threshold {where} ({external_size / 1024 / 1024:.1f} MB)")
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the deck as one self-contained HTML file')
+    parser.add_argument('--root', default=None, help='Deck directory (default: dist/ if built, else the sources)')
+    parser.add_argument('--output', default=str(OUTPUT_DIR), help='Output directory (default: standalone/)')
+    parser.add_argument('--threshold', type=float, default=INLINE_THRESHOLD / 1024,
+                        help='Inline assets up to this size in KB (default: 100)')
+    parser.add_argument('--inline-all', action='store_true', help='Inline every asset regardless of size')
+    parser.add_argument('--bundle', action='store_true',
+                        help='Write standalone.zip with the HTML and the large assets instead of a directory')
+    parser.add_argument('--force', action='store_true',
+                        help='Write into a non-empty output directory this tool did not create '
+                             '(its other files are kept)')
+    args = parser.parse_args()
+
+    threshold = None if args.inline_all else int(args.threshold * 1024)
+    try:
+        write_standalone(args.root, Path(args.output), threshold, args.bundle, args.force)
+    except FileExistsError as e:
+        print(f"Error: {e}")
+        exit(1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Build asset-manifest.json for the deck's offline service worker (sw.js)
+
+The manifest lists the shell (index.html, styles.css, script.js), the fonts
+and the images of the first slides as "precache", and every other local asset
+referenced by the deck as "lazy". Its "version" is a hash of all listed files,
+so any asset change installs a fresh cache. In a content-hashed build
+(dist/ with manifest.json, see hash_assets.py) the hashed names and the build
+version are used instead; the build writes dist/asset-manifest.json itself.
+
+The service worker is optional: script.js only registers it when the deck is
+served over HTTP and asset-manifest.json exists. To enable it:
+
+    python build_sw_manifest.py
+    python serve_deck.py
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import quote, unquote, urlparse
+
+DECK_ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_NAME = 'asset-manifest.json'
+HASHED_MANIFEST_NAME = 'manifest.json'
+
+SHELL_ASSETS = ['./', 'index.html', 'styles.css', 'script.js']
+
+# Images referenced by this many leading slides are precached at install time
+CRITICAL_SLIDES = 4
+
+# Quoted img/ and Terminus/ paths (attributes, url("..."), JS strings) and
+# unquoted url(...) references
+ASSET_REF = re.compile(
+    r'''(?P<q>['"`])(?P<quoted>(?:\./)?(?:img|Terminus)/[^'"`\n]+?)(?P=q)'''
+    r'''|url\(\s*(?P<bare>(?:\./)?(?:img|Terminus)/[^)\s'"]+)\s*\)'''
+)
+
+SRCSET_VALUE = re.compile(r'\s\d+(?:\.\d+)?[wx](?:,|$)')
+
+
+def url_path(path):
+    """Encode a relative path the way the browser will request it"""
+    return quote(unquote(path), safe="/!$&'()*+,;=:@~")
+
+
+def local_refs(text):
+    """Relative img/ and Terminus/ paths referenced in a source file, in order"""
+    refs = []
+    for match in ASSET_REF.finditer(text):
+        value = match.group('quoted') or match.group('bare')
+        # srcset="img/a-100w.webp 100w, img/a-200w.webp 200w"
+        candidates = ([c.rsplit(None, 1)[0] for c in re.split(r',\s+', value)]
+                      if SRCSET_VALUE.search(value) else [value])
+        for ref in candidates:
+            ref = ref.split('?', 1)[0].split('#', 1)[0]
+            if urlparse(ref).scheme:
+                continue
+            ref = ref[2:] if ref.startswith('./') else ref.lstrip('/')
+            if ref not in refs:
+                refs.append(ref)
+    return refs
+
+
+def critical_slide_refs(html, count=CRITICAL_SLIDES):
+    """Local assets referenced by the first `count` slides of index.html"""
+    starts = [m.start() for m in re.finditer(r'<div id="slide-[^"]+" class="slide', html)]
+    if not starts:
+        return []
+    end = starts[count] if len(starts) > count else len(html)
+    return local_refs(html[:end])
+
+
+def _file_digest(path):
+    return hashlib.sha1(path.read_bytes()).hexdigest()
+
+
+def _hashed_assets(root):
+    """manifest.json of a content-hashed build (hash_assets.py), or None"""
+    try:
+        return json.loads((root / HASHED_MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def build_manifest(root=DECK_ROOT):
+    root = Path(root)
+    hashed = _hashed_assets(root)
+    assets = hashed['assets'] if hashed else {}
+    shell = [assets[name]['file'] if name in assets else name for name in SHELL_ASSETS]
+    css_name, js_name = shell[2], shell[3]
+
+    html = (root / 'index.html').read_text(encoding='utf-8')
+    css = (root / css_name).read_text(encoding='utf-8')
+    js = (root / js_name).read_text(encoding='utf-8')
+
+    precache = list(shell)
+    for ref in local_refs(css) + critical_slide_refs(html):
+        if ref not in precache:
+            precache.append(ref)
+
+    lazy = []
+    for ref in local_refs(html) + local_refs(js):
+        if ref not in precache and ref not in lazy:
+            lazy.append(ref)
+
+    version_hash = hashlib.sha1()
+    missing = []
+    for ref in precache + lazy:
+        if ref == './':
+            continue
+        path = root / unquote(ref)
+        if path.is_file():
+            version_hash.update(f'{ref}:{_file_digest(path)}\n'.encode('utf-8'))
+        else:
+            missing.append(ref)
+    if (root / 'sw.js').is_file():
+        version_hash.update(f'sw.js:{_file_digest(root / "sw.js")}\n'.encode('utf-8'))
+
+    # Missing files would make cache.addAll() fail the whole install
+    precache = [ref for ref in precache if ref not in missing]
+    lazy = [ref for ref in lazy if ref not in missing]
+
+    return {
+        # A hashed build already has a content version covering every asset
+        'version': hashed['version'] if hashed else version_hash.hexdigest()[:12],
+        'precache': [url_path(ref) if ref != './' else ref for ref in precache],
+        'lazy': [url_path(ref) for ref in lazy],
+    }, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build asset-manifest.json for the service worker')
+    parser.add_argument('--root', default=str(DECK_ROOT), help='Deck directory (default: repository root)')
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    manifest, missing = build_manifest(root)
+    for ref in missing:
+        print(f"  Warning: referenced asset not found: {ref}")
+
+    output = root / MANIFEST_NAME
+    output.write_text(json.dumps(manifest, indent=2) + '\n', encoding='utf-8')
+    print(f"✅ Wrote {output}")
+    print(f"   Version: {manifest['version']}")
+    print(f"   Precache: {len(manifest['precache'])} assets, lazy: {len(manifest['lazy'])} assets")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ except ImportError:
     print("Install with: pip install playwright && playwright install chromium")
     sys.exit(1)
 
+from export_workspace import export_workspace
+
 
 def capture_all_slides(input_file='index.html', output_file='HTPAAC_AllSlides.pdf'):
     """
@@ -30,7 +32,7 @@ def capture_all_slides(input_file='index.html', output_file='HTPAAC_AllSlides.pd
     print(f"Output: {output_file}")
 
     try:
-        with sync_playwright() as p:
+        with export_workspace() as workspace, sync_playwright() as p:
             # Launch browser
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
@@ -195,23 +197,15 @@ def capture_all_slides(input_file='index.html', output_file='HTPAAC_AllSlides.pd
                 </html>
             '''
 
-            # Write HTML to a temporary file instead of using data URL
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as tmp_file:
-                tmp_file.write(full_html)
-                temp_html_path = tmp_file.name
+            # Write HTML to the run's workspace instead of using a data URL
+            # (removed with the workspace)
+            temp_html_path = workspace / 'all_slides.html'
+            temp_html_path.write_text(full_html, encoding='utf-8')
 
             # Navigate to the temporary file
-            page.goto(f'file://{temp_html_path}', timeout=60000)
+            page.goto(temp_html_path.as_uri(), timeout=60000)
             page.wait_for_timeout(2000)
 
-            # Clean up temp file after use
-            import os as os_temp
-            try:
-                os_temp.unlink(temp_html_path)
-            except:
-                pass
-
             # Generate PDF
             print("Generating PDF...")
             page.pdf(
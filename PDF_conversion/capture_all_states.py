@@ -3,7 +3,7 @@
 PDF generation with ALL states for multi-state slides
 """
 
-import os
+import argparse
 from pathlib import Path
 
 try:
@@ -13,15 +13,10 @@ except ImportError:
     print("Install with: pip install playwright && playwright install chromium")
     exit(1)
 
-try:
-    from PIL import Image
-except ImportError:
-    print("Error: Pillow is required")
-    print("Install with: pip install Pillow")
-    exit(1)
+from export_engine import capture_frame, save_frames, write_pdf
 
 
-def capture_all_states():
+def capture_all_states(save_images=None):
     """Generate PDF with all slide states"""
 
     # Define slides and their number of states
@@ -129,17 +124,15 @@ def capture_all_states():
 
                     # Take screenshot
                     screenshot_path = f'slide_{screenshot_counter:03d}_{slide_name}_state{state + 1}.png'
-                    page.screenshot(path=screenshot_path, full_page=False)
-                    screenshots.append(screenshot_path)
-                    print(f"    ✓ Saved {screenshot_path}")
+                    screenshots.append((screenshot_path, capture_frame(page, full_page=False)))
+                    print(f"    ✓ Captured {screenshot_path}")
                     screenshot_counter += 1
             else:
                 # Single state slide - just capture it
                 print(f"  Capturing single state")
                 screenshot_path = f'slide_{screenshot_counter:03d}_{slide_name}.png'
-                page.screenshot(path=screenshot_path, full_page=False)
-                screenshots.append(screenshot_path)
-                print(f"    ✓ Saved {screenshot_path}")
+                screenshots.append((screenshot_path, capture_frame(page, full_page=False)))
+                print(f"    ✓ Captured {screenshot_path}")
                 screenshot_counter += 1
 
         browser.close()
@@ -151,41 +144,16 @@ def capture_all_states():
         print("ERROR: No screenshots were taken!")
         return False
 
-    from PIL import Image
-
-    # Load all images
-    images = []
-    for screenshot_path in screenshots:
-        if os.path.exists(screenshot_path):
-            print(f"  Loading {screenshot_path}")
-            img = Image.open(screenshot_path)
-
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    rgb_img.paste(img, mask=img.split()[3])
-                else:
-                    rgb_img.paste(img)
-                images.append(rgb_img)
-            else:
-                images.append(img)
+    if save_images:
+        save_frames(screenshots, save_images)
 
-    if not images:
-        print("ERROR: No images were loaded!")
-        return False
+    images = [frame for _, frame in screenshots]
 
     # Save as multi-page PDF
     output_file = 'HTPAAC_AllStates.pdf'
     print(f"\nSaving PDF with {len(images)} pages...")
 
-    images[0].save(
-        output_file,
-        "PDF",
-        save_all=True,
-        append_images=images[1:] if len(images) > 1 else [],
-        resolution=100.0
-    )
+    file_size = write_pdf(images, output_file, resolution=100.0)
 
     print(f"✅ PDF created: {output_file}")
     print(f"   Total pages: {len(images)}")
@@ -194,15 +162,18 @@ def capture_all_states():
     expected_pages = sum(slide_states.values())
     print(f"   Expected pages: {expected_pages}")
 
-    # File size
-    file_size = os.path.getsize(output_file)
     print(f"   File size: {file_size:,} bytes")
 
     return True
 
 
 if __name__ == "__main__":
-    success = capture_all_states()
+    parser = argparse.ArgumentParser(description='Generate a PDF with all slide states')
+    parser.add_argument('--save-images', metavar='DIR', default=None,
+                        help='Also write every captured frame as PNG into DIR')
+    args = parser.parse_args()
+
+    success = capture_all_states(args.save_images)
     if not success:
         print("\n❌ PDF generation failed!")
         exit(1)
\ No newline at end of file
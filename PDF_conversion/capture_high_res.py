@@ -3,8 +3,8 @@
 High-resolution PDF generation with proper state changes
 """
 
-import os
-from pathlib import Path
+import argparse
+from functools import partial
 
 try:
     from playwright.sync_api import sync_playwright
@@ -13,263 +13,209 @@ except ImportError:
     print("Install with: pip install playwright && playwright install chromium")
     exit(1)
 
-try:
-    from PIL import Image
-except ImportError:
-    print("Error: Pillow is required")
-    print("Install with: pip install Pillow")
-    exit(1)
+from capture_recipes import RECIPES_FILE, load_recipes, recipe_for, run_step
+from export_checkpoint import FrameCheckpoint
+from export_engine import (SLIDE_CONFIG, capture_frame, capture_slide, deck_page, goto_slide, save_frames,
+                           slide_fingerprint)
+from resolution_planner import PAGE_SIZES, apply_css_zoom, describe, fit_to_plan, plan_resolution, target_pixels
+from shm_ring import open_pipeline
+
+
+# Margin (CSS px) kept around the slide content when capturing only the
+# slide region (the clip then takes the output's aspect ratio)
+CLIP_PADDING = 32
 
 
-def capture_high_res():
+def capture_high_res(freeze_media=True, save_images=None, clip_to_slide=True,
+                     width=2560, height=1440, page_size=None, dpi=None, strict=False, resume=False,
+                     encode_processes=0, recipes_file=RECIPES_FILE):
     """Generate high-resolution PDF with state changes"""
 
+    # Per-slide actions and readiness live in capture_recipes.json
+    recipes = load_recipes(recipes_file)
+
     # Map slide indices to their IDs and states
-    slide_config = [
-        (0, 'slide-0', 1, 'Intro'),
-        (1, 'slide-1.0', 1, 'Part_1'),
-        (2, 'slide-1.1', 1, 'Arduino'),
-        (3, 'slide-1.2', 1, 'Laws'),
-        (4, 'slide-1.3', 2, 'Parts'),
-        (5, 'slide-1.4', 2, 'MCU'),
-        (6, 'slide-1.5', 2, 'Fabrication'),
-        (7, 'slide-1.6', 1, 'Software'),
-        (8, 'slide-1.7', 1, 'Protocol'),
-        (9, 'slide-1.8', 1, 'Networking'),
-        (10, 'slide-2.0', 1, 'Part_2'),
-        (11, 'slide-2.1', 3, 'Actuator'),
-        (12, 'slide-2.2', 3, 'Sensor'),
-        (13, 'slide-2.3', 2, 'Biometric'),
-        (14, 'slide-3.0', 1, 'Part_3'),
-        (15, 'slide-3.1', 2, 'Your_Kit'),
-        (16, 'slide-3.2', 3, 'Warm-up'),
-        (17, 'slide-3.3', 3, 'Hard_Mode'),
-    ]
-
-    with sync_playwright() as p:
-        # Launch browser
-        browser = p.chromium.launch(headless=True)
-
-        # Create page with 4K resolution for high quality
-        # Using 3840x2160 (4K UHD) with 2x device scale for super crisp rendering
-        context = browser.new_context(
-            viewport={'width': 3840, 'height': 2160},
-            device_scale_factor=2.0  # 2x scaling for higher DPI
-        )
-        page = context.new_page()
-
-        # Navigate to presentation
-        file_path = Path('../index.html').absolute()
-        url = f'file://{file_path}'
-        print(f"Opening presentation: {url}")
-        print(f"Resolution: 3840x2160 @ 2x scale (effective 7680x4320)")
-        page.goto(url, wait_until='networkidle')
-
-        # Wait for initialization
-        print("Waiting for presentation to load...")
-        page.wait_for_timeout(5000)
-
-        # Inject CSS to scale content for higher resolution
-        page.evaluate('''
-            () => {
-                // Scale up the presentation content for 4K
-                const style = document.createElement('style');
-                style.textContent = `
-                    .slideshow-container {
-                        transform: scale(2);
-                        transform-origin: top left;
-                    }
-                    body {
-                        overflow: hidden;
-                    }
-                `;
-                document.head.appendChild(style);
-            }
-        ''')
-
-        # Take screenshots
-        screenshots = []
-        screenshot_counter = 0
-
-        for slide_index, slide_id, num_states, slide_name in slide_config:
-            print(f"\nProcessing slide {slide_index} ({slide_id}) - {slide_name} ({num_states} state(s))...")
-
-            # Navigate to slide using JavaScript directly
-            page.evaluate(f'''
-                () => {{
-                    // Reset slide state for this slide
-                    if (window.slideStates) {{
-                        window.slideStates[{slide_index}] = 0;
-                    }}
-
-                    // Navigate to the slide
-                    if (window.goToSlide) {{
-                        window.goToSlide({slide_index});
-                    }} else {{
-                        // Fallback: manually set currentSlide and update display
-                        window.currentSlide = {slide_index};
-
-                        // Hide all slides
-                        document.querySelectorAll('.slide').forEach(s => {{
-                            s.classList.remove('active');
-                            s.style.display = 'none';
-                        }});
-
-                        // Show the target slide
-                        const targetSlide = document.querySelectorAll('.slide')[{slide_index}];
-                        if (targetSlide) {{
-                            targetSlide.classList.add('active');
-                            targetSlide.style.display = 'block';
-                            targetSlide.style.opacity = '1';
-                        }}
-                    }}
-
-                    // Hide navigation UI
-                    const elements = ['.navigation', '.progress-container', '.slide-note'];
-                    elements.forEach(sel => {{
-                        const el = document.querySelector(sel);
-                        if (el) el.style.display = 'none';
-                    }});
-
-                    // Force high-quality image rendering
-                    document.querySelectorAll('img').forEach(img => {{
-                        img.style.imageRendering = 'high-quality';
-                        img.style.imageRendering = '-webkit-optimize-contrast';
-                    }});
-                }}
-            ''')
-
-            # Wait for slide to render
-            page.wait_for_timeout(2500)
-
-            # Capture states
-            for state in range(num_states):
-                if state == 0:
-                    print(f"  Capturing state 1/{num_states} in 4K...")
-                else:
-                    print(f"  Capturing state {state + 1}/{num_states} in 4K...")
-
-                    # Trigger state change using JavaScript
-                    result = page.evaluate(f'''
-                        () => {{
-                            // Make sure we're on the right slide
-                            window.currentSlide = {slide_index};
-
-                            // Call toggleSlideState to advance to next state
-                            if (window.toggleSlideState) {{
-                                const success = window.toggleSlideState();
-                                console.log('State toggle result:', success);
-
-                                // Also trigger the state change handler directly if needed
-                                if (window.triggerSlideStateChange) {{
-                                    window.triggerSlideStateChange({slide_index}, {state});
-                                }}
-
-                                return {{
-                                    success: success,
-                                    currentState: window.slideStates ? window.slideStates[{slide_index}] : -1
-                                }};
-                            }}
-                            return {{ success: false, currentState: -1 }};
-                        }}
+    slide_config = SLIDE_CONFIG
+
+    # Render natively at the output size: the deck's 1920 CSS px layout at
+    # the device scale factor that yields the target pixels, instead of a
+    # 7680x4320 raster thumbnailed down afterwards
+    plan = plan_resolution(*target_pixels(width, height, page_size, dpi))
+
+    # Every finished frame is checkpointed to disk, so a crash only loses
+    # the frame in progress; --resume picks up the rest
+    settings = {'size': plan.output_size, 'dpi': plan.dpi, 'clip': clip_to_slide, 'freeze': freeze_media}
+    checkpoint = FrameCheckpoint('capture_high_res', settings, resume=resume)
+    if len(checkpoint):
+        print(f"Resuming: {len(checkpoint)} state(s) already checkpointed")
+
+    # Checkpoint keys in deck order
+    keys = []
+
+    def submit_checkpointed(pipeline, slide_keys):
+        # Frames of an earlier run are loaded and encoded by the workers
+        for key in slide_keys:
+            entry = checkpoint.entries[key]
+            if not entry.get('skipped'):
+                pipeline.submit(entry['name'], partial(checkpoint.load, key))
+
+    # Frames are flattened, resized and encoded to PDF pages (and
+    # checkpointed) on worker threads while the browser renders the next
+    # state. Frames already come out at plan.output_size (capture_slide
+    # renders the clip at that size); fit_to_plan only trims rounding pixels.
+    # With encode_processes the encodes run in processes fed through a
+    # shared memory ring (shm_ring), for very large frames
+    frame_size = tuple(map(max, plan.output_size, plan.native_size))
+    with open_pipeline(encode_processes, frame_size, resize=partial(fit_to_plan, plan=plan),
+                       resolution=float(plan.dpi), quality=95, optimize=True) as pipeline:
+        try:
+            # Launch browser. Export mode: GIFs/videos pinned to fixed frames
+            # so captures are reproducible, iframes/embeds swapped for cached
+            # posters, deck served over local HTTP instead of file://
+            with sync_playwright() as p, deck_page(
+                p,
+                viewport=plan.viewport,
+                device_scale_factor=plan.device_scale_factor,
+                freeze_media=freeze_media
+            ) as page:
+                print(f"Resolution: {describe(plan)}")
+
+                # Wait for initialization
+                print("Waiting for presentation to load...")
+                page.wait_for_timeout(5000)
+                apply_css_zoom(page, plan.css_zoom)
+
+                for slide_index, slide_id, num_states, slide_name in slide_config:
+                    slide_keys = [f'{slide_id}/state{state + 1}' for state in range(num_states)]
+                    keys.extend(slide_keys)
+                    if all(checkpoint.has(key) for key in slide_keys):
+                        print(f"\nSlide {slide_index} ({slide_id}) - {slide_name}: checkpointed, skipping")
+                        submit_checkpointed(pipeline, slide_keys)
+                        continue
+
+                    print(f"\nProcessing slide {slide_index} ({slide_id}) - {slide_name} ({num_states} state(s))...")
+
+                    # Navigate to slide (also hides the navigation UI), then wait for it to render
+                    goto_slide(page, slide_index, settle_ms=0)
+
+                    # Force high-quality image rendering
+                    page.evaluate('''
+                        () => {
+                            document.querySelectorAll('img').forEach(img => {
+                                img.style.imageRendering = 'high-quality';
+                                img.style.imageRendering = '-webkit-optimize-contrast';
+                            });
+                        }
                     ''')
-
-                    print(f"    State change result: {result}")
-
-                    # Wait for state change to render
                     page.wait_for_timeout(2500)
 
-                # Take high-resolution screenshot
-                screenshot_path = f'slide_{screenshot_counter:03d}_{slide_name}_state{state + 1}_4K.png' if num_states > 1 else f'slide_{screenshot_counter:03d}_{slide_name}_4K.png'
-                page.screenshot(
-                    path=screenshot_path,
-                    full_page=False,
-                    type='png'
-                )
-
-                # Get file size for verification
-                file_size = os.path.getsize(screenshot_path)
-                print(f"    ✓ Saved {screenshot_path} ({file_size:,} bytes)")
-                screenshots.append(screenshot_path)
-                screenshot_counter += 1
-
-        browser.close()
-
-    # Convert to PDF
-    print(f"\nCreating high-resolution PDF from {len(screenshots)} screenshots...")
-
-    if not screenshots:
-        print("ERROR: No screenshots were taken!")
-        return False
-
-    # Load all images and optionally resize for reasonable PDF size
-    images = []
-    for screenshot_path in screenshots:
-        if os.path.exists(screenshot_path):
-            print(f"  Loading {screenshot_path}")
-            img = Image.open(screenshot_path)
-
-            # Print original dimensions
-            print(f"    Original dimensions: {img.width}x{img.height}")
-
-            # Optional: Resize to a more reasonable size while maintaining quality
-            # 2560x1440 is still very high quality but more manageable
-            max_width = 2560
-            max_height = 1440
-
-            if img.width > max_width or img.height > max_height:
-                img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                print(f"    Resized to: {img.width}x{img.height}")
-
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    rgb_img.paste(img, mask=img.split()[3])
-                else:
-                    rgb_img.paste(img)
-                images.append(rgb_img)
-            else:
-                images.append(img)
-
-    if not images:
-        print("ERROR: No images were loaded!")
-        return False
-
-    # Save as multi-page PDF with high DPI
-    output_file = 'HTPAAC_HighRes.pdf'
-    print(f"\nSaving high-resolution PDF with {len(images)} pages...")
-    print("Note: This may take longer due to the high resolution...")
-
-    images[0].save(
-        output_file,
-        "PDF",
-        save_all=True,
-        append_images=images[1:] if len(images) > 1 else [],
-        resolution=150.0,  # Higher DPI for better quality
-        quality=95,  # High JPEG quality
-        optimize=True  # Optimize file size
-    )
+                    # Capture states
+                    previous = None
+                    steps = recipe_for(recipes, slide_id, num_states)
+                    for state, (key, step) in enumerate(zip(slide_keys, steps)):
+                        print(f"  Capturing state {state + 1}/{num_states} at {plan.output_size[0]}x{plan.output_size[1]}...")
+                        # Reach the state through its recipe (also needed to
+                        # reach later missing states)
+                        failed = run_step(page, slide_index, step, recipes['defaults'])
+                        if failed:
+                            print(f"    Warning: not ready ({', '.join(failed)})")
+                        fingerprint = slide_fingerprint(page)
+                        if fingerprint == previous:
+                            print(f"    ⚠️  Slide unchanged by the recipe, skipping state {state + 1}")
+                            checkpoint.skip(key, 'unchanged')
+                            continue
+                        previous = fingerprint
+                        if checkpoint.has(key):
+                            print("    ✓ Checkpointed")
+                            submit_checkpointed(pipeline, [key])
+                            continue
+
+                        # Take high-resolution screenshot
+                        suffix = f'_state{state + 1}' if num_states > 1 else ''
+                        name = f'slide_{slide_index:03d}_{slide_name}{suffix}.png'
+                        # Only the slide region: the black background around it
+                        # would otherwise be rasterized, encoded and embedded too.
+                        # The region is rendered at the planned output size, so
+                        # every page has the same size
+                        if clip_to_slide:
+                            frame = capture_slide(page, CLIP_PADDING, wait_media=freeze_media,
+                                                  output_size=plan.output_size)
+                        else:
+                            frame = capture_frame(page, wait_media=freeze_media, full_page=False)
+                        # Blocks only while the encoders are MAX_PENDING frames behind
+                        pipeline.submit(name, frame, partial(checkpoint.save, key, name))
+                        print(f"    ✓ Captured {name} ({frame.width}x{frame.height})")
+        except Exception as e:
+            # Let queued frames reach their checkpoint before reporting
+            pipeline.close()
+            print(f"\n❌ Export interrupted: {e}")
+            print(f"   {len(checkpoint)} state(s) checkpointed; run again with --resume to continue")
+            return False
+
+        # States whose recipe left the slide unchanged (not captured)
+        unchanged = [key for key in keys if checkpoint.entries.get(key, {}).get('skipped')]
+        if unchanged:
+            print(f"\n⚠️  {len(unchanged)} state(s) did not change the slide: {', '.join(unchanged)}")
+            if strict:
+                print("ERROR: Unchanged states with --strict")
+                return False
+
+        # Convert to PDF
+        print(f"\nCreating high-resolution PDF from {len(pipeline)} screenshots...")
+
+        if not len(pipeline):
+            print("ERROR: No screenshots were taken!")
+            return False
+
+        # Save as multi-page PDF with high DPI
+        output_file = 'HTPAAC_HighRes.pdf'
+        print(f"\nMerging {len(pipeline)} encoded pages...")
+
+        try:
+            file_size = pipeline.finish(output_file)
+        except Exception as e:
+            print(f"\n❌ Encoding failed: {e}")
+            print(f"   {len(checkpoint)} state(s) checkpointed; run again with --resume to continue")
+            return False
 
     print(f"✅ PDF created: {output_file}")
-    print(f"   Total pages: {len(images)}")
-
-    # File size
-    file_size = os.path.getsize(output_file)
+    print(f"   Total pages: {len(pipeline)}")
     print(f"   File size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)")
 
-    # Clean up temporary screenshots
-    print("\nCleaning up screenshots...")
-    for screenshot_path in screenshots:
-        if os.path.exists(screenshot_path):
-            os.remove(screenshot_path)
-    print("✅ Cleanup complete")
+    # Read back from the checkpoints, after the PDF so it is not delayed
+    if save_images:
+        save_frames(checkpoint.frames(keys), save_images)
+
+    # The output is complete; the checkpoints are no longer needed
+    checkpoint.clear()
 
     return True
 
 
 if __name__ == "__main__":
-    success = capture_high_res()
+    parser = argparse.ArgumentParser(description='Generate a high-resolution PDF with all slide states')
+    parser.add_argument('--save-images', metavar='DIR', default=None,
+                        help='Also write every captured frame as PNG into DIR')
+    parser.add_argument('--no-freeze', action='store_true', help='Do not pin animated media to fixed frames')
+    parser.add_argument('--full-viewport', action='store_true',
+                        help='Capture the whole viewport instead of clipping to the slide')
+    parser.add_argument('--width', type=int, default=2560, help='Output width in pixels (default: 2560)')
+    parser.add_argument('--height', type=int, default=1440, help='Output height in pixels (default: 1440)')
+    parser.add_argument('--page', choices=sorted(PAGE_SIZES), default=None,
+                        help='Size pages for this paper size instead of --width/--height')
+    parser.add_argument('--dpi', type=int, default=None, help='Output DPI (default: 150)')
+    parser.add_argument('--strict', action='store_true',
+                        help='Fail instead of skipping states whose recipe changed nothing')
+    parser.add_argument('--resume', action='store_true',
+                        help='Reuse frames checkpointed by an interrupted run with the same settings')
+    parser.add_argument('--encode-processes', type=int, default=0, metavar='N',
+                        help='Encode pages in N processes fed through shared memory (default: threads)')
+    parser.add_argument('--recipes', default=RECIPES_FILE, help='Capture recipe file (default: capture_recipes.json)')
+    args = parser.parse_args()
+
+    success = capture_high_res(not args.no_freeze, args.save_images, not args.full_viewport,
+                               args.width, args.height, args.page, args.dpi, args.strict, args.resume,
+                               args.encode_processes, args.recipes)
     if not success:
         print("\n❌ PDF generation failed!")
-        exit(1)
\ No newline at end of file
+        exit(1)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Declarative per-slide capture recipes
+
+capture_recipes.json (next to the SLIDE_CONFIG manifest in export_engine)
+describes, per slide id, the states to capture. Each state has a label, the
+actions that produce it and the readiness conditions to wait for before
+the screenshot. Slides without an entry get one default step per state
+(setState 0..n-1). Readiness is polled instead of slept, so slow slides
+only wait for themselves.
+
+Actions (run in order):
+    {"setState": 2}                       jump the current slide to state 2
+    {"click": "#p5js-vertical-tab"}       click an element
+    {"hover": ".accordion-card"}          move the mouse over an element
+    {"revealCodePanel": "#warmup-code-panel"}
+                                          slide a half-hidden code panel in
+    {"waitFor": "#hardmode-code-panel.visible"}
+                                          wait for a selector to be visible
+    {"key": "Space"}                      press a key
+    {"wait": 500}                         fixed wait in ms (last resort)
+
+Readiness conditions:
+    "fonts"        document.fonts finished loading
+    "images"       every visible image in the slide is decoded
+    "transitions"  no finite CSS animation/transition still running
+    "media"        frozen videos show their pinned frame
+    {"selector": "css"}   element is visible
+
+    from capture_recipes import load_recipes, run_recipes
+    for name, label, frame in run_recipes(page, load_recipes()):
+        ...
+
+Exporters with their own capture loop run one step at a time with
+run_step(page, slide_index, step, recipes['defaults']) over
+recipe_for(recipes, slide_id, num_states); run_actions_async /
+wait_ready_async / run_step_async drive the same steps on an async page
+(supervisor.py, export_viewports.py).
+
+Usage:
+    python capture_recipes.py            # validate and list the recipes
+"""
+
+import json
+from pathlib import Path
+
+from export_engine import GOTO_SLIDE_JS, HIDE_UI_SELECTORS, SLIDE_CONFIG, capture_frame, slide_fingerprint
+from freeze_media import wait_for_frozen_media, wait_for_frozen_media_async
+
+RECIPES_FILE = Path(__file__).parent / 'capture_recipes.json'
+
+ACTIONS = ('setState', 'click', 'hover', 'revealCodePanel', 'waitFor', 'key', 'wait')
+READY_CONDITIONS = ('fonts', 'images', 'transitions', 'media')
+
+# Unlike toggleSlideState() this jumps straight to a state, so a recipe
+# step never depends on how many toggles ran before it
+SET_STATE_JS = '''
+(args) => {
+    const [index, state] = args;
+    currentSlide = index;
+    slideStates[index] = state;
+    triggerSlideStateChange(index, state);
+    if (typeof updateSlideNote === 'function') updateSlideNote(index, state);
+    return slideStates[index];
+}
+'''
+
+REVEAL_PANEL_JS = '''
+(selector) => {
+    const panel = document.querySelector(selector);
+    if (panel) panel.classList.add('visible', 'revealed');
+    return !!panel;
+}
+'''
+
+READY_JS = {
+    'fonts': "() => document.fonts.status === 'loaded'",
+    'images': '''
+        () => Array.from(document.querySelectorAll('.slide.active img, .warmup-code-panel img'))
+            .filter(img => img.offsetParent !== null)
+            .every(img => img.complete)
+    ''',
+    'transitions': '''
+        () => document.getAnimations().every(a =>
+            a.playState !== 'running' || a.effect.getTiming().iterations === Infinity)
+    ''',
+}
+
+
+def load_recipes(path=RECIPES_FILE):
+    """Parse and validate the recipe file"""
+    with open(path, encoding='utf-8') as f:
+        recipes = json.load(f)
+    recipes.setdefault('defaults', {})
+    recipes.setdefault('slides', {})
+
+    known = {slide_id: states for _, slide_id, states, _ in SLIDE_CONFIG}
+    for slide_id, steps in recipes['slides'].items():
+        if slide_id not in known:
+            raise ValueError(f"Recipe for unknown slide '{slide_id}'")
+        if len(steps) != known[slide_id]:
+            raise ValueError(f"Recipe for {slide_id} has {len(steps)} states, SLIDE_CONFIG says {known[slide_id]}")
+        for step in steps:
+            for action in step.get('actions', []):
+                if len(action) != 1 or next(iter(action)) not in ACTIONS:
+                    raise ValueError(f"Invalid action in {slide_id}: {action}")
+            for condition in step.get('ready', []):
+                if isinstance(condition, dict) and 'selector' in condition:
+                    continue
+                if condition not in READY_CONDITIONS:
+                    raise ValueError(f"Invalid ready condition in {slide_id}: {condition}")
+    return recipes
+
+
+def recipe_for(recipes, slide_id, num_states):
+    """The slide's recipe steps, or one setState step per state"""
+    if slide_id in recipes['slides']:
+        return recipes['slides'][slide_id]
+    return [{}] + [{'actions': [{'setState': state}]} for state in range(1, num_states)]
+
+
+def run_actions(page, slide_index, actions, timeout_ms):
+    for action in actions:
+        (kind, value), = action.items()
+        if kind == 'setState':
+            page.evaluate(SET_STATE_JS, [slide_index, value])
+        elif kind == 'click':
+            page.click(value, timeout=timeout_ms)
+        elif kind == 'hover':
+            page.hover(value, timeout=timeout_ms)
+        elif kind == 'revealCodePanel':
+            page.wait_for_selector(value, state='attached', timeout=timeout_ms)
+            page.evaluate(REVEAL_PANEL_JS, value)
+        elif kind == 'waitFor':
+            page.wait_for_selector(value, state='visible', timeout=timeout_ms)
+        elif kind == 'key':
+            page.keyboard.press(value)
+        elif kind == 'wait':
+            page.wait_for_timeout(value)
+
+
+def wait_ready(page, conditions, timeout_ms):
+    """Poll the readiness conditions; returns the ones that timed out"""
+    failed = []
+    for condition in conditions:
+        try:
+            if isinstance(condition, dict):
+                page.wait_for_selector(condition['selector'], state='visible', timeout=timeout_ms)
+            elif condition == 'media':
+                wait_for_frozen_media(page, timeout_ms)
+            else:
+                page.wait_for_function(READY_JS[condition], timeout=timeout_ms)
+        except Exception:
+            failed.append(condition if isinstance(condition, str) else condition['selector'])
+    return failed
+
+
+def run_step(page, slide_index, step, defaults):
+    """
+    One recipe step: its actions, the readiness conditions, then the settle
+    time. Returns the conditions that timed out.
+    """
+    timeout_ms = defaults.get('timeout_ms', 8000)
+    run_actions(page, slide_index, step.get('actions', []), timeout_ms)
+    failed = wait_ready(page, step.get('ready', defaults.get('ready', [])), timeout_ms)
+    page.wait_for_timeout(step.get('settle_ms', defaults.get('settle_ms', 150)))
+    return failed
+
+
+async def run_actions_async(page, slide_index, actions, timeout_ms):
+    for action in actions:
+        (kind, value), = action.items()
+        if kind == 'setState':
+            await page.evaluate(SET_STATE_JS, [slide_index, value])
+        elif kind == 'click':
+            await page.click(value, timeout=timeout_ms)
+        elif kind == 'hover':
+            await page.hover(value, timeout=timeout_ms)
+        elif kind == 'revealCodePanel':
+            await page.wait_for_selector(value, state='attached', timeout=timeout_ms)
+            await page.evaluate(REVEAL_PANEL_JS, value)
+        elif kind == 'waitFor':
+            await page.wait_for_selector(value, state='visible', timeout=timeout_ms)
+        elif kind == 'key':
+            await page.keyboard.press(value)
+        elif kind == 'wait':
+            await page.wait_for_timeout(value)
+
+
+async def wait_ready_async(page, conditions, timeout_ms):
+    failed = []
+    for condition in conditions:
+        try:
+            if isinstance(condition, dict):
+                await page.wait_for_selector(condition['selector'], state='visible', timeout=timeout_ms)
+            elif condition == 'media':
+                await wait_for_frozen_media_async(page, timeout_ms)
+            else:
+                await page.wait_for_function(READY_JS[condition], timeout=timeout_ms)
+        except Exception:
+            failed.append(condition if isinstance(condition, str) else condition['selector'])
+    return failed
+
+
+async def run_step_async(page, slide_index, step, defaults):
+    """run_step() on an async page"""
+    timeout_ms = defaults.get('timeout_ms', 8000)
+    await run_actions_async(page, slide_index, step.get('actions', []), timeout_ms)
+    failed = await wait_ready_async(page, step.get('ready', defaults.get('ready', [])), timeout_ms)
+    await page.wait_for_timeout(step.get('settle_ms', defaults.get('settle_ms', 150)))
+    return failed
+
+
+def run_recipes(page, recipes=None, slide_config=SLIDE_CONFIG, capture=None, check=True, skipped=None):
+    """
+    Drive every slide/state through its recipe and capture it.
+    Yields (frame name, label, frame); states whose actions left the slide
+    unchanged (slide_fingerprint) are skipped with a warning when check is
+    on, and listed in skipped if given. capture defaults to
+    capture_frame(page, wait_media=False) since media readiness is a recipe
+    condition.
+    """
+    recipes = recipes or load_recipes()
+    defaults = recipes['defaults']
+    timeout_ms = defaults.get('timeout_ms', 8000)
+    capture = capture or (lambda: capture_frame(page, wait_media=False))
+    count = 0
+
+    for slide_index, slide_id, num_states, slide_name in slide_config:
+        print(f"\nProcessing {slide_id} ({num_states} state(s))...")
+        page.evaluate(GOTO_SLIDE_JS, [slide_index, HIDE_UI_SELECTORS])
+        previous = None
+
+        for state, step in enumerate(recipe_for(recipes, slide_id, num_states)):
+            failed = run_step(page, slide_index, step, defaults)
+            if failed:
+                print(f"    Warning: not ready ({', '.join(failed)}) after {timeout_ms} ms")
+
+            if check:
+                fingerprint = slide_fingerprint(page)
+                if fingerprint == previous:
+                    print(f"    ⚠️  State {state + 1} did not change {slide_id}, skipping capture")
+                    if skipped is not None:
+                        skipped.append(f'{slide_id} state {state + 1}')
+                    continue
+                previous = fingerprint
+
+            suffix = f'_state{state + 1}' if num_states > 1 else ''
+            name = f"slide_{count:03d}_{slide_id.replace('slide-', '')}{suffix}.png"
+            label = step.get('label', '')
+            yield name, label, capture()
+            count += 1
+
+
+if __name__ == "__main__":
+    recipes = load_recipes()
+    print(f"✓ {RECIPES_FILE.name} is valid")
+    for _, slide_id, num_states, slide_name in SLIDE_CONFIG:
+        steps = recipe_for(recipes, slide_id, num_states)
+        custom = '' if slide_id in recipes['slides'] else ' (default)'
+        labels = ', '.join(step.get('label', f'state {n + 1}') for n, step in enumerate(steps))
+        print(f"  {slide_id:<10} {slide_name:<12} {labels}{custom}")
@@ -9,6 +9,8 @@ import sys
 from pathlib import Path
 from PyPDF2 import PdfMerger
 
+from export_workspace import export_workspace
+
 try:
     from playwright.sync_api import sync_playwright
 except ImportError:
@@ -32,7 +34,8 @@ def capture_all_slides(input_file='index.html', output_file='HTPAAC_MacBook.pdf'
     print()
 
     try:
-        with sync_playwright() as p:
+        # Per-slide PDFs go to a private workspace, removed afterwards
+        with export_workspace() as workspace, sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page()
 
@@ -109,7 +112,7 @@ def capture_all_slides(input_file='index.html', output_file='HTPAAC_MacBook.pdf'
 
                 # Generate PDF for this slide
                 # Using custom size to better match MacBook Pro aspect ratio (16:10)
-                temp_pdf_path = f'/tmp/slide_{i:03d}.pdf'
+                temp_pdf_path = str(workspace / f'slide_{i:03d}.pdf')
                 page.pdf(
                     path=temp_pdf_path,
                     width='11in',  # Letter width for better screen fit
@@ -139,13 +142,6 @@ def capture_all_slides(input_file='index.html', output_file='HTPAAC_MacBook.pdf'
             merger.write(output_file)
             merger.close()
 
-            # Clean up temp files
-            for pdf_path in temp_pdfs:
-                try:
-                    os.unlink(pdf_path)
-                except:
-                    pass
-
             print(f"\n✅ PDF successfully created: {output_file}")
             print(f"File size: {os.path.getsize(output_file):,} bytes")
             return True
@@ -4,9 +4,8 @@ PDF generation using space key to change states
 Much simpler approach!
 """
 
-import os
+import argparse
 from pathlib import Path
-from PIL import Image
 
 try:
     from playwright.sync_api import sync_playwright
@@ -15,8 +14,10 @@ except ImportError:
     print("Install with: pip install playwright && playwright install chromium")
     exit(1)
 
+from export_engine import capture_frame, save_frames, write_pdf
 
-def capture_states_simple():
+
+def capture_states_simple(save_images=None):
     """Generate PDF with all slide states using space key"""
 
     # Map slides to their state counts
@@ -108,8 +109,7 @@ def capture_states_simple():
                     screenshot_path = f'slide_{screenshot_counter:03d}_{slide_name.replace(" ", "_")}.png'
                     print(f"  Single state: {screenshot_path}")
 
-                page.screenshot(path=screenshot_path, full_page=False)
-                screenshots.append(screenshot_path)
+                screenshots.append((screenshot_path, capture_frame(page, full_page=False)))
                 screenshot_counter += 1
 
         browser.close()
@@ -123,39 +123,16 @@ def capture_states_simple():
         print("ERROR: No screenshots were taken!")
         return False
 
-    # Load all images
-    images = []
-    for screenshot_path in screenshots:
-        if os.path.exists(screenshot_path):
-            img = Image.open(screenshot_path)
-
-            # Convert to RGB
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    rgb_img.paste(img, mask=img.split()[3])
-                else:
-                    rgb_img.paste(img)
-                images.append(rgb_img)
-            else:
-                images.append(img)
-        print(f"  ✓ Processed: {screenshot_path}")
-
-    if not images:
-        print("ERROR: No images were loaded!")
-        return False
+    if save_images:
+        save_frames(screenshots, save_images)
+
+    images = [frame for _, frame in screenshots]
 
     # Save as PDF
     output_file = 'HTPAAC_Final.pdf'
     print(f"\nGenerating PDF...")
 
-    images[0].save(
-        output_file,
-        "PDF",
-        save_all=True,
-        append_images=images[1:] if len(images) > 1 else [],
-        resolution=100.0
-    )
+    file_size = write_pdf(images, output_file, resolution=100.0)
 
     print(f"\n{'='*60}")
     print(f"✅ SUCCESS! PDF created: {output_file}")
@@ -166,23 +143,19 @@ def capture_states_simple():
     expected = sum(config[3] for config in slide_config)
     print(f"   Expected pages: {expected}")
 
-    file_size = os.path.getsize(output_file)
     print(f"   File size: {file_size:,} bytes ({file_size/1024/1024:.1f} MB)")
     print(f"{'='*60}\n")
 
-    # Optional: Clean up screenshots
-    # print("\nCleaning up screenshots...")
-    # for screenshot_path in screenshots:
-    #     try:
-    #         os.remove(screenshot_path)
-    #     except:
-    #         pass
-
     return True
 
 
 if __name__ == "__main__":
-    success = capture_states_simple()
+    parser = argparse.ArgumentParser(description='Generate a PDF with all slide states')
+    parser.add_argument('--save-images', metavar='DIR', default=None,
+                        help='Also write every captured frame as PNG into DIR')
+    args = parser.parse_args()
+
+    success = capture_states_simple(args.save_images)
     if not success:
         print("\n❌ PDF generation failed!")
         exit(1)
\ No newline at end of file
@@ -4,9 +4,8 @@ PDF generation that properly captures all slide states
 by triggering the JavaScript state handlers
 """
 
-import os
+import argparse
 from pathlib import Path
-from PIL import Image
 
 try:
     from playwright.sync_api import sync_playwright
@@ -15,8 +14,10 @@ except ImportError:
     print("Install with: pip install playwright && playwright install chromium")
     exit(1)
 
+from export_engine import capture_frame, save_frames, write_pdf
 
-def capture_with_states():
+
+def capture_with_states(save_images=None):
     """Generate PDF with all slide states properly rendered"""
 
     # Map slide indices to their state counts
@@ -161,8 +162,7 @@ def capture_with_states():
                 else:
                     screenshot_path = f'slide_{screenshot_counter:03d}_{slide_name.replace(" ", "_")}.png'
 
-                page.screenshot(path=screenshot_path, full_page=False)
-                screenshots.append(screenshot_path)
+                screenshots.append((screenshot_path, capture_frame(page, full_page=False)))
                 print(f"    ✓ Captured: {screenshot_path}")
                 screenshot_counter += 1
 
@@ -177,39 +177,16 @@ def capture_with_states():
         print("ERROR: No screenshots were taken!")
         return False
 
-    # Load all images
-    images = []
-    for screenshot_path in screenshots:
-        if os.path.exists(screenshot_path):
-            print(f"  Processing: {screenshot_path}")
-            img = Image.open(screenshot_path)
-
-            # Convert to RGB
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    rgb_img.paste(img, mask=img.split()[3])
-                else:
-                    rgb_img.paste(img)
-                images.append(rgb_img)
-            else:
-                images.append(img)
+    if save_images:
+        save_frames(screenshots, save_images)
 
-    if not images:
-        print("ERROR: No images were loaded!")
-        return False
+    images = [frame for _, frame in screenshots]
 
     # Save as PDF
     output_file = 'HTPAAC_Complete_With_States.pdf'
     print(f"\nGenerating PDF with {len(images)} pages...")
 
-    images[0].save(
-        output_file,
-        "PDF",
-        save_all=True,
-        append_images=images[1:] if len(images) > 1 else [],
-        resolution=100.0
-    )
+    file_size = write_pdf(images, output_file, resolution=100.0)
 
     print(f"\n{'='*60}")
     print(f"✅ SUCCESS! PDF created: {output_file}")
@@ -220,7 +197,6 @@ def capture_with_states():
     expected = sum(config[3] for config in slide_config)
     print(f"   Expected pages: {expected}")
 
-    file_size = os.path.getsize(output_file)
     print(f"   File size: {file_size:,} bytes ({file_size/1024/1024:.1f} MB)")
     print(f"{'='*60}\n")
 
@@ -228,7 +204,12 @@ def capture_with_states():
 
 
 if __name__ == "__main__":
-    success = capture_with_states()
+    parser = argparse.ArgumentParser(description='Generate a PDF with all slide states')
+    parser.add_argument('--save-images', metavar='DIR', default=None,
+                        help='Also write every captured frame as PNG into DIR')
+    args = parser.parse_args()
+
+    success = capture_with_states(args.save_images)
     if not success:
         print("\n❌ PDF generation failed!")
         exit(1)
\ No newline at end of file
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Raw frame capture into NumPy arrays through a CDP session
+
+page.screenshot() always returns an encoded image that Python then decodes
+through Pillow into yet another buffer. For pipelines that keep processing
+frames (downscale, crop, diff, composite) this backend calls
+Page.captureScreenshot directly:
+
+- PNG with optimizeForSpeed (fast zlib level, lossless) by default, or JPEG
+  when a lossy frame is acceptable
+- decoded with OpenCV when it is installed (one decode straight into a
+  NumPy buffer), otherwise with Pillow
+- returned as an (height, width, channels) uint8 RGB(A) array
+
+to_image() hands an array to Pillow-based encoders without copying when the
+layout allows it.
+
+    from cdp_capture import CDPCapture
+    capture = CDPCapture(page)
+    frame = capture.capture(clip=slide_clip(page))   # numpy array
+    capture.close()
+
+Compare against the PNG path with: python bench_capture.py
+"""
+
+import base64
+import io
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: NumPy is required")
+    print("Install with: pip install numpy")
+    exit(1)
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+CV2_AVAILABLE = False
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    pass
+
+FORMATS = ('png', 'jpeg', 'webp')
+
+
+def decode_frame(data):
+    """Encoded screenshot bytes -> (H, W, 3|4) uint8 RGB(A) array"""
+    if CV2_AVAILABLE:
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+        if frame is not None:
+            code = cv2.COLOR_BGRA2RGBA if frame.shape[2] == 4 else cv2.COLOR_BGR2RGB
+            # In place: no second full-size buffer
+            return cv2.cvtColor(frame, code, dst=frame)
+
+    with Image.open(io.BytesIO(data)) as img:
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() else 'RGB')
+        # np.array on a decoded image is a single copy out of Pillow's buffer
+        return np.array(img)
+
+
+def to_image(frame):
+    """Pillow image over a frame array (shares the buffer when contiguous)"""
+    mode = 'RGBA' if frame.shape[2] == 4 else 'RGB'
+    if mode == 'RGBA' and frame.flags['C_CONTIGUOUS']:
+        return Image.frombuffer(mode, (frame.shape[1], frame.shape[0]), frame, 'raw', mode, 0, 1)
+    return Image.fromarray(np.ascontiguousarray(frame), mode)
+
+
+class CDPCapture:
+    """Screenshots through Page.captureScreenshot, returned as NumPy arrays"""
+
+    def __init__(self, page, format='png', quality=90, optimize_for_speed=True):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        self.page = page
+        self.format = format
+        self.quality = quality
+        self.optimize_for_speed = optimize_for_speed
+        self.session = page.context.new_cdp_session(page)
+
+    def capture_bytes(self, clip=None, scale=1, beyond_viewport=False):
+        """
+        Encoded screenshot; clip in CSS px as returned by slide_clip(). With
+        beyond_viewport the clip is in page coordinates and may extend past
+        the viewport (e.g. a region of a tall page).
+        """
+        params = {
+            'format': self.format,
+            'fromSurface': True,
+            'captureBeyondViewport': beyond_viewport,
+            'optimizeForSpeed': self.optimize_for_speed,
+        }
+        if self.format != 'png':
+            params['quality'] = self.quality
+        if clip:
+            params['clip'] = {**clip, 'scale': scale}
+        return base64.b64decode(self.session.send('Page.captureScreenshot', params)['data'])
+
+    def capture(self, clip=None, scale=1, beyond_viewport=False):
+        return decode_frame(self.capture_bytes(clip, scale, beyond_viewport))
+
+    def close(self):
+        try:
+            self.session.detach()
+        except Exception:
+            pass
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Deck build pipeline
+
+Builds an optimized copy of the deck into dist/ without touching the source
+files. The sources are staged into dist/ first and each step then rewrites
+dist/ in place:
+
+    python deck_build.py              # clean stage + all steps
+    python deck_build.py --skip images
+
+Individual steps can also be run on their own (python optimize_images.py);
+they stage dist/ if it does not exist yet. Expensive outputs are cached in
+.build_cache/ keyed by input hashes, so unchanged inputs are skipped.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+from pathlib import Path
+
+DECK_ROOT = Path(__file__).resolve().parent.parent
+DIST_ROOT = DECK_ROOT / 'dist'
+BUILD_CACHE = DECK_ROOT / '.build_cache'
+
+TEXT_SOURCES = ['index.html', 'script.js', 'styles.css', 'sw.js']
+
+FONT_REF = re.compile(r'''url\(\s*['"]?\.?/?(Terminus/[^'")]+)['"]?\s*\)''')
+
+# Stylesheet rules keyed on a file name, e.g. .slide img[src*="Kong et al., 2024.png"]
+SRC_SELECTOR = re.compile(r'''\[src\*=\s*(["']?)([^"'\]]+)\1\s*\]''')
+SRC_VALUE = re.compile(r'''\ssrc=(["'])(.*?)\1''', re.S)
+
+
+def file_digest(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def stage_deck(dist=DIST_ROOT, root=DECK_ROOT, clean=True):
+    """Copy the deck sources into dist (only the fonts styles.css uses)"""
+    dist, root = Path(dist), Path(root)
+    if clean and dist.exists():
+        shutil.rmtree(dist)
+    dist.mkdir(parents=True, exist_ok=True)
+
+    for name in TEXT_SOURCES:
+        if (root / name).exists():
+            shutil.copy2(root / name, dist / name)
+
+    shutil.copytree(root / 'img', dist / 'img', dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns('.DS_Store'))
+
+    css = (root / 'styles.css').read_text(encoding='utf-8')
+    for font in sorted(set(FONT_REF.findall(css))):
+        (dist / font).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(root / font, dist / font)
+
+    print(f"Staged deck into {dist}")
+    return dist
+
+
+def ensure_staged(dist=DIST_ROOT):
+    """Stage dist only if it has not been built yet"""
+    if not (Path(dist) / 'index.html').exists():
+        stage_deck(dist)
+    return Path(dist)
+
+
+def src_selectors(dist=DIST_ROOT):
+    """Values of the [src*=...] selectors in the stylesheets of dist"""
+    values = set()
+    for css_path in sorted(Path(dist).glob('*.css')):
+        values.update(m.group(2) for m in SRC_SELECTOR.finditer(css_path.read_text(encoding='utf-8')))
+    return values
+
+
+def targets_src_selector(src, selectors):
+    """True when a src (as written in the markup) is styled by one of the selectors"""
+    return any(value in src for value in selectors)
+
+
+def unmatched_src_selectors(dist=DIST_ROOT):
+    """
+    [src*=...] selector values that no src= in index.html or script.js
+    contains any more, e.g. because a step renamed the image they style
+    """
+    dist = Path(dist)
+    srcs = []
+    for text_path in [dist / 'index.html', *sorted(dist.glob('script*.js'))]:
+        if text_path.exists():
+            srcs.extend(m.group(2) for m in SRC_VALUE.finditer(text_path.read_text(encoding='utf-8')))
+    return sorted(value for value in src_selectors(dist) if not any(value in src for src in srcs))
+
+
+class HashCache:
+    """
+    JSON record of input hashes and the outputs they produced.
+    An entry is fresh when the input hash and parameters match and all of its
+    outputs still exist.
+    """
+
+    def __init__(self, name, cache_dir=BUILD_CACHE):
+        self.dir = Path(cache_dir)
+        self.path = self.dir / f'{name}.json'
+        try:
+            self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, key, digest, params=None):
+        entry = self.entries.get(key)
+        if not entry or entry.get('hash') != digest or entry.get('params') != params:
+            return None
+        if not all((self.dir / output).exists() for output in entry.get('outputs', [])):
+            return None
+        return entry
+
+    def store(self, key, digest, params=None, outputs=(), **extra):
+        self.entries[key] = {'hash': digest, 'params': params, 'outputs': list(outputs), **extra}
+
+    def save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+
+
+def main():
+    # Steps import deck_build themselves, so load them lazily
+    import hash_assets
+    import minify_deck
+    import optimize_images
+    import subset_fonts
+    import transcode_gifs
+
+    steps = [
+        ('images', optimize_images.optimize_images),
+        ('gifs', transcode_gifs.transcode_gifs),
+        ('fonts', subset_fonts.subset_fonts),
+        ('minify', minify_deck.minify_deck),
+        # Must stay last: renames everything the other steps produced
+        ('hash', hash_assets.hash_assets),
+    ]
+
+    parser = argparse.ArgumentParser(description='Build an optimized copy of the deck into dist/')
+    parser.add_argument('--dist', default=str(DIST_ROOT), help='Output directory (default: dist/)')
+    parser.add_argument('--skip', action='append', default=[], choices=[name for name, _ in steps],
+                        help='Skip a build step (repeatable)')
+    args = parser.parse_args()
+
+    dist = stage_deck(args.dist)
+    for name, step in steps:
+        if name in args.skip:
+            print(f"\n--- Skipping {name} ---")
+            continue
+        print(f"\n--- {name} ---")
+        if step(dist) is False:
+            print(f"\n❌ Build step '{name}' failed")
+            exit(1)
+
+    unmatched = unmatched_src_selectors(dist)
+    if unmatched:
+        print("\n❌ styles.css [src*=...] selectors no longer match any tag:")
+        for value in unmatched:
+            print(f"   {value}")
+        exit(1)
+
+    print(f"\n✅ Deck built in {dist}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Export-mode poster substitution for heavy embeds
+
+Replaces iframes (e.g. the YouTube player injected by
+handleFabricationSlideState) and other embeds with static poster images of
+the same size, and serves remote images (e.g. the p5.js accordion logo) from
+a local cache. Posters are generated once and cached on disk, so captures
+never spin up a video player or wait on remote hosts.
+
+Usage from a capture script:
+
+    from embed_posters import install_embed_posters
+    page = context.new_page()
+    install_embed_posters(page)
+    page.goto(url)
+
+install_embed_posters_async() does the same for the async Playwright API.
+"""
+
+import asyncio
+import hashlib
+import io
+import re
+import urllib.request
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+
+CACHE_DIR = Path(__file__).parent / '.export_cache'
+
+# Fake origin used for poster requests; fulfilled by a Playwright route
+POSTER_ORIGIN = 'https://htpaac-export.invalid'
+
+# Requests belonging to embedded players that should never load during export
+BLOCKED_EMBED_PATTERNS = [
+    '**/www.youtube.com/embed/**',
+    '**/www.youtube-nocookie.com/embed/**',
+    '**/player.vimeo.com/**',
+    '**/googlevideo.com/**',
+]
+
+DEFAULT_POSTER_SIZE = (1280, 720)
+
+# Remote requests eligible for the image cache; the local deck server
+# (localhost) is never cached
+REMOTE_URL = re.compile(r'^https?://(?!htpaac-export\.invalid|localhost[:/]|127\.0\.0\.1[:/])')
+
+# Runs in every frame before the deck scripts; swaps embeds for poster <img>s
+EMBED_POSTER_JS = '''
+(() => {
+    const POSTER_ORIGIN = '%(origin)s';
+    const SELECTOR = 'iframe, embed, object';
+
+    function replaceEmbed(el) {
+        if (el.dataset.htpaacPoster) return;
+        const src = el.getAttribute('src') || el.getAttribute('data') || '';
+        if (!src) return;
+
+        const rect = el.getBoundingClientRect();
+        const dpr = window.devicePixelRatio || 1;
+        const width = Math.round((rect.width || %(width)d) * dpr);
+        const height = Math.round((rect.height || %(height)d) * dpr);
+
+        const poster = document.createElement('img');
+        poster.dataset.htpaacPoster = '1';
+        poster.dataset.embedSrc = src;
+        poster.alt = el.getAttribute('title') || 'Embedded media';
+        if (el.className) poster.className = el.className;
+        // Keep the embed's own sizing so the layout is unchanged
+        poster.setAttribute('style', (el.getAttribute('style') || '') + '; object-fit: cover; display: block;');
+        poster.src = `${POSTER_ORIGIN}/poster?src=${encodeURIComponent(src)}&w=${width}&h=${height}`;
+        el.replaceWith(poster);
+    }
+
+    function scan(root) {
+        if (root.matches && root.matches(SELECTOR)) replaceEmbed(root);
+        if (root.querySelectorAll) root.querySelectorAll(SELECTOR).forEach(replaceEmbed);
+    }
+
+    const observer = new MutationObserver(mutations => {
+        mutations.forEach(m => m.addedNodes.forEach(node => {
+            if (node.nodeType === 1) scan(node);
+        }));
+    });
+
+    document.addEventListener('DOMContentLoaded', () => scan(document));
+    observer.observe(document, { childList: true, subtree: true });
+})();
+'''
+
+
+def _cache_key(*parts):
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+
+def youtube_video_id(url):
+    """Extract the video id from a YouTube embed/watch URL, or None"""
+    parsed = urlparse(url)
+    if 'youtube' not in parsed.netloc and 'youtu.be' not in parsed.netloc:
+        return None
+    match = re.search(r'/(?:embed|v|shorts)/([A-Za-z0-9_-]{6,})', parsed.path)
+    if match:
+        return match.group(1)
+    if parsed.netloc.endswith('youtu.be'):
+        return parsed.path.strip('/') or None
+    return parse_qs(parsed.query).get('v', [None])[0]
+
+
+def _fetch(url, timeout=10):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def _fit_cover(img, size):
+    """Scale and center-crop an image so it fills size exactly"""
+    width, height = size
+    scale = max(width / img.width, height / img.height)
+    resized = img.resize(
+        (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+        Image.Resampling.LANCZOS
+    )
+    left = (resized.width - width) // 2
+    top = (resized.height - height) // 2
+    return resized.crop((left, top, left + width, top + height))
+
+
+def _placeholder_poster(size):
+    """Dark poster with a play symbol, used when no thumbnail is available"""
+    width, height = size
+    img = Image.new('RGB', size, (17, 17, 17))
+    draw = ImageDraw.Draw(img)
+    radius = max(8, min(width, height) // 6)
+    cx, cy = width // 2, height // 2
+    draw.ellipse((cx - radius, cy - radius, cx + radius, cy + radius), fill=(255, 20, 147))
+    draw.polygon([
+        (cx - radius // 3, cy - radius // 2),
+        (cx - radius // 3, cy + radius // 2),
+        (cx + radius // 2, cy),
+    ], fill=(255, 255, 255))
+    return img
+
+
+def poster_for_embed(src, size, cache_dir=CACHE_DIR):
+    """
+    Return PNG bytes for a poster of the given embed src at size (w, h).
+    Posters are cached under cache_dir/posters, keyed by src and size.
+    """
+    size = (max(1, int(size[0])), max(1, int(size[1])))
+    poster_dir = Path(cache_dir) / 'posters'
+    poster_path = poster_dir / f'{_cache_key(src, *size)}.png'
+    if poster_path.exists():
+        return poster_path.read_bytes()
+
+    poster = None
+    video_id = youtube_video_id(src)
+    if video_id:
+        for name in ('maxresdefault', 'hqdefault'):
+            try:
+                data = _fetch(f'https://i.ytimg.com/vi/{video_id}/{name}.jpg')
+                poster = _fit_cover(Image.open(io.BytesIO(data)).convert('RGB'), size)
+                break
+            except Exception:
+                continue
+
+    if poster is None:
+        poster = _placeholder_poster(size)
+
+    buffer = io.BytesIO()
+    poster.save(buffer, 'PNG', optimize=True)
+    poster_dir.mkdir(parents=True, exist_ok=True)
+    poster_path.write_bytes(buffer.getvalue())
+    return buffer.getvalue()
+
+
+def _poster_query(url):
+    query = parse_qs(urlparse(url).query)
+    src = query.get('src', [''])[0]
+    try:
+        width = int(query.get('w', [DEFAULT_POSTER_SIZE[0]])[0])
+        height = int(query.get('h', [DEFAULT_POSTER_SIZE[1]])[0])
+    except ValueError:
+        width, height = DEFAULT_POSTER_SIZE
+    return src, (width or DEFAULT_POSTER_SIZE[0], height or DEFAULT_POSTER_SIZE[1])
+
+
+def _handle_poster(route, cache_dir):
+    src, size = _poster_query(route.request.url)
+    route.fulfill(status=200, content_type='image/png', body=poster_for_embed(src, size, cache_dir))
+
+
+def _remote_cache_paths(url, cache_dir):
+    remote_dir = Path(cache_dir) / 'remote'
+    key = _cache_key(url)
+    return remote_dir / key, remote_dir / f'{key}.type'
+
+
+def _store_remote(body_path, type_path, body, content_type):
+    body_path.parent.mkdir(parents=True, exist_ok=True)
+    body_path.write_bytes(body)
+    type_path.write_text(content_type or 'application/octet-stream')
+
+
+def _handle_remote_image(route, cache_dir):
+    """Serve remote images from the disk cache, fetching each one only once"""
+    request = route.request
+    if request.resource_type != 'image' or urlparse(request.url).scheme not in ('http', 'https'):
+        route.fallback()
+        return
+
+    body_path, type_path = _remote_cache_paths(request.url, cache_dir)
+    if body_path.exists() and type_path.exists():
+        route.fulfill(status=200, content_type=type_path.read_text(), body=body_path.read_bytes())
+        return
+
+    try:
+        response = route.fetch()
+    except Exception:
+        route.abort()
+        return
+
+    if response.ok:
+        _store_remote(body_path, type_path, response.body(), response.headers.get('content-type'))
+    route.fulfill(response=response)
+
+
+def _poster_script():
+    return EMBED_POSTER_JS % {
+        'origin': POSTER_ORIGIN,
+        'width': DEFAULT_POSTER_SIZE[0],
+        'height': DEFAULT_POSTER_SIZE[1],
+    }
+
+
+def install_embed_posters(page, cache_dir=CACHE_DIR, cache_remote_images=True):
+    """
+    Put a page (or browser context) into export mode: embeds are swapped
+    for cached posters and embedded players are never loaded.
+    Must be called before navigating to the deck.
+    """
+    page.add_init_script(_poster_script())
+
+    for pattern in BLOCKED_EMBED_PATTERNS:
+        page.route(pattern, lambda route: route.abort())
+
+    page.route(f'{POSTER_ORIGIN}/**', lambda route: _handle_poster(route, cache_dir))
+
+    if cache_remote_images:
+        # Registered last so it is consulted first; non-images fall through
+        page.route(REMOTE_URL, lambda route: _handle_remote_image(route, cache_dir))
+
+
+async def _handle_poster_async(route, cache_dir):
+    src, size = _poster_query(route.request.url)
+    # Poster generation may fetch a thumbnail; keep it off the event loop
+    body = await asyncio.to_thread(poster_for_embed, src, size, cache_dir)
+    await route.fulfill(status=200, content_type='image/png', body=body)
+
+
+async def _handle_remote_image_async(route, cache_dir):
+    request = route.request
+    if request.resource_type != 'image' or urlparse(request.url).scheme not in ('http', 'https'):
+        await route.fallback()
+        return
+
+    body_path, type_path = _remote_cache_paths(request.url, cache_dir)
+    if body_path.exists() and type_path.exists():
+        await route.fulfill(status=200, content_type=type_path.read_text(), body=body_path.read_bytes())
+        return
+
+    try:
+        response = await route.fetch()
+    except Exception:
+        await route.abort()
+        return
+
+    if response.ok:
+        _store_remote(body_path, type_path, await response.body(), response.headers.get('content-type'))
+    await route.fulfill(response=response)
+
+
+async def install_embed_posters_async(page, cache_dir=CACHE_DIR, cache_remote_images=True):
+    """install_embed_posters() for an async API page or context"""
+    await page.add_init_script(_poster_script())
+
+    for pattern in BLOCKED_EMBED_PATTERNS:
+        await page.route(pattern, lambda route: route.abort())
+
+    await page.route(f'{POSTER_ORIGIN}/**', lambda route: _handle_poster_async(route, cache_dir))
+
+    if cache_remote_images:
+        await page.route(REMOTE_URL, lambda route: _handle_remote_image_async(route, cache_dir))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Pre-generate cached posters for embeds')
+    parser.add_argument('src', nargs='+', help='Embed URL(s), e.g. https://www.youtube.com/embed/ljOoGyCso8s')
+    parser.add_argument('--size', default='1280x720', help='Poster size in pixels (default: 1280x720)')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    for src in args.src:
+        data = poster_for_embed(src, (width, height))
+        print(f"✓ Poster for {src}: {len(data):,} bytes")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Per-frame checkpoints for crash-resumable exports
+
+A long export used to keep every frame in memory until the PDF was written,
+so a Chromium crash on slide 16 lost everything. With a checkpoint each
+finished frame is written to disk right away (fast PNG) together with its
+manifest entry; a later run with --resume skips the frames already there and
+only renders the missing work before assembling the output.
+
+Checkpoints live in .export_cache/checkpoints/<key>, where the key covers
+the export script, its settings and the deck content (hash_assets
+.manifest_version), so a resume never mixes frames from a different deck or
+resolution. They are removed once the output has been written.
+
+    checkpoint = FrameCheckpoint('capture_high_res', {'width': 2560}, resume=True)
+    if not checkpoint.has('slide-1.3/state2'):
+        checkpoint.save('slide-1.3/state2', 'slide_005_Parts_state2.png', frame)
+    ...
+    images = [image for _, image in checkpoint.frames()]
+    checkpoint.clear()
+
+Usage:
+    python export_checkpoint.py           # list checkpoints
+    python export_checkpoint.py --clear   # delete all checkpoints
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+from embed_posters import CACHE_DIR
+from hash_assets import manifest_version
+
+CHECKPOINT_ROOT = CACHE_DIR / 'checkpoints'
+MANIFEST_NAME = 'checkpoint.json'
+
+# zlib level 1: checkpoints are written once per frame and read once
+PNG_COMPRESS_LEVEL = 1
+
+
+def checkpoint_key(script, settings, deck_version=None):
+    """Directory name for an export's checkpoints"""
+    deck_version = deck_version or manifest_version()
+    payload = json.dumps({'script': script, 'settings': settings, 'deck': deck_version}, sort_keys=True)
+    return f"{script}-{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]}"
+
+
+def _write_atomic(path, data):
+    # Readers (a resume after a crash mid-write) see the old or the new file
+    tmp = path.with_name(f'.{path.name}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class FrameCheckpoint:
+    """Frames of one export on disk, in capture order, keyed by slide/state"""
+
+    def __init__(self, script, settings, resume=False, root=CHECKPOINT_ROOT):
+        self.key = checkpoint_key(script, settings)
+        self.directory = Path(root) / self.key
+        self.manifest_path = self.directory / MANIFEST_NAME
+        self.entries = {}
+        # save() may run on encoder threads (frame_pipeline)
+        self.lock = threading.Lock()
+
+        if resume and self.manifest_path.exists():
+            try:
+                manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+                # Only entries whose frame file survived intact
+                self.entries = {
+                    key: entry for key, entry in manifest['frames'].items()
+                    if entry.get('skipped') or self._frame_ok(entry)
+                }
+            except (ValueError, KeyError):
+                self.entries = {}
+        elif self.directory.exists():
+            shutil.rmtree(self.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _frame_ok(self, entry):
+        path = self.directory / entry['file']
+        return path.is_file() and path.stat().st_size == entry['size']
+
+    def _write_manifest(self):
+        manifest = {'key': self.key, 'frames': self.entries}
+        _write_atomic(self.manifest_path, json.dumps(manifest, indent=2).encode('utf-8'))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def has(self, key):
+        return key in self.entries
+
+    def save(self, key, name, frame):
+        """Persist a finished frame and its manifest entry"""
+        file = f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.png"
+        path = self.directory / file
+        frame.save(path, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+        entry = {
+            'name': name,
+            'file': file,
+            'size': path.stat().st_size,
+            'width': frame.width,
+            'height': frame.height,
+        }
+        with self.lock:
+            self.entries[key] = entry
+            self._write_manifest()
+
+    def skip(self, key, reason):
+        """Record a state that produced no frame, so a resume does not retry it"""
+        with self.lock:
+            self.entries[key] = {'skipped': reason}
+            self._write_manifest()
+
+    def load(self, key):
+        image = Image.open(self.directory / self.entries[key]['file'])
+        image.load()
+        return image
+
+    def frames(self, keys=None):
+        """(name, image) for the given keys (default: all, in save order); skipped states omitted"""
+        keys = keys if keys is not None else list(self.entries)
+        return [(self.entries[key]['name'], self.load(key))
+                for key in keys if key in self.entries and not self.entries[key].get('skipped')]
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='List or delete export checkpoints')
+    parser.add_argument('--clear', action='store_true', help='Delete all checkpoints')
+    args = parser.parse_args()
+
+    if not CHECKPOINT_ROOT.exists():
+        print(f"No checkpoints at {CHECKPOINT_ROOT}")
+    elif args.clear:
+        shutil.rmtree(CHECKPOINT_ROOT)
+        print(f"✅ Removed {CHECKPOINT_ROOT}")
+    else:
+        for directory in sorted(CHECKPOINT_ROOT.iterdir()):
+            manifest = directory / MANIFEST_NAME
+            count = len(json.loads(manifest.read_text())['frames']) if manifest.exists() else 0
+            print(f"{directory.name}: {count} frame(s)")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Shared export engine for the screenshot-based PDF scripts
+
+Screenshots are captured to bytes and decoded straight into Pillow images;
+frames stay in memory until the PDF encoder consumes them. Nothing is
+written to disk except the PDF, unless image outputs are requested
+(save_frames / --save-images). capture_slide() clips the capture to the
+active slide instead of the whole viewport.
+
+    from export_engine import SLIDE_CONFIG, capture_frame, deck_page, goto_slide, write_pdf
+
+    with sync_playwright() as p, deck_page(p, {'width': 1920, 'height': 1080}) as page:
+        goto_slide(page, 0)
+        frames = [('slide_000.png', capture_frame(page))]
+    write_pdf([frame for _, frame in frames], 'out.pdf')
+"""
+
+import io
+import math
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+from browser_profile import open_export_context
+from cdp_capture import CDPCapture
+from embed_posters import install_embed_posters
+from freeze_media import install_media_freeze, wait_for_frozen_media
+from serve_deck import start_deck_server, stop_deck_server
+
+# (slide index, element id, number of states, name)
+SLIDE_CONFIG = [
+    (0, 'slide-0', 1, 'Intro'),
+    (1, 'slide-1.0', 1, 'Part_1'),
+    (2, 'slide-1.1', 1, 'Arduino'),
+    (3, 'slide-1.2', 1, 'Laws'),
+    (4, 'slide-1.3', 2, 'Parts'),
+    (5, 'slide-1.4', 2, 'MCU'),
+    (6, 'slide-1.5', 2, 'Fabrication'),
+    (7, 'slide-1.6', 1, 'Software'),
+    (8, 'slide-1.7', 1, 'Protocol'),
+    (9, 'slide-1.8', 1, 'Networking'),
+    (10, 'slide-2.0', 1, 'Part_2'),
+    (11, 'slide-2.1', 3, 'Actuator'),
+    (12, 'slide-2.2', 3, 'Sensor'),
+    (13, 'slide-2.3', 2, 'Biometric'),
+    (14, 'slide-3.0', 1, 'Part_3'),
+    (15, 'slide-3.1', 2, 'Your_Kit'),
+    (16, 'slide-3.2', 3, 'Warm-up'),
+    (17, 'slide-3.3', 3, 'Hard_Mode'),
+]
+
+HIDE_UI_SELECTORS = ['.navigation', '.progress-container', '.slide-note']
+
+# currentSlide/slideStates are script-level `let` bindings, not window
+# properties, so they are addressed as bare identifiers
+GOTO_SLIDE_JS = '''
+(args) => {
+    const [index, hide] = args;
+    if (typeof slideStates !== 'undefined') slideStates[index] = 0;
+    if (typeof goToSlide === 'function') {
+        goToSlide(index);
+    } else {
+        document.querySelectorAll('.slide').forEach((s, i) => {
+            s.classList.toggle('active', i === index);
+            s.style.display = i === index ? 'block' : 'none';
+            if (i === index) s.style.opacity = '1';
+        });
+    }
+    hide.forEach(sel => {
+        const el = document.querySelector(sel);
+        if (el) el.style.display = 'none';
+    });
+}
+'''
+
+# What a slide state shows: the active slide plus the code panels the
+# Warm-up / Hard Mode states append to .slideshow-container (outside the slide)
+SLIDE_REGION = '.slide.active, .slideshow-container > [id$="-code-panel"].visible'
+
+# Union of the client rects of the matched elements and everything rendered
+# inside them (content can overflow the slide box), plus the viewport size
+SLIDE_BOUNDS_JS = '''
+(selector) => {
+    const roots = Array.from(document.querySelectorAll(selector));
+    let left = Infinity, top = Infinity, right = -Infinity, bottom = -Infinity;
+    for (const el of roots.flatMap(root => [root, ...root.querySelectorAll('*')])) {
+        const r = el.getBoundingClientRect();
+        if (!r.width || !r.height || getComputedStyle(el).visibility === 'hidden') continue;
+        left = Math.min(left, r.left);
+        top = Math.min(top, r.top);
+        right = Math.max(right, r.right);
+        bottom = Math.max(bottom, r.bottom);
+    }
+    if (left === Infinity) return null;
+    return { left, top, right, bottom, viewportWidth: innerWidth, viewportHeight: innerHeight };
+}
+'''
+
+# Everything a state change can alter: SLIDE_REGION, plus code panels that
+# are attached but not yet .visible (adding .visible / .revealed is the
+# whole change on those states)
+FINGERPRINT_REGION = '.slide.active, .slideshow-container > [id$="-code-panel"]'
+
+# Cheap FNV-1a hash over the element trees of the matched roots (the active
+# slide first): tags, classes, sources, text, rounded boxes and the computed
+# styles that state toggles change. Equal hashes mean a transition left the
+# slide unchanged.
+SLIDE_FINGERPRINT_JS = '''
+(selector) => {
+    const roots = Array.from(document.querySelectorAll(selector));
+    if (!roots.length) return null;
+    let h = 0x811c9dc5;
+    const add = (value) => {
+        const s = String(value);
+        for (let i = 0; i < s.length; i++) {
+            h ^= s.charCodeAt(i);
+            h = Math.imul(h, 0x01000193);
+        }
+        h ^= 0x7c;
+    };
+    for (const root of roots) {
+        add(root.id);
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT);
+        for (let node = root; node; node = walker.nextNode()) {
+            if (node.nodeType === Node.TEXT_NODE) {
+                add(node.data.trim());
+                continue;
+            }
+            const style = getComputedStyle(node);
+            add(node.tagName);
+            add(node.getAttribute('class') || '');
+            add(style.display);
+            if (style.display === 'none') continue;
+            add(style.visibility);
+            add(style.opacity);
+            add(style.transform);
+            add(node.currentSrc || node.getAttribute('src') || '');
+            if (node.tagName === 'CANVAS') add(`${node.width}x${node.height}`);
+            const r = node.getBoundingClientRect();
+            add(`${Math.round(r.left)},${Math.round(r.top)},${Math.round(r.width)},${Math.round(r.height)}`);
+        }
+    }
+    return { id: roots[0].id, hash: (h >>> 0).toString(16) };
+}
+'''
+
+
+@contextmanager
+def deck_page(p, viewport, device_scale_factor=1, freeze_media=True, wait_until='networkidle'):
+    """
+    A page with the deck loaded in export mode: served over local HTTP,
+    media frozen (optional), embeds replaced by posters. Closes everything
+    on exit.
+    """
+    context, close_context = open_export_context(p, viewport=viewport, device_scale_factor=device_scale_factor)
+    server = None
+    try:
+        page = context.new_page()
+        if freeze_media:
+            install_media_freeze(page)
+        install_embed_posters(page)
+
+        server, url = start_deck_server()
+        print(f"Opening presentation: {url}")
+        page.goto(url, wait_until=wait_until)
+        yield page
+    finally:
+        close_context()
+        if server:
+            stop_deck_server(server)
+
+
+def goto_slide(page, index, settle_ms=1500, hide_ui=True):
+    page.evaluate(GOTO_SLIDE_JS, [index, HIDE_UI_SELECTORS if hide_ui else []])
+    page.wait_for_timeout(settle_ms)
+
+
+def slide_fingerprint(page, selector=FINGERPRINT_REGION):
+    """(slide id, hash) of the active slide's (and code panels') DOM and computed style, None without a slide"""
+    result = page.evaluate(SLIDE_FINGERPRINT_JS, selector)
+    return (result['id'], result['hash']) if result else None
+
+
+def capture_frame(page, wait_media=True, **screenshot_options):
+    """Screenshot decoded straight into a Pillow image, without a file"""
+    if wait_media:
+        # No-op on pages without install_media_freeze()
+        wait_for_frozen_media(page)
+    data = page.screenshot(type='png', **screenshot_options)
+    frame = Image.open(io.BytesIO(data))
+    frame.load()
+    return frame
+
+
+def slide_clip(page, padding=0, aspect=None, selector=SLIDE_REGION):
+    """
+    Screenshot clip (CSS px) around the active slide's rendered content
+    (and its visible code panel).
+    padding: extra margin on every side; aspect: widen or heighten the box
+    around its centre to this width/height ratio (e.g. 16 / 9) so pages stay
+    uniform. The clip never leaves the viewport. None if nothing is rendered.
+    """
+    box = page.evaluate(SLIDE_BOUNDS_JS, selector)
+    if not box:
+        return None
+    vw, vh = box['viewportWidth'], box['viewportHeight']
+    left, top = max(0, box['left'] - padding), max(0, box['top'] - padding)
+    right, bottom = min(vw, box['right'] + padding), min(vh, box['bottom'] + padding)
+    width, height = right - left, bottom - top
+
+    if aspect:
+        if width / height < aspect:
+            width = height * aspect
+        else:
+            height = width / aspect
+        if width > vw:
+            width, height = vw, vw / aspect
+        if height > vh:
+            width, height = vh * aspect, vh
+        # Grow around the centre, then shift back inside the viewport
+        left = min(max(0, (left + right - width) / 2), vw - width)
+        top = min(max(0, (top + bottom - height) / 2), vh - height)
+
+    x, y = math.floor(left), math.floor(top)
+    return {
+        'x': x,
+        'y': y,
+        'width': min(vw - x, math.ceil(left + width) - x),
+        'height': min(vh - y, math.ceil(top + height) - y),
+    }
+
+
+def capture_slide(page, padding=0, aspect=None, wait_media=True, selector=SLIDE_REGION, output_size=None):
+    """
+    capture_frame() clipped to the active slide (full viewport if it has no
+    box). With output_size (w, h) every frame comes out at exactly that size:
+    the clip takes its aspect ratio and is rendered at the matching scale
+    through the CDP clip (re-rasterized, not upsampled).
+    """
+    if not output_size:
+        clip = slide_clip(page, padding, aspect, selector)
+        if clip:
+            return capture_frame(page, wait_media, clip=clip)
+        return capture_frame(page, wait_media)
+
+    out_w, out_h = output_size
+    clip = slide_clip(page, padding, out_w / out_h, selector)
+    if not clip:
+        viewport = page.evaluate('() => [innerWidth, innerHeight]')
+        clip = {'x': 0, 'y': 0, 'width': viewport[0], 'height': viewport[1]}
+    if wait_media:
+        wait_for_frozen_media(page)
+
+    # The CDP clip scale multiplies the device scale factor
+    scale = min(out_w / clip['width'], out_h / clip['height']) / page.evaluate('devicePixelRatio')
+    capture = CDPCapture(page)
+    try:
+        frame = Image.open(io.BytesIO(capture.capture_bytes(clip, scale)))
+        frame.load()
+    finally:
+        capture.close()
+    if frame.size != tuple(output_size):
+        # Whole-pixel rounding of the clip box only
+        frame = frame.resize(output_size, Image.Resampling.LANCZOS)
+    return frame
+
+
+def flatten_frame(frame, background=(255, 255, 255)):
+    """RGB copy suitable for the PDF encoder (alpha composited on background)"""
+    if frame.mode == 'RGB':
+        return frame
+    if frame.mode in ('RGBA', 'LA') or (frame.mode == 'P' and 'transparency' in frame.info):
+        rgba = frame.convert('RGBA')
+        rgb = Image.new('RGB', frame.size, background)
+        rgb.paste(rgba, mask=rgba.split()[3])
+        return rgb
+    return frame.convert('RGB')
+
+
+def save_frames(frames, directory):
+    """Write (name, image) frames as image files (only when asked for)"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, frame in frames:
+        frame.save(directory / name)
+    print(f"✓ Saved {len(frames)} images to {directory}")
+
+
+def write_pdf(images, output_file, resolution=100.0, **save_options):
+    """Multi-page PDF from in-memory images; returns the file size"""
+    images = [flatten_frame(image) for image in images]
+    images[0].save(
+        output_file,
+        "PDF",
+        save_all=True,
+        append_images=images[1:],
+        resolution=resolution,
+        **save_options
+    )
+    return os.path.getsize(output_file)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Viewport matrix export: several layouts in one run
+
+Each layout used to be its own script run (capture_slides_separately.py at
+MacBook 1512x982, capture_presentation.py at 1440x900, the 1080p/1440p
+scripts). This script launches one Chromium process and renders every
+requested viewport concurrently, one browser context per viewport, through
+the async Playwright API. All contexts share a single local deck server.
+
+Outputs per viewport go to exports/<name>/: the frames as PNG and
+HTPAAC_<name>.pdf.
+
+The 'mobile' viewport is below the 768 px breakpoint, where the layout
+stacks and the revolver progress shrinks to 200 px.
+
+Usage:
+    python export_viewports.py [--viewports macbook,laptop,1080p,1440p,mobile]
+    python export_viewports.py --viewports 1080p,1280x800@2 [--recipes FILE]
+"""
+
+import argparse
+import asyncio
+import io
+import time
+from pathlib import Path
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    print("Error: Playwright is required")
+    print("Install with: pip install playwright && playwright install chromium")
+    exit(1)
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+from capture_recipes import RECIPES_FILE, load_recipes, recipe_for, run_step_async
+from embed_posters import install_embed_posters_async
+from export_engine import GOTO_SLIDE_JS, HIDE_UI_SELECTORS, SLIDE_CONFIG, write_pdf
+from freeze_media import install_media_freeze_async, wait_for_frozen_media_async
+from serve_deck import start_deck_server, stop_deck_server
+
+# name -> (width, height, device_scale_factor, mobile)
+VIEWPORTS = {
+    'macbook': (1512, 982, 2, False),
+    'laptop': (1440, 900, 1, False),
+    '1080p': (1920, 1080, 1, False),
+    '1440p': (2560, 1440, 1, False),
+    'mobile': (390, 844, 3, True),
+}
+
+OUTPUT_DIR = 'exports'
+
+
+async def export_viewport(browser, url, name, spec, output_dir, freeze_media=True, settle_ms=1500, recipes=None):
+    """
+    Render every slide/state in a context of its own, reaching each state
+    through its capture recipe; returns (name, frames, seconds)
+    """
+    recipes = recipes or load_recipes()
+    width, height, scale, mobile = spec
+    start = time.perf_counter()
+    context = await browser.new_context(
+        viewport={'width': width, 'height': height},
+        device_scale_factor=scale,
+        is_mobile=mobile,
+        has_touch=mobile,
+        # sw.js would otherwise answer requests ahead of the export routes
+        service_workers='block',
+    )
+    try:
+        # Installed on the context so every page (and popup) is in export mode
+        if freeze_media:
+            await install_media_freeze_async(context)
+        await install_embed_posters_async(context)
+
+        page = await context.new_page()
+        await page.goto(url, wait_until='networkidle')
+        await page.wait_for_timeout(3000)
+
+        frames = []
+        for slide_index, slide_id, num_states, slide_name in SLIDE_CONFIG:
+            await page.evaluate(GOTO_SLIDE_JS, [slide_index, HIDE_UI_SELECTORS])
+            await page.wait_for_timeout(settle_ms)
+            for state, step in enumerate(recipe_for(recipes, slide_id, num_states)):
+                failed = await run_step_async(page, slide_index, step, recipes['defaults'])
+                if failed:
+                    print(f"    Warning: {name} {slide_id} state {state + 1} not ready ({', '.join(failed)})")
+                if freeze_media:
+                    await wait_for_frozen_media_async(page)
+                data = await page.screenshot(type='png')
+                frame_name = f'slide_{len(frames):03d}_{slide_name}' + (f'_state{state + 1}' if num_states > 1 else '')
+                frames.append((f'{frame_name}.png', data))
+        print(f"  ✓ {name}: {len(frames)} frames at {width}x{height} @ {scale}x")
+    finally:
+        await context.close()
+
+    # Decoding and PDF encoding are CPU work; the other contexts keep
+    # rendering meanwhile
+    await asyncio.to_thread(_write_outputs, name, frames, Path(output_dir) / name)
+    return name, len(frames), time.perf_counter() - start
+
+
+def _write_outputs(name, frames, directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    images = []
+    for frame_name, data in frames:
+        (directory / frame_name).write_bytes(data)
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        images.append(image)
+    if images:
+        write_pdf(images, directory / f'HTPAAC_{name}.pdf')
+
+
+async def export_viewports(viewports=VIEWPORTS, output_dir=OUTPUT_DIR, freeze_media=True, concurrency=None,
+                           recipes_file=RECIPES_FILE):
+    """Render all viewports concurrently in one browser; returns per-viewport results"""
+    recipes = load_recipes(recipes_file)
+    server, url = start_deck_server()
+    # Bounds how many contexts render at once (all of them by default)
+    limit = asyncio.Semaphore(concurrency or len(viewports))
+
+    async def run(browser, name, spec):
+        async with limit:
+            print(f"  → {name} ({spec[0]}x{spec[1]} @ {spec[2]}x)")
+            return await export_viewport(browser, url, name, spec, output_dir, freeze_media, recipes=recipes)
+
+    start = time.perf_counter()
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                results = await asyncio.gather(
+                    *(run(browser, name, spec) for name, spec in viewports.items()),
+                    return_exceptions=True
+                )
+            finally:
+                await browser.close()
+    finally:
+        stop_deck_server(server)
+
+    print(f"\nViewport matrix finished in {time.perf_counter() - start:.1f}s")
+    failed = False
+    for name, result in zip(viewports, results):
+        if isinstance(result, Exception):
+            failed = True
+            print(f"  ❌ {name}: {result}")
+        else:
+            _, count, elapsed = result
+            print(f"  ✅ {name}: {count} frames in {elapsed:.1f}s -> {Path(output_dir) / name}")
+    return not failed
+
+
+def parse_viewports(spec):
+    """'1080p,mobile,1280x800@2' -> {name: (width, height, scale, mobile)}"""
+    viewports = {}
+    for item in spec.split(','):
+        item = item.strip().lower()
+        if item in VIEWPORTS:
+            viewports[item] = VIEWPORTS[item]
+            continue
+        try:
+            size, _, scale = item.partition('@')
+            width, height = (int(v) for v in size.split('x'))
+            viewports[item] = (width, height, float(scale or 1), width <= 768)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Unknown viewport '{item}' (use {', '.join(VIEWPORTS)} or WxH[@scale])")
+    return viewports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export the deck at several viewports in one browser run')
+    parser.add_argument('--viewports', type=parse_viewports, default=VIEWPORTS,
+                        help=f"Comma-separated viewports: {', '.join(VIEWPORTS)} or WxH[@scale] (default: all)")
+    parser.add_argument('--output', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR}/)')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Contexts rendering at once (default: all viewports)')
+    parser.add_argument('--no-freeze', action='store_true', help='Do not pin animated media to fixed frames')
+    parser.add_argument('--recipes', default=RECIPES_FILE, help='Capture recipe file (default: capture_recipes.json)')
+    args = parser.parse_args()
+
+    if not asyncio.run(export_viewports(args.viewports, args.output, not args.no_freeze, args.concurrency,
+                                        args.recipes)):
+        print("\n❌ Some viewports failed!")
+        exit(1)
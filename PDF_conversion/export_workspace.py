@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Per-run isolated workspaces for export intermediates
+
+Export scripts used fixed intermediate names (/tmp/slide_000.pdf, ...), so
+two runs at once overwrote each other's files, and intermediates went to
+disk. Each run now gets its own uniquely named directory:
+
+- on /dev/shm (RAM-backed tmpfs) when it has at least HTPAAC_WORKSPACE_MIN_FREE
+  bytes free (default 1 GB), otherwise in the system temp directory
+- HTPAAC_WORKSPACE_DIR overrides the location
+- removed when the run ends, whether it succeeded, failed or was stopped
+  with Ctrl-C / SIGTERM (pass keep=True or set HTPAAC_KEEP_WORKSPACE=1 to
+  inspect it afterwards)
+
+    from export_workspace import export_workspace
+    with export_workspace() as workspace:
+        page.pdf(path=workspace / 'slide_000.pdf')
+
+Usage:
+    python export_workspace.py          # show where workspaces would go
+    python export_workspace.py --clean  # remove workspaces of dead runs
+"""
+
+import os
+import shutil
+import signal
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+SHM_ROOT = Path('/dev/shm')
+PREFIX = 'htpaac-export-'
+MIN_SHM_FREE = int(os.environ.get('HTPAAC_WORKSPACE_MIN_FREE', 1024 * 1024 * 1024))
+
+
+def _free_bytes(path):
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return 0
+
+
+def workspace_root(min_free=MIN_SHM_FREE):
+    """Directory new workspaces are created in"""
+    override = os.environ.get('HTPAAC_WORKSPACE_DIR')
+    if override:
+        Path(override).mkdir(parents=True, exist_ok=True)
+        return Path(override)
+    if SHM_ROOT.is_dir() and os.access(SHM_ROOT, os.W_OK) and _free_bytes(SHM_ROOT) >= min_free:
+        return SHM_ROOT
+    return Path(tempfile.gettempdir())
+
+
+def _raise_exit(signum, frame):
+    # Turn SIGTERM into SystemExit so the cleanup in finally blocks runs
+    raise SystemExit(128 + signum)
+
+
+@contextmanager
+def export_workspace(prefix=PREFIX, keep=None, min_free=MIN_SHM_FREE):
+    """
+    Create a unique workspace directory and yield its Path; it is removed
+    on exit unless keep (or HTPAAC_KEEP_WORKSPACE=1).
+    """
+    if keep is None:
+        keep = os.environ.get('HTPAAC_KEEP_WORKSPACE', '').lower() in ('1', 'true', 'yes', 'on')
+
+    # The pid in the name lets --clean find workspaces of dead runs
+    path = Path(tempfile.mkdtemp(prefix=f'{prefix}{os.getpid()}-', dir=workspace_root(min_free)))
+
+    previous = None
+    if threading.current_thread() is threading.main_thread() and \
+            signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+        previous = signal.signal(signal.SIGTERM, _raise_exit)
+    try:
+        yield path
+    finally:
+        if previous is not None:
+            signal.signal(signal.SIGTERM, previous)
+        if keep:
+            print(f"Workspace kept: {path}")
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def stale_workspaces(prefix=PREFIX):
+    """Workspaces left behind by runs that were killed outright (SIGKILL, crash)"""
+    stale = []
+    roots = {SHM_ROOT, Path(tempfile.gettempdir())}
+    if os.environ.get('HTPAAC_WORKSPACE_DIR'):
+        roots.add(Path(os.environ['HTPAAC_WORKSPACE_DIR']))
+    for root in roots:
+        if not root.is_dir():
+            continue
+        for path in root.glob(f'{prefix}*'):
+            pid = path.name[len(prefix):].split('-', 1)[0]
+            if path.is_dir() and pid.isdigit() and not _pid_alive(int(pid)):
+                stale.append(path)
+    return stale
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Inspect or clean export workspaces')
+    parser.add_argument('--clean', action='store_true', help='Remove workspaces of runs that no longer exist')
+    args = parser.parse_args()
+
+    root = workspace_root()
+    print(f"Workspaces go to: {root} ({_free_bytes(root) / 1024 / 1024:.0f} MB free)")
+    stale = stale_workspaces()
+    for path in stale:
+        if args.clean:
+            shutil.rmtree(path, ignore_errors=True)
+        print(f"  {'Removed' if args.clean else 'Stale'}: {path}")
+    if not stale:
+        print("  No stale workspaces")
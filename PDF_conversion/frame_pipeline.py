@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Producer/consumer pipeline overlapping capture with frame encoding
+
+Exports used to capture everything first, then flatten every frame to RGB,
+then run one long save_all PDF encode, so Chromium and the CPU took turns
+idling. Here the capture loop (producer) hands each frame to a bounded
+pool of worker threads (consumers) that flatten, resize and encode it to a
+one-page PDF while the browser renders the next slide. Pillow releases the
+GIL while compressing, so the threads really run alongside the capture.
+
+Backpressure: submit() blocks once max_pending frames are queued or being
+encoded. Only the encoded (JPEG-compressed) pages are kept until finish()
+merges them in submission order with PyPDF2, so memory stays bounded by
+max_pending raw frames however fast the browser is.
+
+    with FramePipeline(resize=lambda f: fit_to_plan(f, plan), resolution=150.0) as pipeline:
+        for key, name, frame in capture_frames():
+            if checkpoint.has(key):
+                # Loaded from disk in the worker
+                pipeline.submit(name, partial(checkpoint.load, key))
+            else:
+                # Blocks while the pool is full; the checkpoint write runs
+                # in the worker too
+                pipeline.submit(name, frame, partial(checkpoint.save, key, name))
+        pipeline.finish('out.pdf')
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PyPDF2 import PdfMerger
+except ImportError:
+    print("Error: PyPDF2 is required")
+    print("Install with: pip install PyPDF2")
+    exit(1)
+
+from export_engine import flatten_frame
+
+WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+MAX_PENDING = 4
+
+
+def encode_pdf_page(image, resolution=100.0, **save_options):
+    """One-page PDF bytes for an RGB image"""
+    buffer = io.BytesIO()
+    image.save(buffer, 'PDF', resolution=resolution, **save_options)
+    return buffer.getvalue()
+
+
+class FramePipeline:
+    """Bounded thread pool that turns captured frames into PDF pages"""
+
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING, resize=None, resolution=100.0, **save_options):
+        """resize: image -> image, applied after flattening (e.g. fit_to_plan)"""
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='encode')
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.resize = resize
+        self.resolution = resolution
+        self.save_options = save_options
+        self.futures = []
+
+    def _process(self, frame, before):
+        try:
+            if callable(frame):
+                frame = frame()
+            if before:
+                before(frame)
+            return self._encode(frame)
+        finally:
+            self.slots.release()
+
+    def _encode(self, frame):
+        # Overridden by shm_ring.SharedFramePipeline to encode in processes
+        image = flatten_frame(frame)
+        if self.resize:
+            image = self.resize(image)
+        return encode_pdf_page(image, self.resolution, **self.save_options)
+
+    def submit(self, name, frame, before=None):
+        """
+        Queue a frame (an image, or a callable returning one to load it in
+        the worker); blocks while max_pending frames are in flight. before
+        (frame -> None) runs in the worker ahead of the encode.
+        """
+        self.slots.acquire()
+        try:
+            self.futures.append((name, self.executor.submit(self._process, frame, before)))
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def __len__(self):
+        return len(self.futures)
+
+    def results(self):
+        """Encoded pages in submission order; raises a worker's error"""
+        return [(name, future.result()) for name, future in self.futures]
+
+    def finish(self, output_file):
+        """Wait for all frames and write the PDF; returns its size"""
+        pages = [page for _, page in self.results()]
+        if not pages:
+            raise ValueError("No frames were submitted")
+
+        merger = PdfMerger()
+        for page in pages:
+            merger.append(io.BytesIO(page))
+        with open(output_file, 'wb') as f:
+            merger.write(f)
+        merger.close()
+        return os.path.getsize(output_file)
+
+    def close(self):
+        # Waits for queued work, so side effects (checkpoints) are not lost
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Deterministic animated-media freezing for reproducible captures
+
+Screenshots of slides with GIFs or video otherwise differ from run to run
+depending on which frame happens to be showing. In export mode this module
+pins every animated image and video to a chosen frame before capture:
+
+- animated GIF / WebP / APNG responses are swapped for a still PNG of the
+  configured frame (extracted once with Pillow and cached on disk)
+- <video> elements are paused and seeked to the configured timestamp
+
+Repeated exports of unchanged slides are then pixel-identical.
+
+Usage from a capture script:
+
+    from freeze_media import install_media_freeze, wait_for_frozen_media
+    install_media_freeze(page)             # before page.goto()
+    ...
+    wait_for_frozen_media(page)            # before page.screenshot()
+
+The *_async variants do the same for the async Playwright API.
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import re
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+from embed_posters import CACHE_DIR
+
+# Per-asset frame timestamps in seconds, keyed by the original file name.
+# Transcoded variants (act2-482w.1a2b3c4d.webm) match on the original stem.
+# Anything not listed is pinned to DEFAULT_TIME.
+FREEZE_TIMES = {
+    'act2.gif': 1.0,
+    'act3.gif': 1.0,
+}
+
+DEFAULT_TIME = 0.0
+
+ANIMATED_IMAGE_URL = re.compile(r'\.(gif|webp|png|apng)(\?.*)?$', re.I)
+
+FREEZE_VIDEO_JS = '''
+(() => {
+    const TIMES = %(times)s;
+    const DEFAULT_TIME = %(default)s;
+
+    function timeFor(video) {
+        const source = video.querySelector('source');
+        const src = video.currentSrc || video.getAttribute('src') || (source && source.src) || '';
+        const name = decodeURIComponent(src.split('?')[0].split('/').pop());
+        for (const [stem, time] of Object.entries(TIMES)) {
+            if (name === stem || name.startsWith(stem + '.') || name.startsWith(stem + '-')) return time;
+        }
+        return DEFAULT_TIME;
+    }
+
+    function pin(video) {
+        if (video.dataset.htpaacFrozen) return;
+        video.dataset.htpaacFrozen = '1';
+        video.removeAttribute('autoplay');
+        video.autoplay = false;
+        video.loop = false;
+        video.muted = true;
+        video.pause();
+
+        const seek = () => {
+            video.pause();
+            const time = Math.min(timeFor(video), Math.max(0, (video.duration || 0) - 0.001));
+            video.currentTime = time;
+        };
+        if (video.readyState >= 1) seek();
+        else video.addEventListener('loadedmetadata', seek, { once: true });
+        video.addEventListener('play', () => video.pause());
+    }
+
+    // Resolves true once every video has its pinned frame decoded
+    window.__htpaacMediaSettled = () =>
+        Array.from(document.querySelectorAll('video')).every(v =>
+            !v.dataset.htpaacFrozen || v.readyState >= 2 && !v.seeking || v.error || v.networkState === 3);
+
+    const observer = new MutationObserver(() => document.querySelectorAll('video').forEach(pin));
+    document.addEventListener('DOMContentLoaded', () => document.querySelectorAll('video').forEach(pin));
+    observer.observe(document, { childList: true, subtree: true });
+})();
+'''
+
+
+def _stem(name):
+    return name.rsplit('.', 1)[0]
+
+
+def freeze_time_for(url, times=FREEZE_TIMES, default=DEFAULT_TIME):
+    """Configured timestamp (seconds) for an asset URL"""
+    name = unquote(urlparse(url).path.rsplit('/', 1)[-1])
+    for key, time in times.items():
+        stem = _stem(key)
+        if name == key or name.startswith(stem + '.') or name.startswith(stem + '-'):
+            return time
+    return default
+
+
+def extract_frame(data, time=0.0):
+    """
+    PNG bytes of the frame showing at `time` seconds in an animated image,
+    or None if the image is not animated.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        if not getattr(img, 'is_animated', False):
+            return None
+
+        # Seek frame by frame: info['duration'] always describes the
+        # current frame, and the iterator yields the same image object
+        durations = []
+        for index in range(img.n_frames):
+            img.seek(index)
+            durations.append(max(img.info.get('duration', 100) or 100, 1))
+        target = (time * 1000) % sum(durations)
+
+        elapsed = 0
+        for index, duration in enumerate(durations):
+            elapsed += duration
+            if elapsed > target:
+                break
+
+        img.seek(index)
+        buffer = io.BytesIO()
+        img.convert('RGBA').save(buffer, 'PNG')
+        return buffer.getvalue()
+
+
+def frozen_frame(data, time, cache_dir=CACHE_DIR):
+    """extract_frame() with an on-disk cache keyed by content and timestamp"""
+    # v2: frames cached before durations were read per frame may be wrong
+    key = hashlib.sha1(data + f'|{time}|v2'.encode()).hexdigest()
+    frame_path = Path(cache_dir) / 'frames' / f'{key}.png'
+    still_marker = frame_path.with_suffix('.still')
+    if frame_path.exists():
+        return frame_path.read_bytes()
+    if still_marker.exists():
+        return None
+
+    frame = extract_frame(data, time)
+    frame_path.parent.mkdir(parents=True, exist_ok=True)
+    if frame is None:
+        still_marker.touch()
+    else:
+        frame_path.write_bytes(frame)
+    return frame
+
+
+def _handle_image(route, times, default, cache_dir):
+    if route.request.resource_type != 'image':
+        route.fallback()
+        return
+    try:
+        response = route.fetch()
+    except Exception:
+        route.fallback()
+        return
+
+    frame = frozen_frame(response.body(), freeze_time_for(route.request.url, times, default), cache_dir) \
+        if response.ok else None
+    if frame is None:
+        route.fulfill(response=response)
+    else:
+        route.fulfill(status=200, content_type='image/png', body=frame)
+
+
+async def _handle_image_async(route, times, default, cache_dir):
+    if route.request.resource_type != 'image':
+        await route.fallback()
+        return
+    try:
+        response = await route.fetch()
+    except Exception:
+        await route.fallback()
+        return
+
+    frame = None
+    if response.ok:
+        # Frame extraction is CPU-bound; keep it off the event loop
+        frame = await asyncio.to_thread(frozen_frame, await response.body(),
+                                        freeze_time_for(route.request.url, times, default), cache_dir)
+    if frame is None:
+        await route.fulfill(response=response)
+    else:
+        await route.fulfill(status=200, content_type='image/png', body=frame)
+
+
+def _freeze_video_script(times, default):
+    return FREEZE_VIDEO_JS % {
+        'times': json.dumps({_stem(k): v for k, v in times.items()}),
+        'default': json.dumps(default),
+    }
+
+
+def install_media_freeze(page, times=FREEZE_TIMES, default=DEFAULT_TIME, cache_dir=CACHE_DIR):
+    """
+    Pin animated images and videos on a page (or context) to fixed frames.
+    Must be called before navigating to the deck.
+    """
+    page.add_init_script(_freeze_video_script(times, default))
+    page.route(ANIMATED_IMAGE_URL, lambda route: _handle_image(route, times, default, cache_dir))
+
+
+async def install_media_freeze_async(page, times=FREEZE_TIMES, default=DEFAULT_TIME, cache_dir=CACHE_DIR):
+    """install_media_freeze() for an async API page or context"""
+    await page.add_init_script(_freeze_video_script(times, default))
+    await page.route(ANIMATED_IMAGE_URL, lambda route: _handle_image_async(route, times, default, cache_dir))
+
+
+MEDIA_SETTLED_JS = '() => !window.__htpaacMediaSettled || window.__htpaacMediaSettled()'
+
+
+def wait_for_frozen_media(page, timeout=5000):
+    """Wait until every video shows its pinned frame"""
+    try:
+        page.wait_for_function(MEDIA_SETTLED_JS, timeout=timeout)
+    except Exception:
+        print("    Warning: media did not settle before timeout")
+
+
+async def wait_for_frozen_media_async(page, timeout=5000):
+    try:
+        await page.wait_for_function(MEDIA_SETTLED_JS, timeout=timeout)
+    except Exception:
+        print("    Warning: media did not settle before timeout")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Extract the frame an export would pin an animated image to')
+    parser.add_argument('image', help='Animated GIF/WebP/APNG file')
+    parser.add_argument('output', help='Output PNG path')
+    parser.add_argument('--time', type=float, default=None, help='Timestamp in seconds (default: configured)')
+    args = parser.parse_args()
+
+    time = args.time if args.time is not None else freeze_time_for(args.image)
+    frame = extract_frame(Path(args.image).read_bytes(), time)
+    if frame is None:
+        print(f"{args.image} is not animated")
+        exit(1)
+    Path(args.output).write_bytes(frame)
+    print(f"✓ Saved frame at {time:.2f}s to {args.output}")
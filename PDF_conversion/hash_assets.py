@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Content-hashed asset naming step for the deck build
+
+Runs last. Every asset in dist/ (img/, Terminus/, styles.css, script.js) is
+renamed to name.<hash8>.ext and all references in index.html, styles.css and
+the script.js templates are rewritten to the hashed names, so the files can
+be served with immutable caching (see serve_deck.py). Outputs of earlier
+steps that already carry a hash (img/optimized/*, the font subsets) keep
+their names. index.html and sw.js are never renamed: they are the entry
+points and must keep stable URLs.
+
+The step writes:
+
+- dist/manifest.json: logical path -> hashed file, content hash and size,
+  plus a deck version hash used by export cache keys (manifest_version())
+- dist/asset-manifest.json: the service worker precache list, built from
+  the hashed names (build_sw_manifest.py)
+
+Usage:
+    python hash_assets.py [--dist ../dist]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from build_sw_manifest import MANIFEST_NAME as SW_MANIFEST_NAME
+from build_sw_manifest import build_manifest as build_sw_manifest
+from build_sw_manifest import url_path
+from deck_build import DECK_ROOT, DIST_ROOT, ensure_staged, file_digest
+from serve_deck import HASHED_NAME
+
+MANIFEST_NAME = 'manifest.json'
+
+ASSET_DIRS = ['img', 'Terminus']
+
+# Hashed after the leaf assets, since they reference them
+REFERRING_ASSETS = ['styles.css', 'script.js']
+
+
+def hashed_name(path, digest):
+    """img/Eval.gif -> img/Eval.1a2b3c4d.gif"""
+    path = Path(path)
+    return path.with_name(f'{path.stem}.{digest[:8]}{path.suffix}').as_posix()
+
+
+def ref_pattern(ref):
+    # A whole path as written in an attribute, url() or JS string: not part of
+    # a longer path, optionally prefixed with ./
+    return re.compile(rf'''(?<![\w/.%-])(\./)?{re.escape(ref)}(?=[\s"'`)?#,]|$)''')
+
+
+def rewrite_refs(text, renames):
+    """Replace references to renamed assets (raw and URL-encoded forms)"""
+    for old, new in sorted(renames.items(), key=lambda item: -len(item[0])):
+        for old_ref, new_ref in {(old, new), (url_path(old), url_path(new))}:
+            if old_ref in text:
+                text = ref_pattern(old_ref).sub(lambda m: (m.group(1) or '') + new_ref, text)
+
+    # Bare file names in JS string literals, e.g. this.src.includes('EDAhard.png'),
+    # as long as the name is unambiguous
+    basenames = {}
+    for old, new in renames.items():
+        basenames.setdefault(Path(old).name, []).append(Path(new).name)
+    for old_name, new_names in basenames.items():
+        if len(new_names) == 1 and old_name in text:
+            text = re.sub(rf'''(['"]){re.escape(old_name)}\1''',
+                          lambda m: f'{m.group(1)}{new_names[0]}{m.group(1)}', text)
+    return text
+
+
+def _hash_file(dist, path, manifest, renames):
+    digest = file_digest(dist / path)
+    target = path if HASHED_NAME.search(path) else hashed_name(path, digest)
+    if target != path:
+        (dist / path).rename(dist / target)
+        renames[path] = target
+    manifest[path] = {'file': target, 'hash': digest, 'size': (dist / target).stat().st_size}
+
+
+def hash_assets(dist=DIST_ROOT):
+    dist = ensure_staged(dist)
+    if (dist / MANIFEST_NAME).exists():
+        print(f"Note: {dist} is already hashed, restage it to rehash")
+        return True
+
+    manifest, renames = {}, {}
+    for directory in ASSET_DIRS:
+        if not (dist / directory).is_dir():
+            continue
+        for path in sorted((dist / directory).rglob('*')):
+            if path.is_file():
+                _hash_file(dist, path.relative_to(dist).as_posix(), manifest, renames)
+
+    for name in REFERRING_ASSETS:
+        text_path = dist / name
+        text_path.write_text(rewrite_refs(text_path.read_text(encoding='utf-8'), renames), encoding='utf-8')
+        _hash_file(dist, name, manifest, renames)
+
+    html_path = dist / 'index.html'
+    html_path.write_text(rewrite_refs(html_path.read_text(encoding='utf-8'), renames), encoding='utf-8')
+
+    version = hashlib.sha1()
+    for path, entry in sorted(manifest.items()):
+        version.update(f"{path}:{entry['hash']}\n".encode('utf-8'))
+    for name in ('index.html', 'sw.js'):
+        if (dist / name).is_file():
+            version.update(f"{name}:{file_digest(dist / name)}\n".encode('utf-8'))
+
+    (dist / MANIFEST_NAME).write_text(
+        json.dumps({'version': version.hexdigest()[:12], 'assets': manifest}, indent=2, sort_keys=True) + '\n',
+        encoding='utf-8'
+    )
+
+    sw_manifest, missing = build_sw_manifest(dist)
+    for ref in missing:
+        print(f"  Warning: referenced asset not found: {ref}")
+    (dist / SW_MANIFEST_NAME).write_text(json.dumps(sw_manifest, indent=2) + '\n', encoding='utf-8')
+
+    total = sum(entry['size'] for entry in manifest.values())
+    print(f"✅ Hashed {len(renames)} of {len(manifest)} assets ({total / 1024 / 1024:.1f} MB), "
+          f"version {version.hexdigest()[:12]}")
+    return True
+
+
+def load_manifest(root=DIST_ROOT):
+    """The parsed manifest.json of a built deck, or None"""
+    try:
+        return json.loads((Path(root) / MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def manifest_version(root=DECK_ROOT):
+    """
+    Hash identifying the deck content, for export cache keys.
+    Uses manifest.json of a built deck, or hashes the sources directly.
+    """
+    manifest = load_manifest(root)
+    if manifest:
+        return manifest['version']
+
+    root = Path(root)
+    version = hashlib.sha1()
+    for name in ['index.html', *REFERRING_ASSETS]:
+        if (root / name).is_file():
+            version.update(f"{name}:{file_digest(root / name)}\n".encode('utf-8'))
+    for directory in ASSET_DIRS:
+        if (root / directory).is_dir():
+            for path in sorted((root / directory).rglob('*')):
+                if path.is_file():
+                    version.update(f"{path.relative_to(root).as_posix()}:{file_digest(path)}\n".encode('utf-8'))
+    return version.hexdigest()[:12]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Rename dist/ assets to content-hashed names')
+    parser.add_argument('--dist', default=str(DIST_ROOT), help='Build directory (default: dist/)')
+    args = parser.parse_args()
+
+    if not hash_assets(Path(args.dist)):
+        exit(1)
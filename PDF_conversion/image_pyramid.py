@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution export from a single capture pass
+
+capture_enhanced.py (1080p), capture_zoomed.py / capture_images_only.py
+(1440p) and capture_high_res.py (4K) each drive a full browser run over the
+same slides. This script renders every slide/state once, at the largest
+requested level, and derives all smaller levels from that frame with a
+vectorized area-averaging downsample in NumPy:
+
+- integer ratios (4K -> 1080p, 4K -> 480x270) reshape the frame into blocks
+  and average them
+- fractional ratios (4K -> 1440p) integrate each axis with a cumulative sum
+  and sample it at the output pixel edges, which is exact box filtering
+  without a Python loop
+
+Outputs go to pyramid/<level>/ as PNG, plus one PDF per level with --pdf.
+The PDF pages are encoded by one FramePipeline per level as the frames are
+captured, so only a few frames per level are held in memory at a time.
+
+Usage:
+    python image_pyramid.py [--levels thumb,hd,1440p,4k] [--pdf] [--output pyramid] [--recipes FILE]
+"""
+
+import argparse
+from contextlib import ExitStack
+from pathlib import Path
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    print("Error: Playwright is required")
+    print("Install with: pip install playwright && playwright install chromium")
+    exit(1)
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: NumPy is required")
+    print("Install with: pip install numpy")
+    exit(1)
+
+from capture_recipes import RECIPES_FILE, load_recipes, recipe_for, run_step
+from cdp_capture import CDPCapture, to_image
+from export_engine import SLIDE_CONFIG, deck_page, goto_slide
+from frame_pipeline import FramePipeline
+from freeze_media import wait_for_frozen_media
+from resolution_planner import apply_css_zoom, describe, plan_resolution
+
+# Output level name -> maximum (width, height) in pixels
+LEVELS = {
+    'thumb': (480, 270),
+    'hd': (1920, 1080),
+    '1440p': (2560, 1440),
+    '4k': (3840, 2160),
+}
+
+OUTPUT_DIR = 'pyramid'
+
+
+def _area_axis(a, n, axis):
+    """Box-filter axis of a down to n samples"""
+    m = a.shape[axis]
+    if m == n:
+        return a
+    if m % n == 0:
+        # Whole blocks: average them through a reshaped view
+        shape = a.shape[:axis] + (n, m // n) + a.shape[axis + 1:]
+        return a.reshape(shape).mean(axis=axis + 1, dtype=np.float32)
+
+    # Integral along the axis, prefixed with 0 so cs[i] = sum(a[:i]); the
+    # integral at a fractional edge x is cs[i] + (x - i) * a[i], i = floor(x)
+    cs = np.cumsum(a, axis=axis, dtype=np.float32)
+    zero = np.zeros(a.shape[:axis] + (1,) + a.shape[axis + 1:], np.float32)
+    cs = np.concatenate([zero, cs], axis=axis)
+
+    edges = np.arange(n + 1) * (m / n)
+    index = np.minimum(edges.astype(np.intp), m - 1)
+    frac = (edges - index).astype(np.float32)
+    frac_shape = [1] * a.ndim
+    frac_shape[axis] = n + 1
+    integral = np.take(cs, index, axis=axis) + frac.reshape(frac_shape) * np.take(a, index, axis=axis)
+
+    lo = [slice(None)] * a.ndim
+    hi = [slice(None)] * a.ndim
+    lo[axis], hi[axis] = slice(None, -1), slice(1, None)
+    return (integral[tuple(hi)] - integral[tuple(lo)]) / np.float32(m / n)
+
+
+def level_size(frame_size, max_size):
+    """Largest size within max_size with the frame's aspect ratio"""
+    width, height = frame_size
+    scale = min(max_size[0] / width, max_size[1] / height, 1.0)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def downsample(frame, size):
+    """(H, W, C) uint8 array area-averaged down to size=(width, height)"""
+    width, height = size
+    if (frame.shape[1], frame.shape[0]) == (width, height):
+        return frame
+    if width > frame.shape[1] or height > frame.shape[0]:
+        raise ValueError(f"Cannot downsample {frame.shape[1]}x{frame.shape[0]} to {width}x{height}")
+    out = _area_axis(_area_axis(frame, height, 0), width, 1)
+    return np.clip(np.rint(out), 0, 255).astype(np.uint8)
+
+
+def build_pyramid(frame, levels):
+    """{level: array} for every level, all derived from the one frame"""
+    frame_size = (frame.shape[1], frame.shape[0])
+    return {name: downsample(frame, level_size(frame_size, size)) for name, size in levels.items()}
+
+
+def capture_pyramid(levels=LEVELS, output_dir=OUTPUT_DIR, pdf=False, freeze_media=True, recipes_file=RECIPES_FILE):
+    """Capture every slide/state once at the largest level, write all levels"""
+    recipes = load_recipes(recipes_file)
+    levels = dict(levels)
+    largest = max(levels.values(), key=lambda size: size[0] * size[1])
+    plan = plan_resolution(*largest)
+    output_dir = Path(output_dir)
+    for name in levels:
+        (output_dir / name).mkdir(parents=True, exist_ok=True)
+
+    names = []
+    with ExitStack() as stack:
+        pipelines = {}
+        if pdf:
+            pipelines = {name: stack.enter_context(FramePipeline(resolution=float(plan.dpi)))
+                         for name in levels}
+        p = stack.enter_context(sync_playwright())
+        page = stack.enter_context(deck_page(
+            p,
+            viewport=plan.viewport,
+            device_scale_factor=plan.device_scale_factor,
+            freeze_media=freeze_media
+        ))
+        print(f"Capture resolution: {describe(plan)}")
+        print("Waiting for presentation to load...")
+        page.wait_for_timeout(5000)
+        apply_css_zoom(page, plan.css_zoom)
+        capture = CDPCapture(page)
+
+        for slide_index, slide_id, num_states, slide_name in SLIDE_CONFIG:
+            print(f"\nProcessing slide {slide_index} ({slide_id}) - {slide_name} ({num_states} state(s))...")
+            goto_slide(page, slide_index, settle_ms=2500)
+
+            # States are reached through the capture recipes (actions + readiness)
+            for state, step in enumerate(recipe_for(recipes, slide_id, num_states)):
+                failed = run_step(page, slide_index, step, recipes['defaults'])
+                if failed:
+                    print(f"    Warning: state {state + 1} not ready ({', '.join(failed)})")
+                if freeze_media:
+                    wait_for_frozen_media(page)
+
+                name = f'slide_{len(names):03d}_{slide_name}' + (f'_state{state + 1}' if num_states > 1 else '')
+                frame = capture.capture()
+                if frame.shape[2] == 4:
+                    # The deck is opaque; averaging RGB only saves a quarter of the work
+                    frame = frame[:, :, :3]
+                for level, derived in build_pyramid(frame, levels).items():
+                    image = to_image(derived)
+                    image.save(output_dir / level / f'{name}.png')
+                    if pdf:
+                        # Blocks while that level's pipeline is full
+                        pipelines[level].submit(name, image)
+                names.append(name)
+                print(f"    ✓ {name}: {frame.shape[1]}x{frame.shape[0]} -> {', '.join(levels)}")
+
+        capture.close()
+
+        if not names:
+            print("ERROR: No screenshots were taken!")
+            return False
+
+        print(f"\n✅ {len(names)} frames x {len(levels)} levels written to {output_dir}/")
+        for level, pipeline in pipelines.items():
+            output_file = output_dir / f'HTPAAC_{level}.pdf'
+            size = pipeline.finish(output_file)
+            print(f"   {output_file}: {size / 1024 / 1024:.2f} MB")
+    return True
+
+
+def parse_levels(spec):
+    """'hd,4k,1280x720' -> {name: (width, height)}"""
+    levels = {}
+    for item in spec.split(','):
+        item = item.strip().lower()
+        if item in LEVELS:
+            levels[item] = LEVELS[item]
+        elif 'x' in item:
+            width, height = item.split('x')
+            levels[item] = (int(width), int(height))
+        else:
+            raise argparse.ArgumentTypeError(f"Unknown level '{item}' (use {', '.join(LEVELS)} or WxH)")
+    return levels
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Capture each slide once and export several resolutions')
+    parser.add_argument('--levels', type=parse_levels, default=LEVELS,
+                        help=f"Comma-separated levels: {', '.join(LEVELS)} or WxH (default: all)")
+    parser.add_argument('--output', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR}/)')
+    parser.add_argument('--pdf', action='store_true', help='Also write one PDF per level')
+    parser.add_argument('--no-freeze', action='store_true', help='Do not pin animated media to fixed frames')
+    parser.add_argument('--recipes', default=RECIPES_FILE, help='Capture recipe file (default: capture_recipes.json)')
+    args = parser.parse_args()
+
+    if not capture_pyramid(args.levels, args.output, args.pdf, not args.no_freeze, args.recipes):
+        print("\n❌ Pyramid export failed!")
+        exit(1)
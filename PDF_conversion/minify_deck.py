@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Minification step for the deck build
+
+script.js (2,800 lines of mostly indented HTML templates), styles.css and
+index.html are shipped as written. This step, in pure Python:
+
+1. minifies script.js: comments, indentation and redundant whitespace are
+   removed; string, template and regex literals are kept byte for byte
+2. minifies styles.css
+3. inlines the critical CSS for the title slide into index.html and loads
+   the full stylesheet without blocking first paint
+4. minifies index.html (comments, indentation)
+5. writes script.js.map and styles.css.map (source map v3, one mapping per
+   output line) with the pre-minification sources embedded
+
+The minifiers are deliberately conservative: JS keeps its line breaks, so
+automatic semicolon insertion behaves exactly as in the source.
+
+Usage:
+    python minify_deck.py [--dist ../dist] [--no-critical] [--no-source-maps]
+"""
+
+import argparse
+import bisect
+import json
+import re
+from pathlib import Path
+
+from deck_build import DIST_ROOT, ensure_staged
+
+BASE64_DIGITS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+
+# A '/' after one of these starts a regex literal, otherwise it divides
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void',
+                  'throw', 'case', 'do', 'else', 'yield', 'await'}
+JS_WORD = re.compile(r'[\w$]+')
+
+# Whitespace next to these JS characters is never significant. '+', '-',
+# '/', '<', '>', '!', '?' and '.' are left alone ('a + +b', '<!--', '?.5').
+JS_TIGHT = set('{}()[];,=:&|')
+
+# Whitespace next to these CSS characters is never significant (':' only
+# inside declaration blocks, where it cannot be a pseudo-class)
+CSS_TIGHT_AFTER = set('{};,>\n')
+CSS_TIGHT_BEFORE = set('{};,>')
+RULE_BLOCK_AT_RULES = ('@media', '@supports', '@document', '@container', '@layer',
+                       '@keyframes', '@-webkit-keyframes')
+
+HTML_RAW_BLOCK = re.compile(r'<(pre|textarea|script|style)\b[^>]*>.*?</\1>', re.S | re.I)
+HTML_COMMENT = re.compile(r'<!--(?!\[).*?-->', re.S)
+
+STYLESHEET_LINK = '<link rel="stylesheet" href="styles.css">'
+
+# Markup outside the slides (and the first slide) that is visible at load
+CRITICAL_TAGS = {'html', 'body', '*'}
+SELECTOR_PSEUDO = re.compile(r'::?[\w-]+(\([^)]*\))?')
+SELECTOR_ATTR = re.compile(r'\[[^\]]*\]')
+SELECTOR_CLASS = re.compile(r'\.((?:[\w-]|\\.)+)')
+SELECTOR_ID = re.compile(r'#((?:[\w-]|\\.)+)')
+SELECTOR_TAG = re.compile(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)')
+RUNTIME_CLASS = re.compile(r'''classList\.(?:add|toggle|remove|contains)\(\s*['"]([\w-]+)''')
+RUNTIME_CLASS_NAME = re.compile(r'''className\s*=\s*['"]([^'"]+)''')
+RUNTIME_TAG = re.compile(r'''createElement\(\s*['"](\w+)''')
+
+
+class SourceMap:
+    """Source map v3 for a single source, built one output line at a time"""
+
+    def __init__(self, file, source, content):
+        self.file = file
+        self.source = source
+        self.content = content
+        self.lines = []  # per output line: (source line, source column)
+
+    def add_line(self, src_line, src_col):
+        self.lines.append((src_line, src_col))
+
+    @staticmethod
+    def _vlq(value):
+        value = ((-value) << 1) | 1 if value < 0 else value << 1
+        encoded = ''
+        while True:
+            digit, value = value & 31, value >> 5
+            encoded += BASE64_DIGITS[digit | (32 if value else 0)]
+            if not value:
+                return encoded
+
+    def mappings(self):
+        segments, prev_line, prev_col = [], 0, 0
+        for src_line, src_col in self.lines:
+            # [output column, source index, source line, source column]
+            segments.append(self._vlq(0) + self._vlq(0) +
+                            self._vlq(src_line - prev_line) + self._vlq(src_col - prev_col))
+            prev_line, prev_col = src_line, src_col
+        return ';'.join(segments)
+
+    def to_json(self):
+        return json.dumps({
+            'version': 3,
+            'file': self.file,
+            'sources': [self.source],
+            'sourcesContent': [self.content],
+            'names': [],
+            'mappings': self.mappings(),
+        })
+
+
+def _line_col(offsets, pos):
+    line = bisect.bisect_right(offsets, pos) - 1
+    return line, pos - offsets[line]
+
+
+def _line_offsets(text):
+    return [0] + [m.end() for m in re.finditer('\n', text)]
+
+
+def _scan_js(src):
+    """
+    Blank out comments and classify characters.
+    Returns (text, code) where text has comments replaced by spaces (so line
+    and column positions are unchanged) and code[i] is 1 for characters
+    outside string/template/regex literals.
+    """
+    n = len(src)
+    text = list(src)
+    code = bytearray(n)
+    stack = [['code', 0]]  # template literals and their ${...} expressions
+    last = ''
+    i = 0
+
+    while i < n:
+        c = src[i]
+        nxt = src[i + 1] if i + 1 < n else ''
+        top = stack[-1]
+
+        if top[0] == 'template':
+            if c == '\\':
+                i += 2
+            elif c == '`':
+                stack.pop()
+                last = '`'
+                i += 1
+            elif c == '$' and nxt == '{':
+                stack.append(['code', 1])
+                code[i:i + 2] = b'\x01\x01'
+                last = '{'
+                i += 2
+            else:
+                i += 1
+            continue
+
+        if c in '"\'':
+            j = i + 1
+            while j < n and src[j] != c:
+                j += 2 if src[j] == '\\' else 1
+            i = j + 1
+            last = '"'
+        elif c == '`':
+            stack.append(['template', 0])
+            i += 1
+        elif c == '/' and nxt == '/':
+            while i < n and src[i] != '\n':
+                text[i] = ' '
+                code[i] = 1
+                i += 1
+        elif c == '/' and nxt == '*':
+            end = src.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            for j in range(i, end):
+                if src[j] != '\n':
+                    text[j] = ' '
+                code[j] = 1
+            i = end
+        elif c == '/' and (not last or last in REGEX_PRECEDERS or last in REGEX_KEYWORDS):
+            j, in_class = i + 1, False
+            while j < n and src[j] != '\n' and (src[j] != '/' or in_class):
+                if src[j] == '\\':
+                    j += 1
+                elif src[j] == '[':
+                    in_class = True
+                elif src[j] == ']':
+                    in_class = False
+                j += 1
+            flags = JS_WORD.match(src, j + 1)
+            i = flags.end() if flags else j + 1
+            last = ')'
+        else:
+            word = JS_WORD.match(src, i)
+            if word:
+                code[i:word.end()] = b'\x01' * (word.end() - i)
+                last = word.group(0)
+                i = word.end()
+                continue
+            code[i] = 1
+            if c == '{':
+                top[1] += 1
+            elif c == '}':
+                top[1] -= 1
+                if len(stack) > 1 and top[1] == 0:
+                    # End of a ${...} expression, back inside the template
+                    stack.pop()
+            if not c.isspace():
+                last = c
+            i += 1
+
+    return ''.join(text), code
+
+
+def minify_js(src, source_map=None):
+    text, code = _scan_js(src)
+    out_lines = []
+    pos = 0
+    for line in text.split('\n'):
+        start, end = pos, pos + len(line)
+        pos = end + 1
+
+        # Indentation and trailing space are only removable outside literals
+        lo, hi = start, end
+        while lo < hi and text[lo] in ' \t\r' and code[lo]:
+            lo += 1
+        while hi > lo and text[hi - 1] in ' \t\r' and code[hi - 1]:
+            hi -= 1
+        if lo == hi and (end >= len(code) or code[end]):
+            continue
+
+        chars = []
+        i = lo
+        while i < hi:
+            c = text[i]
+            if code[i] and c in ' \t':
+                j = i
+                while j < hi and text[j] in ' \t' and code[j]:
+                    j += 1
+                before = chars[-1] if chars else ''
+                after = text[j] if j < hi else ''
+                if before not in JS_TIGHT and after not in JS_TIGHT:
+                    chars.append(' ')
+                i = j
+                continue
+            chars.append(c)
+            i += 1
+
+        out_lines.append(''.join(chars))
+        if source_map is not None:
+            source_map.add_line(src.count('\n', 0, start), lo - start)
+
+    return '\n'.join(out_lines)
+
+
+def minify_css(src, source_map=None):
+    offsets = _line_offsets(src)
+    out = []
+    blocks = []          # per open block: True if it holds declarations
+    prelude_start = 0    # index in out where the current prelude began
+    pending_space = False
+    line_start = True
+    i, n = 0, len(src)
+
+    def emit(chunk, pos):
+        nonlocal pending_space, line_start
+        in_decls = bool(blocks) and blocks[-1]
+        tight_after = CSS_TIGHT_AFTER | ({':'} if in_decls else set())
+        if pending_space and out and out[-1][-1] not in tight_after and chunk[0] not in CSS_TIGHT_BEFORE:
+            out.append(' ')
+        pending_space = False
+        if line_start:
+            line_start = False
+            if source_map is not None:
+                source_map.add_line(*_line_col(offsets, pos))
+        out.append(chunk)
+
+    while i < n:
+        c = src[i]
+        if c in '"\'':
+            j = i + 1
+            while j < n and src[j] != c:
+                j += 2 if src[j] == '\\' else 1
+            emit(src[i:j + 1], i)
+            i = j + 1
+        elif c == '/' and src.startswith('/*', i):
+            end = src.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+        elif c.isspace():
+            pending_space = True
+            i += 1
+        elif c == '{':
+            prelude = ''.join(out[prelude_start:]).strip()
+            emit('{', i)
+            blocks.append(not prelude.startswith(RULE_BLOCK_AT_RULES))
+            prelude_start = len(out)
+            i += 1
+        elif c == '}':
+            if out and out[-1] == ';':
+                out.pop()
+            pending_space = False
+            emit('}', i)
+            if blocks:
+                blocks.pop()
+            out.append('\n')
+            line_start = True
+            prelude_start = len(out)
+            i += 1
+        elif c == ';':
+            emit(';', i)
+            prelude_start = len(out)
+            i += 1
+        else:
+            emit(c, i)
+            i += 1
+
+    return ''.join(out).strip()
+
+
+def _css_statements(css):
+    """Top-level statements of a stylesheet as (prelude, body or None, text)"""
+    statements = []
+    depth, start, body_start, i = 0, 0, None, 0
+    while i < len(css):
+        c = css[i]
+        if c in '"\'':
+            i = css.find(c, i + 1) + 1 or len(css)
+            continue
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end < 0 else end + 2
+            if depth == 0:
+                start = i
+            continue
+        if c == '{':
+            if depth == 0:
+                body_start = i + 1
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                statements.append((css[start:body_start - 1].strip(), css[body_start:i], css[start:i + 1].strip()))
+                start = i + 1
+        elif c == ';' and depth == 0:
+            statements.append((css[start:i].strip(), None, css[start:i + 1].strip()))
+            start = i + 1
+        i += 1
+    return statements
+
+
+def _unescape_ident(name):
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def used_selectors(html, js):
+    """Classes, ids and tags present in markup visible at load"""
+    classes, ids, tags = set(), set(), set(CRITICAL_TAGS)
+    for value in re.findall(r'''\sclass=["']([^"']*)["']''', html):
+        classes.update(value.split())
+    ids.update(re.findall(r'''\sid=["']([^"']*)["']''', html))
+    tags.update(t.lower() for t in re.findall(r'<([a-zA-Z][\w-]*)', html))
+    classes.update(RUNTIME_CLASS.findall(js))
+    for value in RUNTIME_CLASS_NAME.findall(js):
+        classes.update(value.split())
+    tags.update(t.lower() for t in RUNTIME_TAG.findall(js))
+    return classes, ids, tags
+
+
+def _selector_used(selector, classes, ids, tags):
+    selector = SELECTOR_ATTR.sub('', SELECTOR_PSEUDO.sub('', selector)).strip()
+    if not selector:
+        return True
+    return (all(_unescape_ident(c) in classes for c in SELECTOR_CLASS.findall(selector))
+            and all(_unescape_ident(i) in ids for i in SELECTOR_ID.findall(selector))
+            and all(t.lower() in tags for t in SELECTOR_TAG.findall(selector)))
+
+
+def critical_css(css, html, js):
+    """Rules of styles.css that can apply to the title slide at load"""
+    starts = [m.start() for m in re.finditer(r'<div id="slide-[^"]+" class="slide', html)]
+    visible = html[:starts[1]] if len(starts) > 1 else html
+    classes, ids, tags = used_selectors(visible, js)
+
+    def select(text):
+        kept, keyframes = [], []
+        for prelude, body, statement in _css_statements(text):
+            if body is None or prelude.startswith(('@font-face', '@property')):
+                kept.append(statement)
+            elif prelude.startswith(('@keyframes', '@-webkit-keyframes')):
+                keyframes.append((prelude.split()[-1], statement))
+            elif prelude.startswith(('@media', '@supports')):
+                inner, inner_keyframes = select(body)
+                keyframes.extend(inner_keyframes)
+                if inner:
+                    kept.append(f'{prelude} {{\n{inner}\n}}')
+            elif any(_selector_used(s, classes, ids, tags) for s in prelude.split(',')):
+                kept.append(statement)
+        return '\n'.join(kept), keyframes
+
+    kept, keyframes = select(css)
+    # Only the animations the critical rules actually run
+    used = [statement for name, statement in keyframes if re.search(rf'\b{re.escape(name)}\b', kept)]
+    return '\n'.join([kept] + used)
+
+
+def minify_html(html):
+    def minify_text(text):
+        text = HTML_COMMENT.sub('', text)
+        lines = (line.strip() for line in text.split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+    out, pos = [], 0
+    for match in HTML_RAW_BLOCK.finditer(html):
+        out.append(minify_text(html[pos:match.start()]))
+        block = match.group(0)
+        if match.group(1).lower() == 'style':
+            open_end = block.index('>') + 1
+            close_start = block.rindex('</')
+            block = block[:open_end] + minify_css(block[open_end:close_start]) + block[close_start:]
+        out.append(block)
+        pos = match.end()
+    out.append(minify_text(html[pos:]))
+    # Raw blocks sit on their own lines in the source; keep them separated
+    return '\n'.join(part for part in out if part)
+
+
+def _report(name, before, after):
+    print(f"  ✓ {name}: {before / 1024:.1f} KB -> {after / 1024:.1f} KB ({100 - after * 100 / before:.0f}% smaller)")
+
+
+def minify_deck(dist=DIST_ROOT, critical=True, source_maps=True):
+    dist = ensure_staged(dist)
+    js_path, css_path, html_path = dist / 'script.js', dist / 'styles.css', dist / 'index.html'
+    if not js_path.exists() or not css_path.exists():
+        print(f"Note: {dist} has no script.js/styles.css (already hashed?), skipping")
+        return True
+
+    js = js_path.read_text(encoding='utf-8')
+    css = css_path.read_text(encoding='utf-8')
+    html = html_path.read_text(encoding='utf-8')
+
+    js_map = SourceMap('script.js', 'script.js', js) if source_maps else None
+    css_map = SourceMap('styles.css', 'styles.css', css) if source_maps else None
+    min_js = minify_js(js, js_map)
+    min_css = minify_css(css, css_map)
+    if source_maps:
+        (dist / 'script.js.map').write_text(js_map.to_json(), encoding='utf-8')
+        (dist / 'styles.css.map').write_text(css_map.to_json(), encoding='utf-8')
+        min_js += '\n//# sourceMappingURL=script.js.map'
+        min_css += '\n/*# sourceMappingURL=styles.css.map */'
+    _report('script.js', len(js.encode()), len(min_js.encode()))
+    _report('styles.css', len(css.encode()), len(min_css.encode()))
+
+    if critical and STYLESHEET_LINK in html:
+        inline = minify_css(critical_css(css, html, js))
+        # The deferred sheet is the complete stylesheet, so the cascade order
+        # is the same as before once it has loaded
+        html = html.replace(STYLESHEET_LINK, (
+            f'<style>\n{inline}\n</style>\n'
+            '<link rel="stylesheet" href="styles.css" media="print" onload="this.media=\'all\'">'
+        ), 1)
+        print(f"  ✓ critical CSS: {len(inline.encode()) / 1024:.1f} KB inlined, full stylesheet deferred")
+
+    min_html = minify_html(html)
+    _report('index.html', len(html.encode()), len(min_html.encode()))
+
+    js_path.write_text(min_js, encoding='utf-8')
+    css_path.write_text(min_css, encoding='utf-8')
+    html_path.write_text(min_html, encoding='utf-8')
+    print("✅ Minified deck sources")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Minify script.js, styles.css and index.html in dist/')
+    parser.add_argument('--dist', default=str(DIST_ROOT), help='Build directory (default: dist/)')
+    parser.add_argument('--no-critical', action='store_true', help='Keep styles.css render-blocking')
+    parser.add_argument('--no-source-maps', action='store_true', help='Do not write .map files')
+    args = parser.parse_args()
+
+    if not minify_deck(Path(args.dist), not args.no_critical, not args.no_source_maps):
+        exit(1)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Image optimization step for the deck build
+
+Many originals in img/ are several MB (Film2.png, lilypad.png,
+breadboard.jpeg, ...) while the slides draw them 140-280 px tall. This step:
+
+1. finds every <img src="img/..."> in index.html and the script.js templates
+2. measures the CSS width each image is actually laid out at: the deck is
+   loaded in Playwright (deck_page) and every slide/state is visited at the
+   design and 2560 px viewports, taking the widest getBoundingClientRect()
+   per image. Images never rendered there (or without Playwright, or with
+   --no-measure) fall back to their inline size (height: 200px, ...)
+3. emits resized 1x/2x WebP (or AVIF) variants into img/optimized/
+4. rewrites the <img> tags in dist/ with srcset/sizes; images styles.css
+   targets by name ([src*="..."] selectors) are left alone
+
+Outputs are cached in .build_cache/images/ keyed by the source hash and the
+requested widths, so unchanged images are not re-encoded. The measured
+widths are cached in .build_cache/layout.json, keyed by the deck's
+index.html, styles.css and script.js (transcode_gifs.py reuses them).
+
+Usage:
+    python optimize_images.py [--dist ../dist] [--format webp|avif] [--no-measure]
+"""
+
+import argparse
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+PLAYWRIGHT_AVAILABLE = False
+try:
+    from playwright.sync_api import sync_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    pass
+
+from deck_build import (BUILD_CACHE, DECK_ROOT, DIST_ROOT, HashCache, ensure_staged, file_digest,
+                        src_selectors, targets_src_selector)
+
+# Widest content column used by the slides (CSS px); bounds images whose size
+# is not fixed by their inline style
+DECK_MAX_WIDTH = 1200
+
+DENSITIES = (1, 2)
+
+QUALITY = {'webp': 80, 'avif': 60}
+
+# GIFs are animated (see the GIF transcoding step); SVGs are already vector
+SKIP_SUFFIXES = {'.gif', '.svg'}
+
+OUTPUT_DIR = 'img/optimized'
+CACHE_SUBDIR = 'images'
+
+# Layout measurement: the design viewport and the min-width 2560px breakpoint
+MEASURE_VIEWPORTS = ((1920, 1080), (2560, 1440))
+MEASURE_SETTLE_MS = 600
+LAYOUT_SOURCES = ('index.html', 'styles.css', 'script.js')
+
+# Laid-out CSS width of every img/ image currently rendered
+RENDERED_WIDTHS_JS = '''
+() => Array.from(document.querySelectorAll('img[src^="img/"]'))
+    .map(img => [img.getAttribute('src'), img.getBoundingClientRect().width])
+    .filter(([, width]) => width > 0)
+'''
+
+IMG_TAG = re.compile(r'<img\b[^>]*>', re.S)
+SRC_ATTR = re.compile(r'''(\ssrc=)(["'])(img/[^"']+)\2''')
+STYLE_ATTR = re.compile(r'''\sstyle=(["'])(.*?)\1''', re.S)
+ONERROR_ATTR = re.compile(r'''(\sonerror=)(["'])''')
+# Images whose src is swapped by a handler (e.g. EDAhard/EDAeasy on click)
+# must keep a plain src, since srcset would take precedence
+SRC_SWAP_HANDLER = re.compile(r'''\son(?!error)\w+=(["'])[^"']*this\.src\s*=''')
+
+
+def css_px(style, prop):
+    """Pixel value of a CSS property in an inline style, or None"""
+    match = re.search(rf'(?<![-\w]){prop}\s*:\s*([\d.]+)px', style)
+    return float(match.group(1)) if match else None
+
+
+def rendered_css_width(style, natural_size):
+    """Upper bound of the CSS width an image is drawn at for a given inline style"""
+    natural_w, natural_h = natural_size
+    aspect = natural_w / natural_h
+    width = css_px(style, 'width')
+    height = css_px(style, 'height')
+    max_width = css_px(style, 'max-width')
+    max_height = css_px(style, 'max-height')
+
+    if width is not None:
+        css_w = width
+    elif height is not None:
+        css_w = height * aspect
+    elif max_height is not None:
+        css_w = max_height * aspect
+    else:
+        css_w = DECK_MAX_WIDTH
+
+    if max_width is not None:
+        css_w = min(css_w, max_width)
+    return min(css_w, DECK_MAX_WIDTH, natural_w)
+
+
+def _measure(viewports):
+    # Export helpers need Playwright themselves, so load them lazily
+    from capture_recipes import SET_STATE_JS
+    from export_engine import GOTO_SLIDE_JS, SLIDE_CONFIG, deck_page
+
+    widths = {}
+    with sync_playwright() as p:
+        for width, height in viewports:
+            print(f"  Measuring layout at {width}x{height}...")
+            with deck_page(p, {'width': width, 'height': height}) as page:
+                for slide_index, _, num_states, _ in SLIDE_CONFIG:
+                    page.evaluate(GOTO_SLIDE_JS, [slide_index, []])
+                    for state in range(num_states):
+                        if state:
+                            page.evaluate(SET_STATE_JS, [slide_index, state])
+                        page.wait_for_timeout(MEASURE_SETTLE_MS)
+                        for src, css_w in page.evaluate(RENDERED_WIDTHS_JS):
+                            path = unquote(src)
+                            widths[path] = max(widths.get(path, 0), css_w)
+    return {path: round(css_w) for path, css_w in widths.items()}
+
+
+def measured_widths(measure=True, viewports=MEASURE_VIEWPORTS):
+    """
+    img/ path -> widest laid-out CSS width across all slides and states,
+    from the cache when the deck's layout sources are unchanged. Empty
+    without Playwright (the inline-style estimate is used instead).
+    """
+    if not measure:
+        return {}
+    digest = '-'.join(file_digest(DECK_ROOT / name) for name in LAYOUT_SOURCES)
+    params = {'viewports': [list(v) for v in viewports]}
+    cache = HashCache('layout')
+    entry = cache.lookup('widths', digest, params)
+    if entry:
+        return entry['widths']
+    if not PLAYWRIGHT_AVAILABLE:
+        print("  Note: Playwright not installed, sizing images from inline styles "
+              "(pip install playwright && playwright install chromium)")
+        return {}
+    try:
+        widths = _measure(viewports)
+    except Exception as e:
+        reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+        print(f"  Warning: layout measurement failed ({reason}), sizing images from inline styles")
+        return {}
+    cache.store('widths', digest, params, [], widths=widths)
+    cache.save()
+    return widths
+
+
+def css_width(path, styles, natural_size, measured):
+    """CSS width to size an image for: measured layout, else the inline-style estimate"""
+    if measured.get(path):
+        return min(measured[path], natural_size[0])
+    return max(rendered_css_width(style, natural_size) for style in styles)
+
+
+def collect_usages(texts, pinned=()):
+    """
+    Map img/ path -> inline styles of every rewritable <img> using it.
+    Images a stylesheet targets by name (pinned [src*=...] values) keep
+    their src, or the rule would stop matching.
+    """
+    usages = {}
+    for text in texts:
+        for tag in IMG_TAG.findall(text):
+            src = SRC_ATTR.search(tag)
+            if not src or ' data-src=' in tag or SRC_SWAP_HANDLER.search(tag):
+                continue
+            if targets_src_selector(src.group(3), pinned):
+                continue
+            path = unquote(src.group(3))
+            if Path(path).suffix.lower() in SKIP_SUFFIXES:
+                continue
+            style = STYLE_ATTR.search(tag)
+            usages.setdefault(path, []).append(style.group(2) if style else '')
+    return usages
+
+
+def variant_name(path, digest, width, fmt):
+    stem = re.sub(r'[^A-Za-z0-9_-]+', '_', Path(path).stem).strip('_') or 'image'
+    return f'{stem}-{width}w.{digest[:8]}.{fmt}'
+
+
+def _process_image(job):
+    """Measure and encode one image (runs in a worker process)"""
+    path, source, styles, measured, fmt, entry, cache_dir = job
+    digest = file_digest(source)
+
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        natural = img.size
+        css_w = css_width(path, styles, natural, measured)
+        widths = sorted({min(natural[0], round(css_w * d)) for d in DENSITIES})
+        params = {'widths': widths, 'format': fmt, 'quality': QUALITY[fmt]}
+
+        names = [variant_name(path, digest, w, fmt) for w in widths]
+        outputs = [f'{CACHE_SUBDIR}/{name}' for name in names]
+        if (entry and entry.get('hash') == digest and entry.get('params') == params
+                and all((Path(cache_dir) / o).exists() for o in outputs)):
+            return {'path': path, 'digest': digest, 'params': params, 'outputs': outputs,
+                    'css_width': entry['css_width'], 'keep': entry['keep'], 'cached': True}
+
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        base = img.convert('RGBA' if has_alpha else 'RGB')
+        save_options = {'quality': QUALITY[fmt]}
+        if fmt == 'webp':
+            save_options['method'] = 6
+
+        for width, output in zip(widths, outputs):
+            height = max(1, round(width * natural[1] / natural[0]))
+            variant = base if width == natural[0] else base.resize((width, height), Image.Resampling.LANCZOS)
+            target = Path(cache_dir) / output
+            target.parent.mkdir(parents=True, exist_ok=True)
+            variant.save(target, fmt.upper(), **save_options)
+
+    # Keep the original when even the largest variant is not smaller
+    keep = os.path.getsize(Path(cache_dir) / outputs[-1]) >= os.path.getsize(source)
+    return {'path': path, 'digest': digest, 'params': params, 'outputs': outputs,
+            'css_width': round(css_w), 'keep': keep, 'cached': False}
+
+
+def rewrite_img_tags(text, results):
+    """Add srcset/sizes (and swap src) on <img> tags that have variants"""
+    def rewrite(match):
+        tag = match.group(0)
+        src = SRC_ATTR.search(tag)
+        if not src or ' data-src=' in tag or SRC_SWAP_HANDLER.search(tag):
+            return tag
+        result = results.get(unquote(src.group(3)))
+        if not result or result['keep']:
+            return tag
+
+        urls = [f"{OUTPUT_DIR}/{quote(Path(o).name)}" for o in result['outputs']]
+        srcset = ', '.join(f'{url} {w}w' for url, w in zip(urls, result['params']['widths']))
+        quote_char = src.group(2)
+        tag = (tag[:src.start()]
+               + f'{src.group(1)}{quote_char}{urls[-1]}{quote_char}'
+               + f' srcset={quote_char}{srcset}{quote_char}'
+               + f' sizes={quote_char}{result["css_width"]}px{quote_char}'
+               + tag[src.end():])
+        # Fallback handlers set src, which srcset would otherwise override
+        return ONERROR_ATTR.sub(lambda m: f"{m.group(1)}{m.group(2)}this.removeAttribute('srcset'); ", tag, count=1)
+
+    return IMG_TAG.sub(rewrite, text)
+
+
+def optimize_images(dist=DIST_ROOT, fmt='webp', workers=None, measure=True):
+    dist = ensure_staged(dist)
+    if not features.check(fmt):
+        print(f"Error: this Pillow build cannot write {fmt.upper()}")
+        return False
+
+    text_files = [dist / 'index.html', dist / 'script.js']
+    texts = [f.read_text(encoding='utf-8') for f in text_files]
+    usages = collect_usages(texts, src_selectors(dist))
+    measured = measured_widths(measure)
+
+    cache = HashCache('images')
+    jobs = []
+    for path, styles in sorted(usages.items()):
+        source = dist / path
+        if not source.exists():
+            print(f"  Warning: {path} not found, skipping")
+            continue
+        widths = {path: measured[path]} if path in measured else {}
+        jobs.append((path, str(source), styles, widths, fmt, cache.entries.get(path), str(BUILD_CACHE)))
+
+    print(f"Optimizing {len(jobs)} images ({fmt.upper()}, {'/'.join(f'{d}x' for d in DENSITIES)})...")
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_process_image, jobs):
+            results[result['path']] = result
+            cache.store(result['path'], result['digest'], result['params'], result['outputs'],
+                        css_width=result['css_width'], keep=result['keep'])
+            status = 'cached' if result['cached'] else 'encoded'
+            if result['keep']:
+                status += ', original kept'
+            print(f"  ✓ {result['path']}: {result['css_width']} css px -> "
+                  f"{result['params']['widths']} ({status})")
+    cache.save()
+
+    before = after = 0
+    output_dir = dist / OUTPUT_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for path, result in results.items():
+        before += os.path.getsize(dist / path)
+        if result['keep']:
+            after += os.path.getsize(dist / path)
+            continue
+        for output in result['outputs']:
+            shutil.copy2(BUILD_CACHE / output, output_dir / Path(output).name)
+        after += os.path.getsize(BUILD_CACHE / result['outputs'][-1])
+
+    for text_file, text in zip(text_files, texts):
+        text_file.write_text(rewrite_img_tags(text, results), encoding='utf-8')
+
+    print(f"✅ Images: {before / 1024 / 1024:.1f} MB -> {after / 1024 / 1024:.1f} MB (largest variants)")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Emit resized responsive image variants into dist/')
+    parser.add_argument('--dist', default=str(DIST_ROOT), help='Build directory (default: dist/)')
+    parser.add_argument('--format', default='webp', choices=sorted(QUALITY), help='Variant format (default: webp)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--no-measure', action='store_true',
+                        help='Size images from inline styles instead of measuring the layout')
+    args = parser.parse_args()
+
+    if not optimize_images(Path(args.dist), args.format, args.workers, not args.no_measure):
+        exit(1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Resolution planner: render at the output size instead of resampling
+
+Rendering a 3840x2160 viewport at 2x and thumbnailing to 2560x1440 throws
+away most of the rasterized pixels. Given the wanted output (pixel size, or
+page size and DPI) the planner picks:
+
+- viewport: the CSS layout size, the deck's design width (1920) with the
+  output's aspect ratio, so breakpoints and layout match the live deck
+- device_scale_factor: output width / viewport width, so the browser
+  rasterizes the final resolution natively
+- css_zoom: only when the scale factor would exceed max_scale; the page is
+  zoomed instead and the viewport grown to match
+
+Resampling (fit_to_plan) is only a fallback for frames that do not come out
+at the planned size.
+
+    plan = plan_resolution(*target_pixels(page_size='a4', dpi=200))
+    context = browser.new_context(viewport=plan.viewport, device_scale_factor=plan.device_scale_factor)
+    apply_css_zoom(page, plan.css_zoom)
+
+Usage:
+    python resolution_planner.py --width 2560 --height 1440
+    python resolution_planner.py --page a4 --dpi 300
+"""
+
+import argparse
+from collections import namedtuple
+
+# The layout the deck is designed for (CSS px)
+DESIGN_VIEWPORT = (1920, 1080)
+
+# Chromium rasterizes fine above this, but tile memory grows with its square
+MAX_SCALE = 4.0
+
+# Landscape page sizes in inches
+PAGE_SIZES = {
+    'slide-16x9': (13.333, 7.5),
+    'slide-4x3': (10.0, 7.5),
+    'a4': (11.693, 8.268),
+    'a3': (16.535, 11.693),
+    'letter': (11.0, 8.5),
+    'legal': (14.0, 8.5),
+}
+
+DEFAULT_DPI = 150
+
+ResolutionPlan = namedtuple('ResolutionPlan', [
+    'viewport',             # {'width': css px, 'height': css px}
+    'device_scale_factor',
+    'css_zoom',
+    'output_size',          # (width, height) wanted in pixels
+    'native_size',          # (width, height) the browser will produce
+    'dpi',                  # for the PDF encoder's resolution=
+])
+
+CSS_ZOOM_JS = '''
+(zoom) => {
+    document.documentElement.style.zoom = zoom === 1 ? '' : String(zoom);
+}
+'''
+
+
+def target_pixels(width=None, height=None, page_size=None, dpi=None):
+    """
+    Output size in pixels plus DPI, from explicit pixels or page size + DPI.
+    With only a width or height, the other follows the design aspect ratio.
+    """
+    if page_size:
+        if page_size not in PAGE_SIZES:
+            raise ValueError(f"Unknown page size '{page_size}' (choose from {', '.join(PAGE_SIZES)})")
+        dpi = dpi or DEFAULT_DPI
+        page_w, page_h = PAGE_SIZES[page_size]
+        return round(page_w * dpi), round(page_h * dpi), dpi
+
+    design_w, design_h = DESIGN_VIEWPORT
+    if width and not height:
+        height = round(width * design_h / design_w)
+    elif height and not width:
+        width = round(height * design_w / design_h)
+    elif not width:
+        width, height = design_w, design_h
+    return width, height, dpi or DEFAULT_DPI
+
+
+def plan_resolution(width, height, dpi=DEFAULT_DPI, design_viewport=DESIGN_VIEWPORT, max_scale=MAX_SCALE):
+    """Viewport, device_scale_factor and CSS zoom producing width x height natively"""
+    design_w = design_viewport[0]
+    scale = width / design_w
+    zoom = 1.0
+    if scale > max_scale:
+        zoom = scale / max_scale
+        scale = max_scale
+
+    # Layout stays design_w CSS px wide; zoom enlarges the viewport to match
+    viewport_w = round(design_w * zoom)
+    viewport_h = max(1, round(viewport_w * height / width))
+    native = (round(viewport_w * scale), round(viewport_h * scale))
+    return ResolutionPlan(
+        viewport={'width': viewport_w, 'height': viewport_h},
+        device_scale_factor=scale,
+        css_zoom=zoom,
+        output_size=(width, height),
+        native_size=native,
+        dpi=dpi,
+    )
+
+
+def apply_css_zoom(page, zoom):
+    """Apply a plan's CSS zoom (after navigation; no-op at 1)"""
+    if zoom != 1:
+        page.evaluate(CSS_ZOOM_JS, zoom)
+
+
+def fit_to_plan(frame, plan):
+    """
+    Fallback resample of a frame larger than the planned output (e.g. a
+    rounding pixel or a full-viewport capture with a different aspect).
+    Frames at or below the output size are returned unchanged.
+    """
+    out_w, out_h = plan.output_size
+    if frame.width <= out_w and frame.height <= out_h:
+        return frame
+    from PIL import Image
+    frame = frame.copy()
+    frame.thumbnail((out_w, out_h), Image.Resampling.LANCZOS)
+    return frame
+
+
+def describe(plan):
+    vw, vh = plan.viewport['width'], plan.viewport['height']
+    zoom = f", CSS zoom {plan.css_zoom:.3g}" if plan.css_zoom != 1 else ''
+    # Integer CSS viewports can miss the target by a pixel
+    target = '' if plan.native_size == plan.output_size else f" (target {plan.output_size[0]}x{plan.output_size[1]})"
+    return (f"{vw}x{vh} @ {plan.device_scale_factor:.4g}x{zoom} -> "
+            f"{plan.native_size[0]}x{plan.native_size[1]} px{target}, {plan.dpi} DPI")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Plan viewport and scale for a target export resolution')
+    parser.add_argument('--width', type=int, help='Output width in pixels')
+    parser.add_argument('--height', type=int, help='Output height in pixels')
+    parser.add_argument('--page', choices=sorted(PAGE_SIZES), help='Page size (landscape)')
+    parser.add_argument('--dpi', type=int, help=f'Output DPI (default: {DEFAULT_DPI})')
+    parser.add_argument('--max-scale', type=float, default=MAX_SCALE,
+                        help=f'Largest device_scale_factor before CSS zoom is used (default: {MAX_SCALE})')
+    args = parser.parse_args()
+
+    width, height, dpi = target_pixels(args.width, args.height, args.page, args.dpi)
+    print(describe(plan_resolution(width, height, dpi, max_scale=args.max_scale)))
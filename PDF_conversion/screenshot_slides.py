@@ -10,15 +10,16 @@ from pathlib import Path
 
 try:
     from playwright.sync_api import sync_playwright
-    from PIL import Image
 except ImportError:
     print("Error: Required libraries missing.")
     print("Install with: pip install playwright pillow")
     print("Then run: playwright install chromium")
     sys.exit(1)
 
+from export_engine import capture_frame, save_frames, write_pdf
 
-def screenshot_slides_to_pdf(input_file='index.html', output_file='HTPAAC_Screenshots.pdf'):
+
+def screenshot_slides_to_pdf(input_file='index.html', output_file='HTPAAC_Screenshots.pdf', save_images=None):
     """Navigate through slides, take screenshots, combine into PDF"""
 
     if not os.path.exists(input_file):
@@ -116,10 +117,9 @@ def screenshot_slides_to_pdf(input_file='index.html', output_file='HTPAAC_Screen
                         ''')
                         page.wait_for_timeout(500)
 
-                    # Take screenshot
-                    screenshot_path = f"temp_slide_{slide_idx}_{state}.png"
-                    page.screenshot(path=screenshot_path, full_page=False)
-                    screenshots.append(screenshot_path)
+                    # Take screenshot (kept in memory)
+                    name = f"slide_{slide_idx}_{state}.png"
+                    screenshots.append((name, capture_frame(page, full_page=False)))
                     print(f"  ✓ Captured")
 
             browser.close()
@@ -127,35 +127,14 @@ def screenshot_slides_to_pdf(input_file='index.html', output_file='HTPAAC_Screen
         # Combine screenshots into PDF
         if screenshots:
             print(f"\nCombining {len(screenshots)} screenshots into PDF...")
-            images = []
-            for path in screenshots:
-                img = Image.open(path)
-                # Convert RGBA to RGB if needed
-                if img.mode == 'RGBA':
-                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                    rgb_img.paste(img, mask=img.split()[3] if len(img.split()) > 3 else None)
-                    img = rgb_img
-                images.append(img)
+            if save_images:
+                save_frames(screenshots, save_images)
 
             # Save as PDF
-            if images:
-                images[0].save(
-                    output_file,
-                    "PDF",
-                    save_all=True,
-                    append_images=images[1:],
-                    resolution=100.0
-                )
-
-            # Clean up temp files
-            for path in screenshots:
-                try:
-                    os.remove(path)
-                except:
-                    pass
+            file_size = write_pdf([frame for _, frame in screenshots], output_file, resolution=100.0)
 
             print(f"\n✅ Successfully created: {output_file}")
-            print(f"Size: {os.path.getsize(output_file):,} bytes")
+            print(f"Size: {file_size:,} bytes")
             return True
         else:
             print("No screenshots captured!")
@@ -165,16 +144,15 @@ def screenshot_slides_to_pdf(input_file='index.html', output_file='HTPAAC_Screen
         print(f"Error: {e}")
         import traceback
         traceback.print_exc()
-
-        # Clean up any temp files
-        for path in screenshots:
-            try:
-                os.remove(path)
-            except:
-                pass
-
         return False
 
 
 if __name__ == '__main__':
-    screenshot_slides_to_pdf()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Screenshot every slide state into a PDF')
+    parser.add_argument('--save-images', metavar='DIR', default=None,
+                        help='Also write every captured frame as PNG into DIR')
+    args = parser.parse_args()
+
+    screenshot_slides_to_pdf(save_images=args.save_images)
\ No newline at end of file
@@ -4,9 +4,8 @@ Screenshot-based PDF generation
 Takes screenshots of each slide and combines them into a PDF
 """
 
-import os
+import argparse
 from pathlib import Path
-from PIL import Image
 
 try:
     from playwright.sync_api import sync_playwright
@@ -15,15 +14,10 @@ except ImportError:
     print("Install with: pip install playwright && playwright install chromium")
     exit(1)
 
-try:
-    from PIL import Image
-except ImportError:
-    print("Error: Pillow is required")
-    print("Install with: pip install Pillow")
-    exit(1)
+from export_engine import capture_frame, save_frames, write_pdf
 
 
-def screenshot_to_pdf():
+def screenshot_to_pdf(save_images=None):
     screenshots = []
 
     with sync_playwright() as p:
@@ -99,10 +93,8 @@ def screenshot_to_pdf():
             # Wait for slide to render
             page.wait_for_timeout(1000)
 
-            # Take screenshot
-            screenshot_path = f'temp_slide_{i:03d}.png'
-            page.screenshot(path=screenshot_path, full_page=False)
-            screenshots.append(screenshot_path)
+            # Take screenshot (kept in memory)
+            screenshots.append((f'slide_{i:03d}.png', capture_frame(page, full_page=False)))
 
         browser.close()
 
@@ -110,42 +102,28 @@ def screenshot_to_pdf():
     print("\nConverting screenshots to PDF...")
 
     if screenshots:
-        # Open all images
-        images = []
-        for path in screenshots:
-            img = Image.open(path)
-            # Convert RGBA to RGB if needed
-            if img.mode == 'RGBA':
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                rgb_img.paste(img, mask=img.split()[3] if len(img.split()) > 3 else None)
-                images.append(rgb_img)
-            else:
-                images.append(img)
+        if save_images:
+            save_frames(screenshots, save_images)
 
         # Save as PDF
-        if images:
-            images[0].save(
-                'HTPAAC_Screenshots.pdf',
-                save_all=True,
-                append_images=images[1:],
-                resolution=100.0,
-                quality=95,
-                optimize=True
-            )
-
-            print("✅ PDF created: HTPAAC_Screenshots.pdf")
-
-            # Clean up temporary files
-            for path in screenshots:
-                try:
-                    os.remove(path)
-                except:
-                    pass
-
-            return True
+        write_pdf(
+            [frame for _, frame in screenshots],
+            'HTPAAC_Screenshots.pdf',
+            resolution=100.0,
+            quality=95,
+            optimize=True
+        )
+
+        print("✅ PDF created: HTPAAC_Screenshots.pdf")
+        return True
 
     return False
 
 
 if __name__ == "__main__":
-    screenshot_to_pdf()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Screenshot every slide into a PDF')
+    parser.add_argument('--save-images', metavar='DIR', default=None,
+                        help='Also write every captured frame as PNG into DIR')
+    args = parser.parse_args()
+
+    screenshot_to_pdf(args.save_images)
\ No newline at end of file
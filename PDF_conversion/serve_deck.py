@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Local static server for the HTPAAC deck
+
+Serves the presentation over HTTP instead of file:// so the browser can use
+its HTTP cache, compression and service workers, just like production hosting:
+
+- precompressed variants (styles.css.br / styles.css.gz) when present, with
+  on-the-fly gzip/brotli for text assets otherwise
+- strong ETags with If-None-Match revalidation (304)
+- Cache-Control: immutable for content-hashed names (styles.3f2a9c1d.css),
+  no-cache (always revalidate) for everything else
+- byte ranges (206) for the large GIFs and videos
+
+Presenting:
+    python serve_deck.py            # http://127.0.0.1:8000/
+
+Exporting (used by the capture scripts):
+    server, url = start_deck_server(Path('..'))
+    page.goto(url)
+    ...
+    stop_deck_server(server)
+
+Dot-paths (/.git/..., /.build_cache/..., PDF_conversion/.export_cache/...)
+are never served.
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import os
+import re
+import threading
+import urllib.parse
+from email.utils import formatdate
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+DECK_ROOT = Path(__file__).resolve().parent.parent
+
+# Fixed port for exporters
+EXPORT_PORT = 8765
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/javascript',
+    'application/json',
+    'image/svg+xml',
+    'font/ttf',
+    'font/otf',
+)
+
+# name.<8+ hex digits>.ext is treated as content-hashed and cached forever
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.[A-Za-z0-9]+$')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+_etag_cache = {}
+_compressed_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _file_digest(path, stat):
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        digest = _etag_cache.get(key)
+    if digest is None:
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with _cache_lock:
+            _etag_cache[key] = digest
+    return digest
+
+
+def _compress(path, stat, encoding):
+    key = (path, stat.st_mtime_ns, stat.st_size, encoding)
+    with _cache_lock:
+        data = _compressed_cache.get(key)
+    if data is None:
+        raw = Path(path).read_bytes()
+        if encoding == 'br':
+            data = brotli.compress(raw, quality=11)
+        else:
+            data = gzip.compress(raw, compresslevel=9, mtime=0)
+        with _cache_lock:
+            _compressed_cache[key] = data
+    return data
+
+
+def _parse_range(header, size):
+    """Parse a single 'bytes=start-end' range; returns (start, end) or None"""
+    match = re.fullmatch(r'bytes=(\d*)-(\d*)', header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.groups()
+    if start == '':
+        length = int(end)
+        if length == 0:
+            return None
+        start, end = max(0, size - length), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+
+class _RangeFile:
+    """File wrapper that stops reading after length bytes"""
+
+    def __init__(self, f, start, length):
+        self.f = f
+        self.f.seek(start)
+        self.remaining = length
+
+    def read(self, n=-1):
+        if self.remaining <= 0:
+            return b''
+        if n < 0 or n > self.remaining:
+            n = self.remaining
+        data = self.f.read(n)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+class DeckRequestHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler with compression, ETags and ranges"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if not getattr(self.server, 'quiet', False):
+            super().log_message(format, *args)
+
+    def _accepted_encodings(self):
+        header = self.headers.get('Accept-Encoding', '')
+        return {part.split(';')[0].strip() for part in header.split(',') if part.strip()}
+
+    def _select_variant(self, path, stat, ctype):
+        """Return (encoding, data-or-path) for the best representation"""
+        accepted = self._accepted_encodings()
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if encoding not in accepted:
+                continue
+            variant = path + suffix
+            if os.path.isfile(variant) and os.stat(variant).st_mtime_ns >= stat.st_mtime_ns:
+                return encoding, variant
+
+        if ctype.startswith(COMPRESSIBLE_TYPES):
+            if 'br' in accepted and BROTLI_AVAILABLE:
+                return 'br', _compress(path, stat, 'br')
+            if 'gzip' in accepted:
+                return 'gzip', _compress(path, stat, 'gzip')
+        return None, path
+
+    def _send_cache_headers(self, path, etag, stat):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(stat.st_mtime, usegmt=True))
+        self.send_header('Vary', 'Accept-Encoding')
+        name = os.path.basename(path)
+        self.send_header('Cache-Control', IMMUTABLE_CACHE if HASHED_NAME.search(name) else REVALIDATE_CACHE)
+
+    def _hidden(self):
+        # Repository internals (.git, caches) live under dot-directories
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        return any(part.startswith('.') for part in path.split('/') if part)
+
+    def send_head(self):
+        if self._hidden():
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, 'index.html')
+            if not self.path.split('?', 1)[0].endswith('/') or not os.path.isfile(index):
+                # Redirects and directory listings are handled upstream
+                return super().send_head()
+            path = index
+
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        stat = os.stat(path)
+        ctype = self.guess_type(path)
+        digest = _file_digest(path, stat)
+        encoding, source = self._select_variant(path, stat, ctype)
+        etag = f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(path, etag, stat)
+            self.end_headers()
+            return None
+
+        if encoding:
+            data = source if isinstance(source, bytes) else Path(source).read_bytes()
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(len(data)))
+            self._send_cache_headers(path, etag, stat)
+            self.end_headers()
+            return io.BytesIO(data)
+
+        size = stat.st_size
+        f = open(path, 'rb')
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header and (not if_range or if_range.strip() == etag):
+            byte_range = _parse_range(range_header, size)
+            if byte_range is None:
+                f.close()
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            self.send_header('Content-Length', str(end - start + 1))
+            self.send_header('Accept-Ranges', 'bytes')
+            self._send_cache_headers(path, etag, stat)
+            self.end_headers()
+            return _RangeFile(f, start, end - start + 1)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(size))
+        self.send_header('Accept-Ranges', 'bytes')
+        self._send_cache_headers(path, etag, stat)
+        self.end_headers()
+        return f
+
+
+def make_server(root=DECK_ROOT, host='127.0.0.1', port=8000, quiet=False):
+    handler = partial(DeckRequestHandler, directory=str(Path(root).resolve()))
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server
+
+
+def start_deck_server(root=DECK_ROOT, port=EXPORT_PORT, quiet=True):
+    """
+    Start the deck server on a background thread for an export run.
+    Falls back to a free port if the export port is taken.
+    Returns (server, url_of_index_html); call stop_deck_server() when done.
+    """
+    try:
+        server = make_server(root, port=port, quiet=quiet)
+    except OSError:
+        server = make_server(root, port=0, quiet=quiet)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, bound_port = server.server_address[:2]
+    return server, f'http://{host}:{bound_port}/index.html'
+
+
+def stop_deck_server(server):
+    """Stop a start_deck_server() server and release its port"""
+    server.shutdown()
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the HTPAAC deck locally')
+    parser.add_argument('--root', default=str(DECK_ROOT), help='Directory to serve (default: repository root)')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port (default: 8000)')
+    parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    args = parser.parse_args()
+
+    server = make_server(args.root, args.host, args.port, args.quiet)
+    print(f"Serving {args.root} at http://{args.host}:{server.server_address[1]}/")
+    if not BROTLI_AVAILABLE:
+        print("Note: brotli not installed, serving gzip only (pip install brotli)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
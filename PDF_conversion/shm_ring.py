@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Shared-memory frame ring buffer for process-pool encoders
+
+At 7680x4320 an RGBA frame is ~130 MB; handing it to a ProcessPoolExecutor
+pickles it through a pipe, which costs more than the encode. Instead the
+capture side copies each decoded frame into one slot of a
+multiprocessing.shared_memory block (Pillow images band by band, so there
+is no second full-size copy on the way), and the encoder processes receive only
+a small SlotRef (block name, offset, shape). They map the block once and
+read the frame zero-copy through a NumPy view (cdp_capture.to_image wraps
+it for Pillow). A slot goes back to the free list as soon as its page is
+encoded, so the ring holds at most max_pending frames whatever the
+resolution. Slots are sized for RGBA at frame_size (the planned output, e.g.
+plan.output_size) so every frame of the export fits; without it, from the
+first frame.
+
+Fallbacks:
+- /dev/shm too small for the ring (Docker's default is 64 MB), or the
+  block cannot be created: frames are pickled to the processes
+- a frame larger than a slot: that frame is pickled
+- no process pool possible: FramePipeline threads
+
+    from shm_ring import open_pipeline
+    with open_pipeline(processes=4, frame_size=plan.output_size, resolution=150.0) as pipeline:
+        pipeline.submit(name, frame)
+        pipeline.finish('out.pdf')
+
+Usage:
+    python shm_ring.py [--width 7680 --height 4320 --frames 12 --processes 4]
+                                        # time shared memory against pickling
+"""
+
+import multiprocessing
+import os
+import queue
+import secrets
+import shutil
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: NumPy is required")
+    print("Install with: pip install numpy")
+    exit(1)
+
+from cdp_capture import to_image
+from export_engine import flatten_frame
+from frame_pipeline import MAX_PENDING, FramePipeline, encode_pdf_page
+
+SHM_ROOT = Path('/dev/shm')
+# Left free in /dev/shm for Chromium, which also keeps its buffers there
+SHM_HEADROOM = 256 * 1024 * 1024
+# Without a frame_size, slots are sized from the first frame plus a margin
+SLOT_MARGIN = 1.05
+# Rows per band when copying a Pillow image into a slot (~8 MB at 7680 RGBA)
+BAND_ROWS = 256
+NAME_PREFIX = 'htpaac-ring-'
+
+PROCESSES = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Small enough to pickle: where a frame sits in which block
+SlotRef = namedtuple('SlotRef', ['name', 'slot', 'offset', 'shape'])
+
+
+def shm_free_bytes():
+    try:
+        return shutil.disk_usage(SHM_ROOT).free
+    except OSError:
+        return 0
+
+
+def _attach(name):
+    # Python 3.13+ can leave the block to its creator's resource tracker
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def frame_shape(frame):
+    """(height, width, channels) of a Pillow RGB(A) image or a frame array"""
+    if isinstance(frame, np.ndarray):
+        return frame.shape
+    return (frame.height, frame.width, len(frame.getbands()))
+
+
+class FrameRing:
+    """Fixed-size frame slots in one shared memory block"""
+
+    def __init__(self, slots, slot_bytes):
+        size = slots * slot_bytes
+        if SHM_ROOT.is_dir() and shm_free_bytes() < size + SHM_HEADROOM:
+            raise OSError(f"{SHM_ROOT} has {shm_free_bytes() / 1024 / 1024:.0f} MB free, "
+                          f"the ring needs {size / 1024 / 1024:.0f} MB")
+        self.shm = shared_memory.SharedMemory(
+            name=f'{NAME_PREFIX}{os.getpid()}-{secrets.token_hex(4)}', create=True, size=size)
+        self.slot_bytes = slot_bytes
+        self.free = queue.Queue()
+        for slot in range(slots):
+            self.free.put(slot)
+
+    def fits(self, shape):
+        return int(np.prod(shape)) <= self.slot_bytes
+
+    def put(self, frame):
+        """
+        Copy a frame (Pillow RGB(A) image or uint8 array) into a free slot,
+        blocking until one is free; returns its SlotRef
+        """
+        shape = frame_shape(frame)
+        slot = self.free.get()
+        offset = slot * self.slot_bytes
+        view = np.ndarray(shape, np.uint8, buffer=self.shm.buf, offset=offset)
+        if isinstance(frame, np.ndarray):
+            view[...] = frame
+        else:
+            # np.asarray(image) would first build a full-size copy; bands
+            # keep the intermediate small
+            width, height = frame.size
+            for top in range(0, height, BAND_ROWS):
+                bottom = min(height, top + BAND_ROWS)
+                band = frame.crop((0, top, width, bottom)).tobytes()
+                view[top:bottom] = np.frombuffer(band, np.uint8).reshape(bottom - top, width, shape[2])
+        # No view may outlive the block, or close() fails with BufferError
+        del view
+        return SlotRef(self.shm.name, slot, offset, shape)
+
+    def release(self, ref):
+        self.free.put(ref.slot)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Blocks mapped in this encoder process, by name; they stay mapped until the
+# process exits, so frame views never dangle
+_attached = {}
+
+
+def _frame_view(ref):
+    if ref.name not in _attached:
+        _attached[ref.name] = _attach(ref.name)
+    return np.ndarray(ref.shape, np.uint8, buffer=_attached[ref.name].buf, offset=ref.offset)
+
+
+def encode_frame(frame, resize=None, resolution=100.0, save_options=None):
+    """
+    Encoder process entry: SlotRef (or a pickled array) -> one-page PDF
+    bytes. The slot is only read until this returns.
+    """
+    array = _frame_view(frame) if isinstance(frame, SlotRef) else frame
+    image = flatten_frame(to_image(array))
+    if resize:
+        image = resize(image)
+    return encode_pdf_page(image, resolution, **(save_options or {}))
+
+
+class SharedFramePipeline(FramePipeline):
+    """FramePipeline whose encodes run in processes, fed through a FrameRing"""
+
+    def __init__(self, processes=PROCESSES, max_pending=MAX_PENDING, frame_size=None, resize=None,
+                 resolution=100.0, **save_options):
+        """
+        frame_size: (width, height) of the largest expected frame; sizes the
+        slots up front. resize must be picklable (a module-level function
+        or a partial of one).
+        """
+        # One thread per slot copies frames in and waits for its encode
+        super().__init__(max_pending, max_pending, resize, resolution, **save_options)
+        self.max_pending = max_pending
+        # spawn: the parent runs Playwright threads, which fork does not survive
+        self.encoders = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+        self.ring = None
+        self.shared = True
+        self.ring_lock = threading.Lock()
+        self.pickled = 0
+        if frame_size:
+            width, height = frame_size
+            self._open_ring(width * height * 4)
+
+    def _open_ring(self, slot_bytes):
+        try:
+            self.ring = FrameRing(self.max_pending, slot_bytes)
+        except OSError as e:
+            print(f"  ⚠️  No shared memory ring ({e}); pickling frames to the encoders")
+            self.shared = False
+
+    def _ring_for(self, shape):
+        with self.ring_lock:
+            if self.ring is None and self.shared:
+                self._open_ring(int(np.prod(shape) * SLOT_MARGIN))
+        if self.ring and self.ring.fits(shape):
+            return self.ring
+        return None
+
+    def _encode(self, frame):
+        if not isinstance(frame, np.ndarray) and frame.mode not in ('RGB', 'RGBA'):
+            frame = flatten_frame(frame)
+        shape = frame_shape(frame)
+        ring = self._ring_for(shape)
+        options = (self.resize, self.resolution, self.save_options)
+        if ring is None:
+            with self.ring_lock:
+                self.pickled += 1
+                if self.shared:
+                    print(f"  ⚠️  {shape[1]}x{shape[0]} frame does not fit a ring slot, pickling it")
+            return self.encoders.submit(encode_frame, np.asarray(frame), *options).result()
+
+        ref = ring.put(frame)
+        try:
+            return self.encoders.submit(encode_frame, ref, *options).result()
+        finally:
+            # The encoder is done with the slot: recycle it
+            ring.release(ref)
+
+    def close(self):
+        super().close()
+        self.encoders.shutdown(wait=True)
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+
+
+def open_pipeline(processes=0, frame_size=None, **options):
+    """
+    SharedFramePipeline with that many encoder processes (slots sized for
+    frame_size), or FramePipeline threads when processes is 0 or a process
+    pool is not usable
+    """
+    if processes:
+        try:
+            return SharedFramePipeline(processes, frame_size=frame_size, **options)
+        except (OSError, ImportError, NotImplementedError) as e:
+            # e.g. no working sem_open without /dev/shm
+            print(f"  ⚠️  No process pool ({e}); using threads")
+    return FramePipeline(**options)
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description='Time shared-memory frame hand-off against pickling')
+    parser.add_argument('--width', type=int, default=7680)
+    parser.add_argument('--height', type=int, default=4320)
+    parser.add_argument('--frames', type=int, default=12)
+    parser.add_argument('--processes', type=int, default=PROCESSES)
+    args = parser.parse_args()
+
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    frame = Image.fromarray(rng.integers(0, 256, (args.height, args.width, 4), np.uint8), 'RGBA')
+    print(f"{args.frames} frames of {args.width}x{args.height} RGBA ({frame.width * frame.height * 4 / 1024 / 1024:.0f} MB), "
+          f"{args.processes} processes, {shm_free_bytes() / 1024 / 1024:.0f} MB free in {SHM_ROOT}")
+
+    for label, shared in (('shared memory', True), ('pickled', False)):
+        with SharedFramePipeline(args.processes, frame_size=frame.size if shared else None, quality=90) as pipeline:
+            pipeline.shared = shared
+            start = time.perf_counter()
+            for n in range(args.frames):
+                pipeline.submit(f'frame_{n:03d}', frame)
+            with tempfile.TemporaryDirectory() as directory:
+                file_size = pipeline.finish(Path(directory) / 'bench.pdf')
+            elapsed = time.perf_counter() - start
+        print(f"  {label:<14} {elapsed:6.2f}s ({file_size / 1024 / 1024:.0f} MB PDF, {pipeline.pickled} frame(s) pickled)")
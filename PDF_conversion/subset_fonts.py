@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Font subsetting step for the deck build
+
+styles.css loads the full Terminess Nerd Font Propo TTFs, thousands of icon
+glyphs the deck never uses. This step:
+
+1. collects every code point used by index.html, script.js and the CSS
+   `content:` strings (plus printable ASCII for runtime text)
+2. subsets each Terminus @font-face to WOFF2 with only those glyphs,
+   keeping the embedded bitmap strikes (EBDT/EBLC) next to the outlines
+3. rewrites the @font-face rules in dist/styles.css (WOFF2 src, font-display)
+4. adds <link rel="preload"> for the faces the title slide needs
+
+Subsets are cached in .build_cache/fonts/ keyed by the font hash and the
+code point set.
+
+Requires: pip install fonttools brotli
+
+Usage:
+    python subset_fonts.py [--dist ../dist] [--font-display swap]
+"""
+
+import argparse
+import hashlib
+import html
+import logging
+import re
+import shutil
+from pathlib import Path
+
+FONTTOOLS_AVAILABLE = False
+try:
+    from fontTools import subset
+    FONTTOOLS_AVAILABLE = True
+except ImportError:
+    pass
+
+from deck_build import BUILD_CACHE, DIST_ROOT, HashCache, ensure_staged, file_digest
+
+CACHE_SUBDIR = 'fonts'
+
+# (font-weight, font-style) of the faces used on the title slide:
+# the bold <h1> title and the regular subtitle
+PRELOAD_FACES = [('normal', 'normal'), ('bold', 'normal')]
+
+FONT_FACE = re.compile(r'@font-face\s*\{[^}]*\}', re.S)
+FACE_SRC = re.compile(r'''src:\s*url\(\s*['"]?\.?/?(Terminus/[^'")]+\.(?:ttf|otf))['"]?\s*\)[^;]*;''', re.S)
+CSS_CONTENT = re.compile(r'''content:\s*(["'])(.*?)\1''')
+JS_ESCAPE = re.compile(r'\\u\{?([0-9a-fA-F]{4,6})\}?')
+CSS_ESCAPE = re.compile(r'\\([0-9a-fA-F]{1,6})\s?')
+
+# fontTools drops the embedded bitmap tables by default; in Terminus they hold
+# the pixel glyphs browsers draw at the bitmap sizes (the outlines are only
+# the fallback), so keep and subset them
+KEEP_TABLES = ['EBDT', 'EBLC', 'EBSC']
+
+
+def _descriptor(face, name, default='normal'):
+    match = re.search(rf'{name}\s*:\s*([^;]+);', face)
+    return match.group(1).strip() if match else default
+
+
+def used_codepoints(html_text, js_text, css_text):
+    """Every code point the deck can render with the local font"""
+    codepoints = set(range(0x20, 0x7F))
+    for text in (html.unescape(html_text), js_text):
+        codepoints.update(ord(c) for c in text if ord(c) >= 0x20)
+        codepoints.update(int(h, 16) for h in JS_ESCAPE.findall(text))
+    for _, value in CSS_CONTENT.findall(css_text):
+        codepoints.update(int(h, 16) for h in CSS_ESCAPE.findall(value))
+        codepoints.update(ord(c) for c in CSS_ESCAPE.sub('', value))
+    return codepoints
+
+
+def subset_font(source, target, codepoints):
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = ['*']
+    options.name_IDs = ['*']
+    options.notdef_outline = True
+    options.drop_tables = [t for t in options.drop_tables if t not in KEEP_TABLES]
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    subset.save_font(font, str(target), options)
+
+
+# The Nerd Font TTFs carry BDF/PfEd tables fontTools cannot subset; they are
+# dropped, which is expected, so keep the step output readable
+logging.getLogger('fontTools.subset').setLevel(logging.ERROR)
+
+
+def subset_fonts(dist=DIST_ROOT, font_display='swap'):
+    if not FONTTOOLS_AVAILABLE:
+        print("Error: fontTools is required for font subsetting")
+        print("Install with: pip install fonttools brotli")
+        return False
+
+    dist = ensure_staged(dist)
+    css_path = dist / 'styles.css'
+    html_path = dist / 'index.html'
+    css = css_path.read_text(encoding='utf-8')
+    page = html_path.read_text(encoding='utf-8')
+    js = (dist / 'script.js').read_text(encoding='utf-8')
+
+    codepoints = used_codepoints(page, js, css)
+    codepoint_key = hashlib.sha1(','.join(map(str, sorted(codepoints))).encode()).hexdigest()
+    print(f"Deck uses {len(codepoints)} code points")
+
+    cache = HashCache('fonts')
+    subsets = {}
+    preloads = []
+
+    def rewrite_face(match):
+        face = match.group(0)
+        src = FACE_SRC.search(face)
+        if not src:
+            return face
+
+        font_path = src.group(1)
+        source = dist / font_path
+        if not source.exists():
+            print(f"  Warning: {font_path} not found, skipping")
+            return face
+
+        digest = file_digest(source)
+        params = {'codepoints': codepoint_key, 'keep_tables': KEEP_TABLES}
+        output = f'{CACHE_SUBDIR}/{Path(font_path).stem}.subset.{digest[:8]}.woff2'
+        status = 'cached'
+        if not cache.lookup(font_path, digest, params):
+            subset_font(source, BUILD_CACHE / output, codepoints)
+            cache.store(font_path, digest, params, [output])
+            status = 'subset'
+
+        subset_path = f'Terminus/{Path(output).name}'
+        subsets[font_path] = subset_path
+        print(f"  ✓ {font_path} ({source.stat().st_size // 1024} KB) -> "
+              f"{subset_path} ({(BUILD_CACHE / output).stat().st_size // 1024} KB, {status})")
+
+        face_key = (_descriptor(face, 'font-weight'), _descriptor(face, 'font-style'))
+        if face_key in PRELOAD_FACES:
+            preloads.append(subset_path)
+
+        face = face[:src.start()] + f'src: url("./{subset_path}") format("woff2");' + face[src.end():]
+        if 'font-display' in face:
+            return re.sub(r'font-display\s*:\s*[^;]+;', f'font-display: {font_display};', face)
+        return face.rstrip('}').rstrip() + f'\n  font-display: {font_display};\n}}'
+
+    css = FONT_FACE.sub(rewrite_face, css)
+    cache.save()
+
+    for font_path, subset_path in subsets.items():
+        shutil.copy2(BUILD_CACHE / CACHE_SUBDIR / Path(subset_path).name, dist / subset_path)
+        (dist / font_path).unlink()
+    css_path.write_text(css, encoding='utf-8')
+
+    if preloads:
+        links = ''.join(
+            f'<link rel="preload" href="{path}" as="font" type="font/woff2" crossorigin>\n    '
+            for path in preloads
+        )
+        page = page.replace('<link rel="stylesheet" href="styles.css">',
+                            links + '<link rel="stylesheet" href="styles.css">', 1)
+        html_path.write_text(page, encoding='utf-8')
+
+    print(f"✅ Subset {len(subsets)} font faces, preloading {len(preloads)}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Subset the Terminus web fonts to WOFF2')
+    parser.add_argument('--dist', default=str(DIST_ROOT), help='Build directory (default: dist/)')
+    parser.add_argument('--font-display', default='swap', choices=['auto', 'block', 'swap', 'fallback', 'optional'],
+                        help='font-display for the rewritten @font-face rules (default: swap)')
+    args = parser.parse_args()
+
+    if not subset_fonts(Path(args.dist), args.font_display):
+        exit(1)
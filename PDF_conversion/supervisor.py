@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Supervised export: per-job deadlines, retries on fresh pages, failure report
+
+A single hanging slide (a remote image that never resolves, an iframe stuck
+loading) used to block a whole export for Playwright's 30 s default timeout
+or abort it from one big try/except. Here every slide/state is an
+independent job run by a pool of worker pages in one browser. A job starts
+from a freshly loaded deck (storage cleared, so no slide state carries over
+from the previous job), navigates to the slide and runs its
+capture_recipes.json steps up to the state, exactly as capture_enhanced.py
+does, before the screenshot:
+
+- each job has its own deadline (asyncio.wait_for), and the page's default
+  timeout is set to match
+- a failed or timed-out job is retried with exponential backoff on a fresh
+  page; the suspect page is closed and a replacement is warmed in the
+  background
+- other workers keep going meanwhile
+- jobs that exhaust their retries are listed in a JSON report; the PDF is
+  written from the frames that succeeded (or not at all with --strict)
+
+Usage:
+    python supervisor.py [--workers 3] [--deadline 20] [--retries 3] [--strict] [--recipes FILE]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import time
+from collections import namedtuple
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    print("Error: Playwright is required")
+    print("Install with: pip install playwright && playwright install chromium")
+    exit(1)
+
+try:
+    from PIL import Image
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+from capture_recipes import RECIPES_FILE, load_recipes, recipe_for, run_step_async
+from embed_posters import install_embed_posters_async
+from export_engine import GOTO_SLIDE_JS, HIDE_UI_SELECTORS, SLIDE_CONFIG, write_pdf
+from freeze_media import install_media_freeze_async, wait_for_frozen_media_async
+from serve_deck import start_deck_server, stop_deck_server
+
+WORKERS = 3
+DEADLINE_S = 20.0
+RETRIES = 3
+BACKOFF_S = 1.0
+SETTLE_MS = 1500
+
+# The deck restores the last slide and states from localStorage, which all
+# pages of the context share; every load starts from a clean deck instead
+CLEAR_STORAGE_SCRIPT = 'localStorage.clear(); sessionStorage.clear();'
+
+REPORT_FILE = 'export_report.json'
+
+# steps: the slide's recipe steps up to and including this state
+Job = namedtuple('Job', ['slide_index', 'slide_id', 'state', 'name', 'steps'])
+
+
+def deck_jobs(slide_config=SLIDE_CONFIG, recipes=None):
+    """One job per slide/state, in deck order"""
+    recipes = recipes or load_recipes()
+    jobs = []
+    for slide_index, slide_id, num_states, slide_name in slide_config:
+        steps = recipe_for(recipes, slide_id, num_states)
+        for state in range(num_states):
+            suffix = f'_state{state + 1}' if num_states > 1 else ''
+            jobs.append(Job(slide_index, slide_id, state, f'slide_{len(jobs):03d}_{slide_name}{suffix}.png',
+                            steps[:state + 1]))
+    return jobs
+
+
+class PagePool:
+    """Deck pages ready for jobs; broken pages are replaced, not reused"""
+
+    def __init__(self, context, url, deadline):
+        self.context = context
+        self.url = url
+        self.deadline = deadline
+        self.ready = asyncio.Queue()
+        self.warming = set()
+        # Pages that already ran a job and must be reset before the next
+        self.used = set()
+
+    async def _load(self, page):
+        await page.goto(self.url, wait_until='load')
+        await page.wait_for_timeout(2000)
+
+    async def _open(self):
+        page = await self.context.new_page()
+        page.set_default_timeout(self.deadline * 1000)
+        try:
+            await self._load(page)
+        except BaseException:
+            # Also on cancellation (a deadline hit mid-load): never leak the page
+            await page.close()
+            raise
+        return page
+
+    async def prepare(self, page):
+        """Fresh deck for the next job: reloaded if the page was used"""
+        if page in self.used:
+            await self._load(page)
+        self.used.add(page)
+
+    async def _warm(self):
+        try:
+            await self.ready.put(await self._open())
+        except Exception:
+            # acquire() opens one on demand and reports the error with the job
+            pass
+
+    def warm(self, count=1):
+        for _ in range(count):
+            task = asyncio.create_task(self._warm())
+            self.warming.add(task)
+            task.add_done_callback(self.warming.discard)
+
+    async def acquire(self):
+        try:
+            return self.ready.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        if self.warming:
+            # A replacement is on its way; wait for it rather than opening another
+            return await self.ready.get()
+        return await self._open()
+
+    async def release(self, page, healthy=True):
+        if healthy:
+            await self.ready.put(page)
+            return
+        self.used.discard(page)
+        try:
+            await page.close()
+        except Exception:
+            pass
+        self.warm()
+
+
+async def run_job(page, job, defaults, freeze_media=True, settle_ms=SETTLE_MS):
+    """Navigate, run the slide's recipe steps up to the state and screenshot; PNG bytes"""
+    await page.evaluate(GOTO_SLIDE_JS, [job.slide_index, HIDE_UI_SELECTORS])
+    await page.wait_for_timeout(settle_ms)
+    for step in job.steps:
+        failed = await run_step_async(page, job.slide_index, step, defaults)
+        if failed:
+            print(f"    Warning: {job.name} not ready ({', '.join(failed)})")
+    if freeze_media:
+        await wait_for_frozen_media_async(page)
+    return await page.screenshot(type='png')
+
+
+async def supervise(jobs, workers=WORKERS, deadline=DEADLINE_S, retries=RETRIES, backoff=BACKOFF_S,
+                    viewport=None, device_scale_factor=1, freeze_media=True, defaults=None):
+    """
+    Run all jobs under supervision (defaults: the recipe file's defaults).
+    Returns ({job name: PNG bytes}, report) where report maps every job to
+    its status, attempts and errors.
+    """
+    viewport = viewport or {'width': 1920, 'height': 1080}
+    defaults = load_recipes()['defaults'] if defaults is None else defaults
+    frames = {}
+    report = {job.name: {'slide': job.slide_id, 'state': job.state + 1, 'status': 'pending',
+                         'attempts': 0, 'errors': []} for job in jobs}
+    queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    # Delayed retries (held so they are not garbage-collected mid-sleep)
+    backoffs = set()
+
+    async def requeue(job, delay):
+        await asyncio.sleep(delay)
+        await queue.put(job)
+        # Only now: the queue must not look finished while the job waits
+        queue.task_done()
+
+    async def attempt(pool, job):
+        page = await pool.acquire()
+        try:
+            await pool.prepare(page)
+            return page, await run_job(page, job, defaults, freeze_media)
+        except BaseException:
+            await pool.release(page, healthy=False)
+            raise
+
+    async def worker(pool):
+        while True:
+            job = await queue.get()
+            entry = report[job.name]
+            entry['attempts'] += 1
+            try:
+                # Acquiring (possibly opening), resetting and running share the deadline
+                page, frames[job.name] = await asyncio.wait_for(attempt(pool, job), deadline)
+            except Exception as e:
+                error = f'timed out after {deadline:.0f}s' if isinstance(e, asyncio.TimeoutError) else str(e)
+                entry['errors'].append(error.splitlines()[0] if error else type(e).__name__)
+                if entry['attempts'] <= retries:
+                    delay = backoff * 2 ** (entry['attempts'] - 1)
+                    print(f"  ⚠️  {job.name}: {entry['errors'][-1]} (retry {entry['attempts']}/{retries} in {delay:.0f}s)")
+                    entry['status'] = 'retrying'
+                    task = asyncio.create_task(requeue(job, delay))
+                    backoffs.add(task)
+                    task.add_done_callback(backoffs.discard)
+                    continue
+                entry['status'] = 'failed'
+                print(f"  ❌ {job.name}: gave up after {entry['attempts']} attempts")
+            else:
+                entry['status'] = 'ok'
+                await pool.release(page)
+                print(f"  ✓ {job.name}" + (f" (attempt {entry['attempts']})" if entry['attempts'] > 1 else ''))
+            queue.task_done()
+
+    server, url = start_deck_server()
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                # Service workers blocked: sw.js would answer requests ahead of the export routes
+                context = await browser.new_context(viewport=viewport, device_scale_factor=device_scale_factor,
+                                                    service_workers='block')
+                if freeze_media:
+                    await install_media_freeze_async(context)
+                await install_embed_posters_async(context)
+                await context.add_init_script(CLEAR_STORAGE_SCRIPT)
+
+                pool = PagePool(context, url, deadline)
+                pool.warm(workers)
+                tasks = [asyncio.create_task(worker(pool)) for _ in range(workers)]
+                await queue.join()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                await browser.close()
+    finally:
+        stop_deck_server(server)
+    return frames, report
+
+
+def write_report(report, path=REPORT_FILE):
+    failed = {name: entry for name, entry in report.items() if entry['status'] != 'ok'}
+    retried = sum(1 for entry in report.values() if entry['status'] == 'ok' and entry['attempts'] > 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'failed': len(failed), 'retried': retried, 'jobs': report}, f, indent=2)
+    return failed, retried
+
+
+def export_supervised(output_file='HTPAAC_Supervised.pdf', workers=WORKERS, deadline=DEADLINE_S,
+                      retries=RETRIES, strict=False, freeze_media=True, report_file=REPORT_FILE,
+                      recipes_file=RECIPES_FILE):
+    recipes = load_recipes(recipes_file)
+    jobs = deck_jobs(recipes=recipes)
+    print(f"Exporting {len(jobs)} slide states with {workers} workers "
+          f"({deadline:.0f}s deadline, {retries} retries)...")
+    start = time.perf_counter()
+    frames, report = asyncio.run(supervise(jobs, workers, deadline, retries, freeze_media=freeze_media,
+                                           defaults=recipes['defaults']))
+    failed, retried = write_report(report, report_file)
+
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s: {len(frames)}/{len(jobs)} frames, "
+          f"{retried} recovered by retry, {len(failed)} failed")
+    print(f"Report: {report_file}")
+    if failed and (strict or not frames):
+        print("❌ Not writing the PDF: " + ', '.join(failed))
+        return False
+
+    images = []
+    for job in jobs:
+        if job.name in frames:
+            image = Image.open(io.BytesIO(frames[job.name]))
+            image.load()
+            images.append(image)
+    file_size = write_pdf(images, output_file)
+    print(f"✅ PDF created: {output_file} ({len(images)} pages, {file_size / 1024 / 1024:.2f} MB)")
+    if failed:
+        print(f"⚠️  Missing pages: {', '.join(failed)}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Export with per-slide deadlines, retries and a failure report')
+    parser.add_argument('--output', default='HTPAAC_Supervised.pdf', help='Output PDF')
+    parser.add_argument('--workers', type=int, default=WORKERS, help=f'Worker pages (default: {WORKERS})')
+    parser.add_argument('--deadline', type=float, default=DEADLINE_S,
+                        help=f'Seconds allowed per slide/state (default: {DEADLINE_S:.0f})')
+    parser.add_argument('--retries', type=int, default=RETRIES, help=f'Retries per job (default: {RETRIES})')
+    parser.add_argument('--report', default=REPORT_FILE, help=f'Failure report (default: {REPORT_FILE})')
+    parser.add_argument('--strict', action='store_true', help='Write no PDF if any job failed')
+    parser.add_argument('--no-freeze', action='store_true', help='Do not pin animated media to fixed frames')
+    parser.add_argument('--recipes', default=RECIPES_FILE, help='Capture recipe file (default: capture_recipes.json)')
+    args = parser.parse_args()
+
+    if not export_supervised(args.output, args.workers, args.deadline, args.retries, args.strict,
+                             not args.no_freeze, args.report, args.recipes):
+        exit(1)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tall-canvas capture: many slides per screenshot
+
+For single-state slides the per-slide round trip (navigate, settle,
+screenshot) dominates the export. This mode lays those slides out one under
+another on a single tall page, each centred in its own viewport-sized band
+exactly as the slideshow container would centre it, takes a few large
+screenshots of that canvas and slices them into per-slide frames with NumPy
+views (no copies).
+
+Multi-state slides still go through the usual path, one state at a time via
+the capture recipes (capture_recipes.json), since their states are produced
+by the deck's JavaScript. Slides taller
+than the viewport (the live deck clips them) are also captured the usual
+way.
+
+Usage:
+    python tall_canvas.py [--scale 1] [--output HTPAAC_Tall.pdf] [--recipes FILE]
+"""
+
+import argparse
+import time
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    print("Error: Playwright is required")
+    print("Install with: pip install playwright && playwright install chromium")
+    exit(1)
+
+from capture_recipes import RECIPES_FILE, load_recipes, recipe_for, run_step
+from cdp_capture import CDPCapture, to_image
+from export_engine import SLIDE_CONFIG, deck_page, goto_slide, write_pdf
+from freeze_media import wait_for_frozen_media
+
+VIEWPORT = {'width': 1920, 'height': 1080}
+
+# Chromium refuses or tiles screenshots past this many device pixels per side
+MAX_SHOT_PIXELS = 16384
+
+# Stacks the given slides in bands of `band` CSS px. Every slide gets its
+# active look (plus the intro's fade-in) with transitions disabled, and sits
+# where the flex-centred slideshow container would put it. Returns the
+# indices placed, those left out because they overflow their band, and the
+# canvas origin in page coordinates.
+STACK_SLIDES_JS = '''
+(args) => {
+    const [indices, band] = args;
+    const container = document.querySelector('.slideshow-container');
+    const slides = Array.from(document.querySelectorAll('.slide'));
+    const style = document.createElement('style');
+    style.id = 'htpaac-tall-canvas';
+    style.textContent = `
+        html, body { height: auto !important; overflow: visible !important; }
+        .slideshow-container { display: block !important; opacity: 1 !important; }
+        .slide, .slide * { transition: none !important; }
+        .navigation, .progress-container, .slide-note { display: none !important; }
+    `;
+    document.head.appendChild(style);
+
+    const width = container.clientWidth;
+    slides.forEach((s, i) => {
+        s.classList.remove('active', 'fade-in');
+        s.style.display = indices.includes(i) ? 'block' : 'none';
+    });
+
+    const placed = [], overflow = [];
+    indices.forEach(i => {
+        const s = slides[i];
+        s.classList.add('active', 'fade-in');
+        if (typeof loadImagesForSlide === 'function') loadImagesForSlide(i);
+        if (s.offsetHeight > band) {
+            s.style.display = 'none';
+            overflow.push(i);
+            return;
+        }
+        const top = placed.length * band + (band - s.offsetHeight) / 2;
+        s.style.top = `${top}px`;
+        s.style.left = `${(width - s.offsetWidth) / 2}px`;
+        placed.push(i);
+    });
+    container.style.height = `${placed.length * band}px`;
+    const box = container.getBoundingClientRect();
+    return { placed, overflow, x: box.left + scrollX, y: box.top + scrollY };
+}
+'''
+
+IMAGES_LOADED_JS = '''
+() => Array.from(document.querySelectorAll('.slide img'))
+    .filter(img => img.offsetParent !== null)
+    .every(img => img.complete)
+'''
+
+
+def capture_stacked(page, indices, settle_ms=1500):
+    """
+    Capture the given slides via the tall canvas.
+    Returns ({slide index: frame view}, overflowing indices, screenshot count).
+    Leaves the page stacked; reload it before normal navigation.
+    """
+    band = page.viewport_size['height']
+    width = page.viewport_size['width']
+    layout = page.evaluate(STACK_SLIDES_JS, [list(indices), band])
+    placed = layout['placed']
+    try:
+        page.wait_for_function(IMAGES_LOADED_JS, timeout=10000)
+    except Exception:
+        print("    Warning: some images did not load before timeout")
+    wait_for_frozen_media(page)
+    page.wait_for_timeout(settle_ms)
+
+    dpr = page.evaluate('() => window.devicePixelRatio')
+    per_shot = max(1, int(MAX_SHOT_PIXELS // (band * dpr)))
+    capture = CDPCapture(page)
+    frames, shots = {}, 0
+    try:
+        for first in range(0, len(placed), per_shot):
+            group = placed[first:first + per_shot]
+            clip = {'x': layout['x'], 'y': layout['y'] + first * band, 'width': width, 'height': len(group) * band}
+            shot = capture.capture(clip, beyond_viewport=True)
+            shots += 1
+            rows = shot.shape[0] / len(group)
+            for n, index in enumerate(group):
+                # Basic slicing: a view into the shot, not a copy
+                frames[index] = shot[round(n * rows):round((n + 1) * rows)]
+    finally:
+        capture.close()
+    return frames, layout['overflow'], shots
+
+
+def capture_tall(output_file='HTPAAC_Tall.pdf', scale=1, freeze_media=True, recipes_file=RECIPES_FILE):
+    recipes = load_recipes(recipes_file)
+    single = [index for index, _, states, _ in SLIDE_CONFIG if states == 1]
+    start = time.perf_counter()
+
+    with sync_playwright() as p, deck_page(p, VIEWPORT, device_scale_factor=scale,
+                                           freeze_media=freeze_media) as page:
+        print("Waiting for presentation to load...")
+        page.wait_for_timeout(5000)
+
+        print(f"\nStacking {len(single)} single-state slides...")
+        stacked, overflow, shots = capture_stacked(page, single)
+        print(f"  ✓ {len(stacked)} slides from {shots} screenshot(s)")
+        if overflow:
+            print(f"  {len(overflow)} slide(s) taller than the viewport captured individually: {overflow}")
+
+        # Back to the normal deck for the slides that need the per-state path
+        page.reload(wait_until='networkidle')
+        page.wait_for_timeout(3000)
+        capture = CDPCapture(page)
+        individual = {}
+        for slide_index, slide_id, num_states, slide_name in SLIDE_CONFIG:
+            if slide_index in stacked:
+                continue
+            goto_slide(page, slide_index)
+            individual[slide_index] = []
+            for state, step in enumerate(recipe_for(recipes, slide_id, num_states)):
+                failed = run_step(page, slide_index, step, recipes['defaults'])
+                if failed:
+                    print(f"    Warning: {slide_id} state {state + 1} not ready ({', '.join(failed)})")
+                if freeze_media:
+                    wait_for_frozen_media(page)
+                individual[slide_index].append(capture.capture())
+                shots += 1
+            print(f"  ✓ {slide_id} ({slide_name}): {num_states} state(s)")
+        capture.close()
+
+    # Deck order: stacked slides contribute one frame, the rest one per state
+    images = []
+    for slide_index, _, _, _ in SLIDE_CONFIG:
+        frames = [stacked[slide_index]] if slide_index in stacked else individual[slide_index]
+        images.extend(to_image(frame) for frame in frames)
+
+    file_size = write_pdf(images, output_file)
+    print(f"\n✅ PDF created: {output_file}")
+    print(f"   Pages: {len(images)} from {shots} screenshots in {time.perf_counter() - start:.1f}s")
+    print(f"   File size: {file_size / 1024 / 1024:.2f} MB")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Capture single-state slides on one tall canvas')
+    parser.add_argument('--output', default='HTPAAC_Tall.pdf', help='Output PDF (default: HTPAAC_Tall.pdf)')
+    parser.add_argument('--scale', type=float, default=1, help='device_scale_factor (default: 1)')
+    parser.add_argument('--no-freeze', action='store_true', help='Do not pin animated media to fixed frames')
+    parser.add_argument('--recipes', default=RECIPES_FILE, help='Capture recipe file (default: capture_recipes.json)')
+    args = parser.parse_args()
+
+    capture_tall(args.output, args.scale, not args.no_freeze, args.recipes)
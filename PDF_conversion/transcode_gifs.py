@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Animated GIF transcoding step for the deck build
+
+act2.gif, act3.gif, Photo1-3.gif and Eval.gif are the heaviest assets in the
+deck and expensive for the browser to decode continuously. This step
+converts each referenced GIF, resized to its rendered size (the layout
+measurement shared with optimize_images.py), into:
+
+- an animated WebP (Pillow)
+- muted looping WebM (VP9) and MP4 (H.264) when ffmpeg is on the PATH
+- a poster frame (first frame, WebP)
+
+and rewrites the tags in dist/:
+
+- with video: <video autoplay muted loop playsinline poster=...> with WebM/MP4
+  sources and the animated WebP <img> as fallback, sized in CSS pixels like
+  the <img> it replaces (styles.css gives .slide video the .slide img rules)
+- without ffmpeg: <picture> with an animated WebP source and the GIF <img>
+
+Outputs are cached in .build_cache/gifs/ keyed by the source hash, so only
+changed GIFs are reprocessed.
+
+Usage:
+    python transcode_gifs.py [--dist ../dist] [--no-video] [--no-measure]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+try:
+    from PIL import Image, ImageSequence
+except ImportError:
+    print("Error: Pillow is required")
+    print("Install with: pip install Pillow")
+    exit(1)
+
+from deck_build import (BUILD_CACHE, DIST_ROOT, HashCache, ensure_staged, file_digest, src_selectors,
+                        targets_src_selector)
+from optimize_images import (DENSITIES, IMG_TAG, OUTPUT_DIR, SRC_ATTR, STYLE_ATTR,
+                             css_width, measured_widths, variant_name)
+
+CACHE_SUBDIR = 'gifs'
+
+WEBP_OPTIONS = {'quality': 75, 'method': 4, 'minimize_size': True}
+
+VIDEO_FORMATS = {
+    'webm': ['-c:v', 'libvpx-vp9', '-b:v', '0', '-crf', '35', '-row-mt', '1'],
+    'mp4': ['-c:v', 'libx264', '-crf', '23', '-preset', 'slow', '-movflags', '+faststart'],
+}
+
+VIDEO_TYPES = {'webm': 'video/webm', 'mp4': 'video/mp4'}
+
+# Attributes that only make sense on the <img> fallback
+IMG_ONLY_ATTRS = ('src', 'srcset', 'sizes', 'onerror', 'alt')
+
+
+def collect_gif_usages(texts, pinned=()):
+    """
+    Map img/*.gif path -> inline styles of every <img> using it, except
+    images styled by name (pinned [src*=...] values)
+    """
+    usages = {}
+    for text in texts:
+        for tag in IMG_TAG.findall(text):
+            src = SRC_ATTR.search(tag)
+            if not src or ' data-src=' in tag or targets_src_selector(src.group(3), pinned):
+                continue
+            path = unquote(src.group(3))
+            if Path(path).suffix.lower() != '.gif':
+                continue
+            style = STYLE_ATTR.search(tag)
+            usages.setdefault(path, []).append(style.group(2) if style else '')
+    return usages
+
+
+def _encode_video(source, target, width, codec_args):
+    subprocess.run(
+        ['ffmpeg', '-y', '-v', 'error', '-i', str(source), '-an',
+         '-vf', f'scale={width}:-2:flags=lanczos', '-pix_fmt', 'yuv420p',
+         *codec_args, str(target)],
+        check=True
+    )
+
+
+def _transcode_gif(job):
+    """Transcode one GIF (runs in a worker process)"""
+    path, source, styles, measured, video, entry, cache_dir = job
+    digest = file_digest(source)
+    cache_dir = Path(cache_dir)
+
+    with Image.open(source) as gif:
+        natural = gif.size
+        css_w = css_width(path, styles, natural, measured)
+        # Even width keeps H.264/VP9 happy
+        width = min(natural[0], round(css_w * max(DENSITIES)))
+        width -= width % 2
+        height = max(2, round(width * natural[1] / natural[0]))
+        # The <video> box: CSS pixels, like the <img> it replaces
+        css_size = (round(css_w), max(1, round(css_w * natural[1] / natural[0])))
+        formats = sorted(VIDEO_FORMATS) if video else []
+        params = {'width': width, 'video': formats, 'webp': WEBP_OPTIONS}
+
+        name = variant_name(path, digest, width, 'webp')  # act2-500w.1a2b3c4d.webp
+        prefix, short_hash, _ = name.rsplit('.', 2)
+        outputs = {
+            'webp': f'{CACHE_SUBDIR}/{name}',
+            'poster': f'{CACHE_SUBDIR}/{prefix}-poster.{short_hash}.webp',
+        }
+        for fmt in formats:
+            outputs[fmt] = f'{CACHE_SUBDIR}/{prefix}.{short_hash}.{fmt}'
+
+        if (entry and entry.get('hash') == digest and entry.get('params') == params
+                and all((cache_dir / o).exists() for o in outputs.values())):
+            return {'path': path, 'digest': digest, 'params': params, 'outputs': outputs,
+                    'size': (width, height), 'css_size': css_size,
+                    'source_size': os.path.getsize(source), 'cached': True}
+
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(gif):
+            durations.append(frame.info.get('duration', 100) or 100)
+            frames.append(frame.convert('RGBA').resize((width, height), Image.Resampling.LANCZOS))
+
+    (cache_dir / CACHE_SUBDIR).mkdir(parents=True, exist_ok=True)
+    frames[0].save(cache_dir / outputs['webp'], 'WEBP', save_all=True, append_images=frames[1:],
+                   duration=durations, loop=0, **WEBP_OPTIONS)
+    frames[0].convert('RGB').save(cache_dir / outputs['poster'], 'WEBP', quality=85)
+    for fmt in formats:
+        _encode_video(source, cache_dir / outputs[fmt], width, VIDEO_FORMATS[fmt])
+
+    return {'path': path, 'digest': digest, 'params': params, 'outputs': outputs,
+            'size': (width, height), 'css_size': css_size,
+            'source_size': os.path.getsize(source), 'cached': False}
+
+
+def _url(output):
+    return f"{OUTPUT_DIR}/{quote(Path(output).name)}"
+
+
+def _strip_attrs(tag, names):
+    """Tag attributes (as a string) without the given attribute names"""
+    attrs = tag[len('<img'):].rstrip('>').rstrip('/')
+    for name in names:
+        attrs = re.sub(rf'''\s{name}=(?:"[^"]*"|'[^']*')''', '', attrs)
+    return attrs
+
+
+def rewrite_gif_tags(text, results):
+    """Replace GIF <img> tags with <video> or <picture> markup"""
+    def rewrite(match):
+        tag = match.group(0)
+        src = SRC_ATTR.search(tag)
+        if not src or ' data-src=' in tag:
+            return tag
+        result = results.get(unquote(src.group(3)))
+        if not result:
+            return tag
+
+        outputs = result['outputs']
+        q = src.group(2)
+        webp_img = tag[:src.start()] + f'{src.group(1)}{q}{_url(outputs["webp"])}{q}' + tag[src.end():]
+
+        if not result['params']['video']:
+            # An animated WebP that is not smaller than the GIF is not worth it
+            if (BUILD_CACHE / outputs['webp']).stat().st_size >= result['source_size']:
+                return tag
+            return (f'<picture style="display: contents;">'
+                    f'<source type="image/webp" srcset="{_url(outputs["webp"])}">{tag}</picture>')
+
+        width, height = result['css_size']
+        sources = ''.join(
+            f'<source src="{_url(outputs[fmt])}" type="{VIDEO_TYPES[fmt]}">'
+            for fmt in ('webm', 'mp4') if fmt in outputs
+        )
+        video_attrs = _strip_attrs(tag, IMG_ONLY_ATTRS)
+        alt = re.search(r'''\salt=(?:"([^"]*)"|'([^']*)')''', tag)
+        label = f' aria-label="{alt.group(1) or alt.group(2) or ""}"' if alt else ''
+        return (f'<video autoplay muted loop playsinline poster="{_url(outputs["poster"])}" '
+                f'width="{width}" height="{height}"{label}{video_attrs}>{sources}{webp_img}</video>')
+
+    return IMG_TAG.sub(rewrite, text)
+
+
+def transcode_gifs(dist=DIST_ROOT, video=True, workers=None, measure=True):
+    dist = ensure_staged(dist)
+    if video and not shutil.which('ffmpeg'):
+        print("Note: ffmpeg not found, emitting animated WebP only")
+        video = False
+
+    text_files = [dist / 'index.html', dist / 'script.js']
+    texts = [f.read_text(encoding='utf-8') for f in text_files]
+    usages = collect_gif_usages(texts, src_selectors(dist))
+    measured = measured_widths(measure)
+
+    cache = HashCache('gifs')
+    jobs = []
+    for path, styles in sorted(usages.items()):
+        source = dist / path
+        if not source.exists():
+            print(f"  Warning: {path} not found, skipping")
+            continue
+        widths = {path: measured[path]} if path in measured else {}
+        jobs.append((path, str(source), styles, widths, video, cache.entries.get(path), str(BUILD_CACHE)))
+
+    print(f"Transcoding {len(jobs)} GIFs ({'WebP + video' if video else 'WebP'})...")
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_transcode_gif, jobs):
+            results[result['path']] = result
+            cache.store(result['path'], result['digest'], result['params'],
+                        list(result['outputs'].values()), size=result['size'])
+            sizes = ', '.join(f"{fmt} {(BUILD_CACHE / o).stat().st_size // 1024} KB"
+                              for fmt, o in result['outputs'].items())
+            status = 'cached' if result['cached'] else 'encoded'
+            print(f"  ✓ {result['path']} ({(dist / result['path']).stat().st_size // 1024} KB) -> {sizes} ({status})")
+    cache.save()
+
+    output_dir = dist / OUTPUT_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for result in results.values():
+        for output in result['outputs'].values():
+            shutil.copy2(BUILD_CACHE / output, output_dir / Path(output).name)
+
+    for text_file, text in zip(text_files, texts):
+        text_file.write_text(rewrite_gif_tags(text, results), encoding='utf-8')
+
+    print(f"✅ Transcoded {len(results)} GIFs")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Transcode animated GIFs into WebP/video with posters')
+    parser.add_argument('--dist', default=str(DIST_ROOT), help='Build directory (default: dist/)')
+    parser.add_argument('--no-video', action='store_true', help='Only emit animated WebP, skip ffmpeg')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--no-measure', action='store_true',
+                        help='Size GIFs from inline styles instead of measuring the layout')
+    args = parser.parse_args()
+
+    if not transcode_gifs(Path(args.dist), not args.no_video, args.workers, not args.no_measure):
+        exit(1)
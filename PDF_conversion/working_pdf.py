@@ -3,7 +3,7 @@
 Working PDF generation - captures all slides properly
 """
 
-import os
+import argparse
 from pathlib import Path
 
 try:
@@ -13,15 +13,10 @@ except ImportError:
     print("Install with: pip install playwright && playwright install chromium")
     exit(1)
 
-try:
-    from PIL import Image
-except ImportError:
-    print("Error: Pillow is required")
-    print("Install with: pip install Pillow")
-    exit(1)
+from export_engine import capture_frame, save_frames, write_pdf
 
 
-def generate_working_pdf():
+def generate_working_pdf(save_images=None):
     """Generate a PDF with all slides"""
 
     with sync_playwright() as p:
@@ -100,9 +95,8 @@ def generate_working_pdf():
 
             # Take screenshot
             screenshot_path = f'slide_{i:03d}.png'
-            page.screenshot(path=screenshot_path, full_page=False)
-            screenshots.append(screenshot_path)
-            print(f"  ✓ Saved {screenshot_path}")
+            screenshots.append((screenshot_path, capture_frame(page, full_page=False)))
+            print(f"  ✓ Captured {screenshot_path}")
 
         browser.close()
 
@@ -114,67 +108,32 @@ def generate_working_pdf():
         print("ERROR: No screenshots were taken!")
         return False
 
-    # Use Pillow to create PDF
-    from PIL import Image
-
-    # Load all images
-    images = []
-    for screenshot_path in screenshots:
-        if os.path.exists(screenshot_path):
-            print(f"  Loading {screenshot_path}")
-            img = Image.open(screenshot_path)
-
-            # Convert to RGB if necessary
-            if img.mode in ('RGBA', 'P'):
-                rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'RGBA':
-                    rgb_img.paste(img, mask=img.split()[3])
-                else:
-                    rgb_img.paste(img)
-                images.append(rgb_img)
-            else:
-                images.append(img)
-        else:
-            print(f"  WARNING: {screenshot_path} not found!")
-
-    if not images:
-        print("ERROR: No images were loaded!")
-        return False
+    if save_images:
+        save_frames(screenshots, save_images)
+
+    images = [frame for _, frame in screenshots]
 
     # Save as multi-page PDF
     output_file = 'HTPAAC_Complete.pdf'
     print(f"\nSaving PDF with {len(images)} pages...")
 
-    # Save first image and append rest
-    images[0].save(
-        output_file,
-        "PDF",
-        save_all=True,
-        append_images=images[1:] if len(images) > 1 else [],
-        resolution=100.0
-    )
+    file_size = write_pdf(images, output_file, resolution=100.0)
 
     print(f"✅ PDF created: {output_file}")
     print(f"   Total pages: {len(images)}")
 
-    # Verify file size
-    file_size = os.path.getsize(output_file)
     print(f"   File size: {file_size:,} bytes")
 
-    # Clean up screenshots (optional - comment out to keep them)
-    # print("\nCleaning up temporary files...")
-    # for screenshot_path in screenshots:
-    #     try:
-    #         os.remove(screenshot_path)
-    #         print(f"  Removed {screenshot_path}")
-    #     except:
-    #         pass
-
     return True
 
 
 if __name__ == "__main__":
-    success = generate_working_pdf()
+    parser = argparse.ArgumentParser(description='Generate a PDF with all slides')
+    parser.add_argument('--save-images', metavar='DIR', default=None,
+                        help='Also write every captured frame as PNG into DIR')
+    args = parser.parse_args()
+
+    success = generate_working_pdf(args.save_images)
     if not success:
         print("\n❌ PDF generation failed!")
         exit(1)
\ No newline at end of file
@@ -2822,6 +2822,32 @@ document.addEventListener("click", function (event) {
   }
 });
 
+// =============================================================================
+// OFFLINE CACHE (SERVICE WORKER)
+// =============================================================================
+
+// Optional: only active when served over HTTP and asset-manifest.json exists
+// (build it with PDF_conversion/build_sw_manifest.py)
+function registerOfflineCache() {
+  if (!("serviceWorker" in navigator) || !location.protocol.startsWith("http")) {
+    return;
+  }
+
+  fetch("asset-manifest.json", { cache: "no-store" })
+    .then((response) => (response.ok ? response.json() : null))
+    .then((manifest) => {
+      if (!manifest) return;
+      return navigator.serviceWorker
+        .register(`sw.js?v=${manifest.version}`)
+        .then(() => console.log("Offline cache version:", manifest.version));
+    })
+    .catch(() => {
+      // Offline or no manifest: keep whatever service worker is already active
+    });
+}
+
+window.addEventListener("load", registerOfflineCache);
+
 // =============================================================================
 // INITIALIZATION COMPLETE
 // =============================================================================
@@ -0,0 +1,103 @@
+/**
+ * HTPAAC Offline Cache (Service Worker)
+ * Precaches the shell, fonts and first-slide assets listed in asset-manifest.json,
+ * then serves everything else stale-while-revalidate so reloads and slide changes
+ * keep working on flaky venue Wi-Fi.
+ *
+ * Registered by script.js as sw.js?v=<manifest version>; a new version installs a
+ * fresh cache and removes the old ones.
+ */
+
+const CACHE_PREFIX = "htpaac-";
+const VERSION = new URL(self.location.href).searchParams.get("v") || "dev";
+const CACHE_NAME = `${CACHE_PREFIX}${VERSION}`;
+const PLACEHOLDER_HOST = "via.placeholder.com";
+
+// =============================================================================
+// INSTALL & ACTIVATE
+// =============================================================================
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    fetch("asset-manifest.json", { cache: "no-store" })
+      .then((response) => response.json())
+      .then((manifest) =>
+        caches.open(CACHE_NAME).then((cache) => cache.addAll(manifest.precache))
+      )
+      .then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches
+      .keys()
+      .then((names) =>
+        Promise.all(
+          names
+            .filter((name) => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+            .map((name) => caches.delete(name))
+        )
+      )
+      .then(() => self.clients.claim())
+  );
+});
+
+// =============================================================================
+// FETCH: STALE-WHILE-REVALIDATE
+// =============================================================================
+
+function placeholderResponse(url) {
+  // Offline stand-in for the via.placeholder.com fallbacks used by onerror handlers
+  const text = (url.searchParams.get("text") || "").replace(/[<&>]/g, "");
+  const size = (url.pathname.split("/")[1] || "260x200").split("x");
+  const width = parseInt(size[0]) || 260;
+  const height = parseInt(size[1]) || 200;
+  const svg = `<svg xmlns="http://www.w3.org/2000/svg" width="${width}" height="${height}"><rect width="100%" height="100%" fill="#333"/><text x="50%" y="50%" fill="#fff" font-family="sans-serif" font-size="14" text-anchor="middle" dominant-baseline="middle">${text}</text></svg>`;
+  return new Response(svg, { headers: { "Content-Type": "image/svg+xml" } });
+}
+
+function staleWhileRevalidate(event) {
+  const request = event.request;
+
+  return caches.open(CACHE_NAME).then((cache) =>
+    cache.match(request, { ignoreSearch: request.mode === "navigate" }).then((cached) => {
+      const network = fetch(request)
+        .then((response) => {
+          // Opaque (cross-origin image) responses are cached too
+          if (response.ok || response.type === "opaque") {
+            cache.put(request, response.clone());
+          }
+          return response;
+        })
+        .catch(() => {
+          if (cached) return cached;
+          const url = new URL(request.url);
+          if (url.hostname === PLACEHOLDER_HOST) return placeholderResponse(url);
+          return Response.error();
+        });
+
+      if (cached) {
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+      }
+      return network;
+    })
+  );
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  if (request.method !== "GET") return;
+
+  const url = new URL(request.url);
+  if (url.protocol !== "http:" && url.protocol !== "https:") return;
+
+  // Never cache the manifest itself; it decides the cache version
+  if (url.origin === self.location.origin && url.pathname.endsWith("/asset-manifest.json")) return;
+
+  // Range requests (video/GIF streaming) go straight to the network
+  if (request.headers.has("range")) return;
+
+  event.respondWith(staleWhileRevalidate(event));
+});